@@ -0,0 +1,138 @@
+"""
+generators of synthetic dependency graphs, task files, extensions and file trees for benchmarks.
+"""
+import pathlib
+import random
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from ceryle import TaskGroup  # noqa: E402
+
+SHAPES = ['layered', 'modules', 'fan-out', 'fan-in', 'chain']
+
+
+def generate(n, deps=3, window=50, seed=0):
+    """
+    generates n task groups, each depends on up to deps groups among preceding window groups.
+    nearby dependencies make many diamonds as generated build graphs do.
+    """
+    return [TaskGroup(name, [], 'context', 'file.ceryle', dependencies=d)
+            for name, d in _layered(n, deps=deps, window=window, seed=seed)]
+
+
+def generate_modules(n, module_size=100, deps=3, cross=0.05, seed=0):
+    """
+    generates n task groups in modules, depending on groups in the same module and sometimes on other modules.
+    """
+    return [TaskGroup(name, [], 'context', 'file.ceryle', dependencies=d)
+            for name, d in _modules(n, module_size=module_size, deps=deps, cross=cross, seed=seed)]
+
+
+def _layered(n, deps=3, window=50, seed=0):
+    rnd = random.Random(seed)
+    for i in range(n):
+        candidates = range(max(0, i - window), i)
+        yield f'g{i}', [f'g{j}' for j in rnd.sample(candidates, min(deps, len(candidates)))]
+
+
+def _modules(n, module_size=100, deps=3, cross=0.05, seed=0):
+    rnd = random.Random(seed)
+    for i in range(n):
+        head = i - i % module_size
+        names = [f'g{j}' for j in rnd.sample(range(head, i), min(deps, i - head))]
+        if head and rnd.random() < cross:
+            names.append(f'g{rnd.randrange(0, head)}')
+        yield f'g{i}', names
+
+
+def dependency_graph(shape, n, seed=0):
+    """
+    shapes are:
+      layered: each group depends on a few of preceding groups nearby
+      modules: layered in modules of 100 groups, with a few dependencies across modules
+      fan-out: g0 depends on all other groups
+      fan-in: all other groups depend on g0
+      chain: each group depends on the previous one
+    form: [(<name: str>, <dependencies: list>)]
+    """
+    if shape == 'layered':
+        return list(_layered(n, seed=seed))
+    if shape == 'modules':
+        return list(_modules(n, seed=seed))
+    if shape == 'fan-out':
+        return [('g0', [f'g{i}' for i in range(1, n)]), *[(f'g{i}', []) for i in range(1, n)]]
+    if shape == 'fan-in':
+        return [('g0', []), *[(f'g{i}', ['g0']) for i in range(1, n)]]
+    if shape == 'chain':
+        return [('g0', []), *[(f'g{i}', [f'g{i - 1}']) for i in range(1, n)]]
+    raise ValueError(f'unknown shape: {shape}, must be one of {", ".join(SHAPES)}')
+
+
+def task_groups(shape, n, tasks=None, seed=0):
+    """
+    tasks is a function which returns tasks of a task group by its name.
+    """
+    return [TaskGroup(name, tasks(name) if tasks else [], 'context', 'file.ceryle', dependencies=deps)
+            for name, deps in dependency_graph(shape, n, seed=seed)]
+
+
+def write_task_files(root, shape, n, files=10, seed=0):
+    """
+    writes n task groups into the default task file and files in .ceryle/tasks of root.
+    default task is g0.
+    form: [<task file: str>]
+    """
+    root = pathlib.Path(root)
+    task_dir = root.joinpath('.ceryle', 'tasks')
+    task_dir.mkdir(parents=True, exist_ok=True)
+    graph = dependency_graph(shape, n, seed=seed)
+    size = -(-len(graph) // files)
+    paths = []
+    for k in range(files):
+        chunk = graph[k * size:(k + 1) * size]
+        if not chunk and k > 0:
+            break
+        lines = ["default = 'g0'", '{'] if k == 0 else ['{']
+        for name, deps in chunk:
+            lines.append(f"    '{name}': {{'dependencies': {deps!r}, 'tasks': [command('echo {name}')]}},")
+        lines.append('}')
+        path = root.joinpath('CERYLE') if k == 0 else task_dir.joinpath(f'part{k:03}.ceryle')
+        path.write_text('\n'.join(lines) + '\n')
+        paths.append(str(path))
+    return paths
+
+
+def write_extension(path, functions=500):
+    """
+    writes an extension file defining many executables and helper functions.
+    """
+    lines = []
+    for i in range(functions):
+        if i % 2 == 0:
+            lines.extend(['@executable', f'def ex{i}(a):',
+                          f'    return ceryle.ExecutionResult(0, stdout=[a * {i}])', ''])
+        else:
+            lines.extend([f'def cmd{i}(a):', f"    return command('echo {i} ' + a)", ''])
+    pathlib.Path(path).parent.mkdir(parents=True, exist_ok=True)
+    pathlib.Path(path).write_text('\n'.join(lines))
+    return str(path)
+
+
+def write_file_tree(root, dirs=50, files_per_dir=40, depth=3, size=256):
+    """
+    writes dirs directories nested up to depth, each has files_per_dir files of .py, .txt and .log.
+    form: <number of files: int>
+    """
+    root = pathlib.Path(root)
+    content = b'x' * size
+    exts = ['.py', '.txt', '.log']
+    n = 0
+    for d in range(dirs):
+        parts = [f'd{(d // (4 ** level)) % 4}' for level in range(depth - 1)]
+        directory = root.joinpath(*parts, f'pkg{d}')
+        directory.mkdir(parents=True, exist_ok=True)
+        for f in range(files_per_dir):
+            directory.joinpath(f'f{f}{exts[f % len(exts)]}').write_bytes(content)
+            n += 1
+    return n
@@ -0,0 +1,82 @@
+"""
+measures validation of generated dependency graphs by DependencyResolver.
+
+    python benchmarks/resolver.py [--sizes 1000,10000,100000] [--deps N] [--runs N] [--max-ratio R] [--queries N]
+"""
+import argparse
+import pathlib
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from ceryle.tasks.resolver import DependencyResolver  # noqa: E402
+from generators import generate, generate_modules  # noqa: E402
+
+
+def measure_queries(n):
+    """
+    form: [(<query: str>, <time in milliseconds: float>)]
+    """
+    index = DependencyResolver(generate_modules(n)).reachability_index()
+    last, mid = f'g{n - 1}', f'g{n // 2}'
+    queries = [
+        (f'why {last} g0', lambda: index.shortest_path(last, 'g0')),
+        (f'why {last} {mid}', lambda: index.shortest_path(last, mid)),
+        (f'deps {last} --flat', lambda: index.dependencies(last)),
+        (f'rdeps {mid} --flat', lambda: index.dependents(mid)),
+        (f'rdeps {mid}', lambda: index.dependents(mid, transitive=False)),
+    ]
+    res = []
+    for name, q in queries:
+        beg = time.perf_counter()
+        q()
+        res.append((name, (time.perf_counter() - beg) * 1000))
+    return res
+
+
+def measure(n, deps, runs=3):
+    """
+    returns the fastest of runs in milliseconds, which is the least disturbed by other processes.
+    """
+    groups = generate(n, deps=deps)
+    times = []
+    for _ in range(runs):
+        beg = time.perf_counter()
+        DependencyResolver(groups).validate()
+        times.append((time.perf_counter() - beg) * 1000)
+    return min(times)
+
+
+def run(sizes, deps=3, runs=3, max_ratio=1.5, queries=None):
+    if queries:
+        for name, t in measure_queries(queries):
+            print(f'{name:24}: {t:8.3f} ms')
+    results = [(n, measure(n, deps, runs=runs)) for n in sizes]
+    base_n, base_t = results[0]
+    for n, t in results:
+        ratio = (t / base_t) / (n / base_n)
+        print(f'{n:8} task groups: {t:10.1f} ms ({t * 1000 / n:6.1f} us/group, x{ratio:.2f} of linear)')
+    if max_ratio is not None:
+        n, t = results[-1]
+        if (t / base_t) / (n / base_n) > max_ratio:
+            print(f'validating {n} task groups grows more than x{max_ratio} of linear', file=sys.stderr)
+            return 1
+    return 0
+
+
+def main(argv):
+    p = argparse.ArgumentParser(prog='resolver')
+    p.add_argument('--sizes', default='1000,10000,100000', help='comma separated numbers of task groups')
+    p.add_argument('--deps', type=int, default=3, help='dependencies of each task group')
+    p.add_argument('--runs', type=int, default=3, help='runs of each size, the fastest is reported')
+    p.add_argument('--max-ratio', type=float, default=1.5,
+                   help='fail if time per group of the largest grows more than this, 1.5 by default')
+    p.add_argument('--queries', type=int, metavar='N', help='measure graph queries on N generated task groups')
+    args = p.parse_args(argv)
+    return run([int(s) for s in args.sizes.split(',')], deps=args.deps, runs=args.runs, max_ratio=args.max_ratio,
+               queries=args.queries)
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,105 @@
+"""
+measures startup time of the ceryle CLI against bare interpreter startup.
+
+    python benchmarks/startup.py [--runs N] [--max-overhead MS] [--importtime]
+"""
+import argparse
+import os
+import pathlib
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+TASK_FILE = '''
+default = 'foo'
+{
+    'foo': [command('echo foo')],
+    'bar': {'dependencies': ['foo'], 'tasks': [command('echo bar')]},
+}
+'''
+
+
+def _env(home):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([str(ROOT), *[p for p in [env.get('PYTHONPATH')] if p]])
+    env['HOME'] = str(home)
+    env['USERPROFILE'] = str(home)
+    return env
+
+
+def measure(cmd, cwd, env, runs):
+    """
+    returns the median wall time in milliseconds.
+    """
+    times = []
+    for _ in range(runs):
+        beg = time.perf_counter()
+        subprocess.run(cmd, cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        times.append((time.perf_counter() - beg) * 1000)
+    return statistics.median(times)
+
+
+def importtime(args, cwd, env):
+    """
+    form: [(<cumulative us: int>, <module: str>)] of ceryle modules, sorted in descending order
+    """
+    p = subprocess.run([sys.executable, '-X', 'importtime', '-m', 'ceryle', *args],
+                       cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                       universal_newlines=True)
+    res = []
+    for line in p.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, module = [c.strip() for c in line[len('import time:'):].split('|')]
+        if module.startswith('ceryle') and cumulative.isdigit():
+            res.append((int(cumulative), module))
+    return sorted(res, reverse=True)
+
+
+def run(runs=10, max_overhead=None, show_importtime=False):
+    with tempfile.TemporaryDirectory() as tmpd:
+        home = pathlib.Path(tmpd, 'home')
+        home.mkdir()
+        project = pathlib.Path(tmpd, 'project')
+        project.mkdir()
+        project.joinpath('CERYLE').write_text(TASK_FILE)
+        env = _env(home)
+
+        baseline = measure([sys.executable, '-c', 'pass'], project, env, runs)
+        results = [
+            (' '.join(args), measure([sys.executable, '-m', 'ceryle', *args], project, env, runs))
+            for args in [['--version'], ['--list-tasks']]
+        ]
+
+        print(f'python -c pass: {baseline:8.1f} ms')
+        for name, t in results:
+            print(f'ceryle {name}: {t:8.1f} ms (+{t - baseline:.1f} ms)')
+
+        if show_importtime:
+            print('cumulative import time of ceryle --version:')
+            for us, module in importtime(['--version'], project, env)[:15]:
+                print(f'  {us / 1000:8.1f} ms  {module}')
+
+        if max_overhead is not None:
+            over = [(name, t) for name, t in results if t - baseline > max_overhead]
+            for name, t in over:
+                print(f'ceryle {name} exceeds {max_overhead} ms overhead', file=sys.stderr)
+            return 1 if over else 0
+    return 0
+
+
+def main(argv):
+    p = argparse.ArgumentParser(prog='startup')
+    p.add_argument('--runs', type=int, default=10)
+    p.add_argument('--max-overhead', type=float, help='fail if overhead from bare startup exceeds this in ms')
+    p.add_argument('--importtime', action='store_true', help='show import time of ceryle modules')
+    args = p.parse_args(argv)
+    return run(runs=args.runs, max_overhead=args.max_overhead, show_importtime=args.importtime)
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,352 @@
+"""
+runs benchmarks on generated task files, dependency graphs and file trees, and compares them with a baseline.
+
+    python benchmarks/suite.py [--filter PATTERN] [--runs N] [--scale S] [--list]
+                               [--save FILE] [--compare FILE] [--threshold R]
+
+sizes of generated inputs are multiplied by --scale, e.g. --scale 25 walks a tree of 500k files by glob.walk.
+results are saved as a JSON baseline by --save, and --compare fails when a median is slower than the baseline
+by more than --threshold.
+"""
+import argparse
+import contextlib
+import fnmatch
+import json
+import os
+import pathlib
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+import ceryle  # noqa: E402
+import ceryle.util as util  # noqa: E402
+import ceryle.dsl.index  # noqa: E402
+from ceryle.commands.command import extract_cmd, split_cmd  # noqa: E402
+from ceryle.tasks.resolver import DependencyResolver  # noqa: E402
+
+import generators  # noqa: E402
+import startup  # noqa: E402
+import tokenizer  # noqa: E402
+
+BASELINE_VERSION = 1
+
+BENCHMARKS = []
+
+
+class Case:
+    """
+    run is measured, and setup is called before each run without being measured.
+    size is the number of items processed by a run, reported as throughput.
+    """
+
+    def __init__(self, run, setup=None, size=None, unit='items'):
+        self.run = run
+        self.setup = setup
+        self.size = size
+        self.unit = unit
+
+
+def benchmark(name):
+    """
+    registers a function which prepares a Case from a working directory and a scale.
+    """
+    def register(f):
+        BENCHMARKS.append((name, f))
+        return f
+    return register
+
+
+def _scaled(n, scale):
+    return max(1, int(n * scale))
+
+
+@contextlib.contextmanager
+def _quiet():
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+        yield
+
+
+class _Noop(ceryle.Executable):
+    def execute(self, *args, context=None, **kwargs):
+        return ceryle.ExecutionResult(0)
+
+    def __str__(self):
+        return 'noop'
+
+
+def _load_case(workdir, shape, n, extensions=0):
+    files = generators.write_task_files(workdir, shape, n)
+    ex_files = [] if not extensions else [
+        generators.write_extension(pathlib.Path(workdir, '.ceryle', 'extensions', 'ex.py'), functions=extensions)]
+    return Case(lambda: ceryle.load_task_files(files, ex_files, str(workdir)), size=n, unit='groups')
+
+
+@benchmark('load.layered')
+def load_layered(workdir, scale):
+    return _load_case(workdir, 'layered', _scaled(2000, scale))
+
+
+@benchmark('load.extensions')
+def load_extensions(workdir, scale):
+    return _load_case(workdir, 'layered', _scaled(200, scale), extensions=_scaled(2000, scale))
+
+
+@benchmark('load.lazy')
+def load_lazy(workdir, scale):
+    n = _scaled(2000, scale)
+    files = generators.write_task_files(workdir, 'modules', n)
+    index = ceryle.dsl.index.GroupIndex(pathlib.Path(workdir, 'group-index.json'))
+    index.select(files, target='g0')
+    index.save()
+    return Case(lambda: ceryle.load_task_files(files, [], str(workdir), target='g0', index=index),
+                size=n, unit='groups')
+
+
+def _validate_case(shape, n):
+    groups = generators.task_groups(shape, n)
+    resolvers = []
+    return Case(lambda: resolvers[-1].validate(),
+                setup=lambda: resolvers.append(DependencyResolver(groups)),
+                size=n, unit='groups')
+
+
+def _register_validate(shape, n):
+    @benchmark(f'validate.{shape}')
+    def validate(workdir, scale):
+        return _validate_case(shape, _scaled(n, scale))
+
+
+for _shape, _n in [('layered', 10000), ('modules', 10000), ('fan-out', 10000), ('fan-in', 10000), ('chain', 2000)]:
+    _register_validate(_shape, _n)
+
+
+@benchmark('resolver.reachability')
+def resolver_reachability(workdir, scale):
+    n = _scaled(10000, scale)
+    resolver = DependencyResolver(generators.generate_modules(n))
+    return Case(lambda: resolver.reachability_index().dependents('g0'), size=n, unit='groups')
+
+
+def _runner_case(shape, n):
+    groups = generators.task_groups(shape, n, tasks=lambda name: [ceryle.Task(_Noop())])
+    runner = ceryle.TaskRunner(groups)
+    target = 'g0' if shape == 'fan-out' else f'g{n - 1}'
+
+    def run():
+        with _quiet():
+            runner.run(target)
+    return Case(run, size=n, unit='groups')
+
+
+@benchmark('runner.fan-out')
+def runner_fan_out(workdir, scale):
+    return _runner_case('fan-out', _scaled(2000, scale))
+
+
+@benchmark('runner.modules')
+def runner_modules(workdir, scale):
+    return _runner_case('modules', _scaled(2000, scale))
+
+
+@benchmark('print_stream')
+def print_stream(workdir, scale):
+    n = _scaled(100000, scale)
+    lines = [f'{i:08} ' + 'x' * 71 + '\n' for i in range(n)]
+
+    def run():
+        with _quiet():
+            util.print_stream(lines)
+    return Case(run, size=n, unit='lines')
+
+
+@benchmark('tokenizer.split')
+def tokenizer_split(workdir, scale):
+    cmd = tokenizer.generate(tokenizer.WORDS['quoted'], _scaled(100 * 1024, scale))
+    return Case(lambda: extract_cmd(cmd), setup=split_cmd.cache_clear, size=len(cmd), unit='bytes')
+
+
+def _tree(workdir, scale, dirs=100, files_per_dir=50):
+    src = pathlib.Path(workdir, 'src')
+    n = generators.write_file_tree(src, dirs=_scaled(dirs, scale), files_per_dir=files_per_dir)
+    return src, n
+
+
+def _remove_dst(dst):
+    def setup():
+        shutil.rmtree(str(dst), ignore_errors=True)
+    return setup
+
+
+@benchmark('copy.tree')
+def copy_tree(workdir, scale):
+    _, n = _tree(workdir, scale)
+    copy = ceryle.Copy('src', 'dst')
+    return Case(lambda: copy.execute(context=str(workdir)), setup=_remove_dst(pathlib.Path(workdir, 'dst')),
+                size=n, unit='files')
+
+
+@benchmark('copy.glob')
+def copy_glob(workdir, scale):
+    _, n = _tree(workdir, scale)
+    copy = ceryle.Copy('src', 'dst', glob_pattern=['**/*.py'], exclude=['d1/**'])
+    return Case(lambda: copy.execute(context=str(workdir)), setup=_remove_dst(pathlib.Path(workdir, 'dst')),
+                size=n, unit='files')
+
+
+def _copied(src, dst):
+    def setup():
+        shutil.rmtree(str(dst), ignore_errors=True)
+        shutil.copytree(str(src), str(dst))
+    return setup
+
+
+@benchmark('remove.tree')
+def remove_tree(workdir, scale):
+    src, n = _tree(workdir, scale)
+    remove = ceryle.Remove('dst')
+    return Case(lambda: remove.execute(context=str(workdir)), setup=_copied(src, pathlib.Path(workdir, 'dst')),
+                size=n, unit='files')
+
+
+@benchmark('remove.glob')
+def remove_glob(workdir, scale):
+    src, n = _tree(workdir, scale)
+    remove = ceryle.Remove('dst/**/*.log', glob=True)
+    return Case(lambda: remove.execute(context=str(workdir)), setup=_copied(src, pathlib.Path(workdir, 'dst')),
+                size=n, unit='files')
+
+
+@benchmark('glob.walk')
+def glob_walk(workdir, scale):
+    src, n = _tree(workdir, scale, dirs=200, files_per_dir=100)
+    return Case(lambda: sum(1 for _ in util.walk_glob(src, ['**/*.py'], excludes=['d1/**', '**/f1*'])),
+                size=n, unit='files')
+
+
+@benchmark('glob.walk-pruned')
+def glob_walk_pruned(workdir, scale):
+    src, n = _tree(workdir, scale, dirs=200, files_per_dir=100)
+    return Case(lambda: sum(1 for _ in util.walk_glob(src, ['d0/d0/**/*.py'])), size=n, unit='files')
+
+
+@benchmark('startup.version')
+def startup_version(workdir, scale):
+    home = pathlib.Path(workdir, 'home')
+    home.mkdir()
+    pathlib.Path(workdir, 'CERYLE').write_text(startup.TASK_FILE)
+    env = startup._env(home)
+    cmd = [sys.executable, '-m', 'ceryle', '--version']
+    return Case(lambda: subprocess.run(cmd, cwd=str(workdir), env=env, stdout=subprocess.DEVNULL, check=True))
+
+
+def measure(case, runs):
+    times = []
+    for _ in range(runs):
+        case.setup and case.setup()
+        beg = time.perf_counter()
+        case.run()
+        times.append((time.perf_counter() - beg) * 1000)
+    return times
+
+
+def run_benchmarks(patterns, runs=5, scale=1.0):
+    """
+    form: {<name: str>: {'median_ms': <float>, 'min_ms': <float>, 'runs': <int>, 'size': <int>, 'unit': <str>}}
+    """
+    results = {}
+    for name, prepare in BENCHMARKS:
+        if patterns and not any([fnmatch.fnmatch(name, p) for p in patterns]):
+            continue
+        with tempfile.TemporaryDirectory() as tmpd:
+            case = prepare(pathlib.Path(tmpd), scale)
+            times = measure(case, runs)
+        median = statistics.median(times)
+        results[name] = {'median_ms': median, 'min_ms': min(times), 'runs': runs, 'size': case.size,
+                         'unit': case.unit}
+        rate = f', {case.size / median * 1000:12.0f} {case.unit}/s' if case.size else ''
+        print(f'{name:24} {median:10.2f} ms (min {min(times):10.2f} ms{rate})')
+    return results
+
+
+def save_baseline(path, results, scale):
+    doc = {
+        'version': BASELINE_VERSION,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'scale': scale,
+        'results': results,
+    }
+    with open(path, 'w') as fp:
+        json.dump(doc, fp, indent=2, sort_keys=True)
+
+
+def load_baseline(path, scale):
+    with open(path) as fp:
+        doc = json.load(fp)
+    if doc.get('version') != BASELINE_VERSION:
+        raise ValueError(f'unsupported baseline version: {doc.get("version")}')
+    if doc.get('scale') != scale:
+        print(f'warning: baseline is measured in scale {doc.get("scale")}, but {scale}', file=sys.stderr)
+    return doc['results']
+
+
+def compare(baseline, results, threshold):
+    """
+    returns names of benchmarks slower than baseline by more than threshold in ratio of medians.
+    """
+    regressions = []
+    for name, res in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f'{name:24} not in baseline')
+            continue
+        ratio = res['median_ms'] / base['median_ms']
+        mark = ''
+        if ratio > 1 + threshold:
+            mark = '  REGRESSION'
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            mark = '  improved'
+        print(f'{name:24} {base["median_ms"]:10.2f} -> {res["median_ms"]:10.2f} ms (x{ratio:.2f}){mark}')
+    return regressions
+
+
+def main(argv):
+    p = argparse.ArgumentParser(prog='suite')
+    p.add_argument('--filter', action='append', default=[], metavar='PATTERN',
+                   help='run benchmarks whose names match the glob PATTERN, e.g. validate.*')
+    p.add_argument('--runs', type=int, default=5)
+    p.add_argument('--scale', type=float, default=1.0, help='multiplier of generated input sizes')
+    p.add_argument('--list', action='store_true', help='list benchmarks')
+    p.add_argument('--save', metavar='FILE', help='save results as a baseline')
+    p.add_argument('--compare', metavar='FILE', help='compare results with a baseline')
+    p.add_argument('--threshold', type=float, default=0.2,
+                   help='ratio of a slower median to regard as a regression, 0.2 by default')
+    args = p.parse_args(argv)
+
+    if args.list:
+        for name, _ in BENCHMARKS:
+            print(name)
+        return 0
+
+    baseline = load_baseline(args.compare, args.scale) if args.compare else None
+    results = run_benchmarks(args.filter, runs=args.runs, scale=args.scale)
+    if args.save:
+        save_baseline(args.save, results, args.scale)
+    if baseline is not None:
+        print(f'compared with {args.compare}:')
+        regressions = compare(baseline, results, args.threshold)
+        if regressions:
+            print(f'regressions: {", ".join(regressions)}', file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,98 @@
+"""
+measures splitting of long command strings by extract_cmd.
+
+    python benchmarks/tokenizer.py [--size BYTES] [--runs N] [--escapes 10000,20000,40000] [--max-ratio R]
+"""
+import argparse
+import pathlib
+import shlex
+import statistics
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from ceryle.commands.command import extract_cmd, split_cmd  # noqa: E402
+
+WORDS = {
+    'plain': ['foo', '-a', '--opt=1', 'bar/baz'],
+    'quoted': ['"a b"', 'c', '"d e f"'],
+    'escaped': ['a\\"b', '\\"c', 'd'],
+}
+
+
+def escaped_argument(n):
+    """
+    a single argument with n escaped quotes, where the former recursive parser exceeded the recursion limit.
+    """
+    return 'echo ' + 'a\\"' * n
+
+
+def generate(words, size):
+    res = []
+    n = 0
+    while n < size:
+        w = words[len(res) % len(words)]
+        res.append(w)
+        n += len(w) + 1
+    return ' '.join(res)
+
+
+def measure(f, runs, aggregate=statistics.median):
+    """
+    returns the median wall time in milliseconds, or the one aggregated by aggregate.
+    """
+    times = []
+    for _ in range(runs):
+        split_cmd.cache_clear()
+        beg = time.perf_counter()
+        f()
+        times.append((time.perf_counter() - beg) * 1000)
+    return aggregate(times)
+
+
+def run(size=100 * 1024, runs=5, escapes=[10000, 20000, 40000], max_ratio=1.5):
+    for name, words in WORDS.items():
+        cmd = generate(words, size)
+        cold = measure(lambda: extract_cmd(cmd), runs)
+        split_cmd(cmd)
+        beg = time.perf_counter()
+        extract_cmd(cmd)
+        memoized = (time.perf_counter() - beg) * 1000
+        print(f'{name:8} {len(cmd) / 1024:6.1f} KB: {cold:8.2f} ms, memoized {memoized:6.2f} ms')
+        if name != 'escaped':
+            t = measure(lambda: extract_cmd(cmd, use_shlex=True), runs)
+            print(f'{name:8} {len(cmd) / 1024:6.1f} KB: {t:8.2f} ms (shlex)')
+            assert extract_cmd(cmd) == shlex.split(cmd)
+    results = []
+    for n in escapes:
+        cmd = escaped_argument(n)
+        # the fastest run is compared, which is the least disturbed by other processes
+        results.append((n, measure(lambda: extract_cmd(cmd), runs, aggregate=min)))
+    base_n, base_t = results[0]
+    for n, t in results:
+        ratio = (t / base_t) / (n / base_n)
+        print(f'escaped argument {n:7} escapes: {t:8.2f} ms (x{ratio:.2f} of linear)')
+    if max_ratio is not None:
+        n, t = results[-1]
+        if (t / base_t) / (n / base_n) > max_ratio:
+            print(f'splitting an argument with {n} escapes grows more than x{max_ratio} of linear', file=sys.stderr)
+            return 1
+    return 0
+
+
+def main(argv):
+    p = argparse.ArgumentParser(prog='tokenizer')
+    p.add_argument('--size', type=int, default=100 * 1024, help='length of generated command strings')
+    p.add_argument('--runs', type=int, default=5)
+    p.add_argument('--escapes', default='10000,20000,40000',
+                   help='comma separated numbers of escaped quotes in a single argument')
+    p.add_argument('--max-ratio', type=float, default=1.5,
+                   help='fail if time per escape of the largest grows more than this, 1.5 by default')
+    args = p.parse_args(argv)
+    return run(size=args.size, runs=args.runs, escapes=[int(n) for n in args.escapes.split(',')],
+               max_ratio=args.max_ratio)
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -1,3 +1,5 @@
+import sys
+
 __version__ = '0.4.1'
 
 class CeryleException(Exception):
@@ -12,25 +14,64 @@ class IllegalFormat(Exception):
     pass
 
 
-from .commands.executable import executable, executable_with, Executable, ExecutionResult
-from .commands.command import Command, CommandFormatError
-from .commands.copy import Copy
-from .commands.remove import Remove
-from .commands.builtin import save_input_to
-from .tasks import TaskDefinitionError, TaskDependencyError, TaskIOError
-from .tasks.task import Task, TaskGroup
-from .tasks.condition import Condition
-from .tasks.resolver import DependencyResolver, DependencyChain
-from .tasks.runner import TaskRunner, RunCache
-from .dsl import TaskFileError, NoArgumentError, NoEnvironmentError
-from .dsl.loader import TaskFileLoader, ExtensionLoader, TaskDefinition
-from .dsl.aggregate_loader import AggregateTaskFileLoader, load_task_files
+# public names are imported lazily on first access to keep startup of the CLI fast
+_LAZY_ATTRS = [
+    ('ceryle.commands.executable', ['executable', 'executable_with', 'Executable', 'ExecutionResult']),
+    ('ceryle.commands.command', ['Command', 'CommandFormatError']),
+    ('ceryle.commands.copy', ['Copy']),
+    ('ceryle.commands.remove', ['Remove']),
+    ('ceryle.commands.archive', ['Archive', 'Extract']),
+    ('ceryle.commands.checksum', ['Checksum']),
+    ('ceryle.commands.builtin', ['save_input_to']),
+    ('ceryle.tasks', ['TaskDefinitionError', 'TaskDependencyError', 'TaskIOError', 'ChangeDetectionError']),
+    ('ceryle.tasks.task', ['Task', 'TaskGroup']),
+    ('ceryle.tasks.condition', ['Condition']),
+    ('ceryle.tasks.resolver', ['DependencyResolver', 'DependencyChain']),
+    ('ceryle.tasks.runner', ['TaskRunner', 'RunCache']),
+    ('ceryle.dsl', ['TaskFileError', 'NoArgumentError', 'NoEnvironmentError', 'BundleError']),
+    ('ceryle.dsl.loader', ['TaskFileLoader', 'ExtensionLoader', 'TaskDefinition']),
+    ('ceryle.dsl.aggregate_loader', ['AggregateTaskFileLoader', 'load_task_files']),
+]
+_LAZY_MODULES = dict([(name, module) for module, names in _LAZY_ATTRS for name in names])
+
+
+def __getattr__(name):
+    module = _LAZY_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    import importlib
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted([*globals(), *_LAZY_MODULES])
+
+
+if sys.version_info < (3, 7):
+    # module level __getattr__ is not supported (PEP 562)
+    for _name in _LAZY_MODULES:
+        __getattr__(_name)
 
 import datetime as dt
 import logging
 import pathlib
 
 
+class DeferredFileHandler(logging.FileHandler):
+    """
+    file handler creating its directory and file when the first record is emitted.
+    """
+
+    def __init__(self, filename):
+        super().__init__(filename, delay=True)
+
+    def _open(self):
+        pathlib.Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
+
+
 def configure_logging(level=logging.INFO, console=False, filename=None):
     import ceryle.const as const
     import ceryle.util as util
@@ -42,12 +83,8 @@ def configure_logging(level=logging.INFO, console=False, filename=None):
         util.print_err(f'{logdir} already exists but not a directory.',
                        'log is not saved.')
     else:
-        logdir.mkdir(parents=True, exist_ok=True)
         handlers.append(
-            logging.FileHandler(pathlib.Path.home().joinpath(
-                const.CERYLE_DIR,
-                'logs',
-                filename or dt.datetime.now().strftime('%Y%m%d-%H%M%S%f.log'))))
+            DeferredFileHandler(logdir.joinpath(filename or dt.datetime.now().strftime('%Y%m%d-%H%M%S%f.log'))))
 
     if console:
         handlers.append(logging.StreamHandler())
@@ -0,0 +1,344 @@
+import gzip
+import logging
+import lzma
+import os
+import pathlib
+import shutil
+import stat
+import struct
+import tarfile
+import tempfile
+import zipfile
+import zlib
+
+from concurrent.futures import ThreadPoolExecutor
+
+import ceryle.util as util
+from ceryle.commands.executable import Executable, ExecutionResult
+from ceryle.dsl.support import ArgumentBase
+
+logger = logging.getLogger(__name__)
+
+TAR = 'tar'
+TAR_GZ = 'tar.gz'
+TAR_XZ = 'tar.xz'
+ZIP = 'zip'
+FORMATS = [TAR, TAR_GZ, TAR_XZ, ZIP]
+
+_SUFFIXES = [
+    ('.tar.gz', TAR_GZ),
+    ('.tgz', TAR_GZ),
+    ('.tar.xz', TAR_XZ),
+    ('.txz', TAR_XZ),
+    ('.tar', TAR),
+    ('.zip', ZIP),
+]
+
+CHUNK_SIZE = 1024 * 1024
+SPOOL_SIZE = 8 * 1024 * 1024
+
+
+class Archive(Executable):
+    def __init__(self, src, dst, format=None, glob_pattern=None, exclude=None, level=6):
+        self._src = util.assert_type(src, str, pathlib.Path, ArgumentBase)
+        self._dst = util.assert_type(dst, str, pathlib.Path, ArgumentBase)
+        self._format = _assert_format(format)
+        self._glob = util.to_patterns(glob_pattern)
+        self._exclude = util.to_patterns(exclude)
+        self._level = util.assert_type(level, int)
+
+    def execute(self, *args, context=None, **kwargs):
+        [src, dst], _ = self.preprocess([self._src, self._dst], {})
+        srcpath = pathlib.Path(context, src)
+        dstpath = pathlib.Path(context, dst)
+
+        if not srcpath.exists():
+            util.print_err(f'archive source not found: {self._src}')
+            return ExecutionResult(1)
+        fmt = self._format or guess_format(dstpath)
+        if fmt is None:
+            util.print_err(f'could not determine archive format of {self._dst}, specify format')
+            return ExecutionResult(1)
+
+        # the archive itself is not a member if it is written into the source, e.g. by the last run
+        dst_resolved = _resolved(dstpath)
+        members = [(n, p) for n, p in collect_members(srcpath, self._glob, self._exclude)
+                   if _resolved(p) != dst_resolved]
+        logger.info(f'archiving {len(members)} member(s) {self._src} to {self._dst} ({fmt})')
+        dstpath.parent.mkdir(parents=True, exist_ok=True)
+        if fmt == ZIP:
+            _write_zip(dstpath, members, self._level)
+        else:
+            _write_tar(dstpath, members, fmt, self._level)
+        return ExecutionResult(0, stdout=[f'archived {len(members)} member(s) to {dst}'])
+
+    def __str__(self):
+        opts = [f'src={self._src}', f'dst={self._dst}']
+        if self._format:
+            opts.append(f'format={self._format}')
+        if self._glob:
+            opts.append(f'glob={self._glob}')
+        if self._exclude:
+            opts.append(f'exclude={self._exclude}')
+        return f'archive({", ".join(opts)})'
+
+
+class Extract(Executable):
+    def __init__(self, src, dst, format=None):
+        self._src = util.assert_type(src, str, pathlib.Path, ArgumentBase)
+        self._dst = util.assert_type(dst, str, pathlib.Path, ArgumentBase)
+        self._format = _assert_format(format)
+
+    def execute(self, *args, context=None, **kwargs):
+        [src, dst], _ = self.preprocess([self._src, self._dst], {})
+        srcpath = pathlib.Path(context, src)
+        dstpath = pathlib.Path(context, dst)
+
+        if not srcpath.is_file():
+            util.print_err(f'archive not found: {self._src}')
+            return ExecutionResult(1)
+        fmt = self._format or guess_format(srcpath)
+        if fmt is None:
+            util.print_err(f'could not determine archive format of {self._src}, specify format')
+            return ExecutionResult(1)
+
+        logger.info(f'extracting {self._src} to {self._dst} ({fmt})')
+        dstpath.mkdir(parents=True, exist_ok=True)
+        try:
+            if fmt == ZIP:
+                with zipfile.ZipFile(srcpath) as zf:
+                    zf.extractall(dstpath)
+            else:
+                with tarfile.open(srcpath, 'r:*') as tf:
+                    _extract_tar(tf, dstpath)
+        except (tarfile.TarError, zipfile.BadZipFile, OSError) as e:
+            util.print_err(f'failed to extract {self._src}: {e}')
+            return ExecutionResult(1)
+        return ExecutionResult(0)
+
+    def __str__(self):
+        if self._format:
+            return f'extract(src={self._src}, dst={self._dst}, format={self._format})'
+        return f'extract(src={self._src}, dst={self._dst})'
+
+
+def _assert_format(fmt):
+    if util.assert_type(fmt, None, str) is not None and fmt not in FORMATS:
+        raise ValueError(f'unknown archive format: {fmt}, must be one of {", ".join(FORMATS)}')
+    return fmt
+
+
+def guess_format(path):
+    name = pathlib.Path(path).name.lower()
+    for suffix, fmt in _SUFFIXES:
+        if name.endswith(suffix):
+            return fmt
+    return None
+
+
+def collect_members(srcpath, includes=None, excludes=None):
+    """
+    collects archive members in sorted order so that the archive is reproducible.
+    form: [(<arcname: str>, <path: pathlib.Path>)]
+    """
+    if not srcpath.is_dir():
+        return [(srcpath.name, srcpath)]
+
+    matcher = util.GlobMatcher(includes or ['**/*'], excludes=excludes or [])
+    members = {}
+
+    def add_tree(p):
+        members[p.relative_to(srcpath).as_posix()] = p
+        if p.is_dir() and not p.is_symlink():
+            for c in p.iterdir():
+                if not matcher.is_excluded(c.relative_to(srcpath), is_dir=c.is_dir()):
+                    add_tree(c)
+
+    for p in matcher.walk(srcpath, descend_matched=False):
+        if p == srcpath:
+            for c in p.iterdir():
+                if not matcher.is_excluded(c.relative_to(srcpath), is_dir=c.is_dir()):
+                    add_tree(c)
+            continue
+        parent = p.parent
+        while parent != srcpath:
+            members.setdefault(parent.relative_to(srcpath).as_posix(), parent)
+            parent = parent.parent
+        add_tree(p)
+    return sorted(members.items())
+
+
+def _resolved(path):
+    # the last component is not resolved, so that a symlink member is not taken for its target
+    return pathlib.Path(os.path.realpath(path.parent), path.name)
+
+
+def _normalized_mode(path):
+    if path.is_dir():
+        return 0o755
+    return 0o755 if os.stat(path).st_mode & stat.S_IXUSR else 0o644
+
+
+def _write_tar(dstpath, members, fmt, level):
+    with open(dstpath, 'wb') as fp:
+        if fmt == TAR_GZ:
+            # mtime and file name are fixed in gzip header for reproducibility
+            with gzip.GzipFile(filename='', mode='wb', fileobj=fp, compresslevel=level, mtime=0) as gz:
+                _write_tar_stream(gz, members)
+        elif fmt == TAR_XZ:
+            with lzma.LZMAFile(fp, mode='wb', preset=min(level, 9)) as xz:
+                _write_tar_stream(xz, members)
+        else:
+            _write_tar_stream(fp, members)
+
+
+def _write_tar_stream(fileobj, members):
+    with tarfile.open(fileobj=fileobj, mode='w|', format=tarfile.PAX_FORMAT) as tf:
+        for arcname, path in members:
+            ti = tarfile.TarInfo(arcname)
+            ti.mtime = 0
+            ti.uid = ti.gid = 0
+            ti.uname = ti.gname = ''
+            if path.is_symlink():
+                ti.type = tarfile.SYMTYPE
+                ti.linkname = os.readlink(path)
+                ti.mode = 0o777
+                tf.addfile(ti)
+            elif path.is_dir():
+                ti.type = tarfile.DIRTYPE
+                ti.mode = 0o755
+                tf.addfile(ti)
+            else:
+                ti.mode = _normalized_mode(path)
+                ti.size = os.stat(path).st_size
+                with open(path, 'rb') as src:
+                    tf.addfile(ti, src)
+
+
+def _extract_tar(tf, dstpath):
+    if hasattr(tarfile, 'data_filter'):
+        tf.extractall(dstpath, filter='data')
+        return
+    # members are checked one by one after extracting preceding ones,
+    # so that a path through a link extracted earlier is resolved as well
+    root = os.path.realpath(dstpath)
+    for m in tf.getmembers():
+        if not (m.isfile() or m.isdir() or m.issym() or m.islnk()):
+            raise tarfile.TarError(f'unsupported member type: {m.name}')
+        _assert_within(root, os.path.join(root, m.name), m.name)
+        if m.issym():
+            _assert_within(root, os.path.join(root, os.path.dirname(m.name), m.linkname), m.name)
+        elif m.islnk():
+            _assert_within(root, os.path.join(root, m.linkname), m.name)
+        tf.extract(m, dstpath, set_attrs=not m.isdir())
+
+
+def _assert_within(root, path, name):
+    target = os.path.realpath(path)
+    if os.path.isabs(name) or os.path.commonpath([root, target]) != root:
+        raise tarfile.TarError(f'illegal member path: {name}')
+
+
+def _write_zip(dstpath, members, level, max_workers=None):
+    workers = max_workers or util.default_workers()
+    with open(dstpath, 'wb') as fp, ThreadPoolExecutor(max_workers=workers) as executor:
+        writer = _ZipWriter(fp)
+        files = [(n, p) for n, p in members if not p.is_dir()]
+        futures = {}
+        # compressing ahead is bounded by the number of workers to limit spooled temporary data
+        ahead = 0
+        for arcname, path in members:
+            if path.is_dir():
+                writer.add_dir(arcname + '/')
+                continue
+            while ahead < len(files) and len(futures) < workers * 2:
+                n, p = files[ahead]
+                futures[n] = executor.submit(_deflate, p, level)
+                ahead += 1
+            compressed = futures.pop(arcname).result()
+            try:
+                writer.add_file(arcname, _normalized_mode(path), *compressed)
+            finally:
+                compressed[0].close()
+        writer.close()
+
+
+def _deflate(path, level):
+    out = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)
+    co = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    crc = 0
+    size = 0
+    with open(path, 'rb') as fp:
+        for chunk in iter(lambda: fp.read(CHUNK_SIZE), b''):
+            crc = zlib.crc32(chunk, crc)
+            size += len(chunk)
+            out.write(co.compress(chunk))
+    out.write(co.flush())
+    compressed_size = out.tell()
+    out.seek(0)
+    return out, crc, size, compressed_size
+
+
+# fixed timestamp 1980-01-01 00:00:00 in MS-DOS format
+_DOS_TIME = 0
+_DOS_DATE = (1 << 5) | 1
+_ZIP64_LIMIT = 0xFFFFFFFF
+_UTF8_FLAG = 0x800
+
+
+class _ZipWriter:
+    """
+    minimal zip writer accepting already deflated member data.
+    """
+
+    def __init__(self, fp):
+        self._fp = fp
+        self._entries = []
+
+    def add_dir(self, arcname):
+        mode = stat.S_IFDIR | 0o755
+        self._add(arcname, (mode << 16) | 0x10, zipfile.ZIP_STORED, None, 0, 0, 0)
+
+    def add_file(self, arcname, mode, data, crc, size, compressed_size):
+        self._add(arcname, (stat.S_IFREG | mode) << 16, zipfile.ZIP_DEFLATED, data, crc, size, compressed_size)
+
+    def _add(self, arcname, external_attr, method, data, crc, size, compressed_size):
+        name = arcname.encode('utf-8')
+        offset = self._fp.tell()
+        zip64 = size >= _ZIP64_LIMIT or compressed_size >= _ZIP64_LIMIT
+        extra = struct.pack('<HHQQ', 1, 16, size, compressed_size) if zip64 else b''
+        self._fp.write(struct.pack(
+            '<IHHHHHIIIHH', 0x04034b50, 45 if zip64 else 20, _UTF8_FLAG, method, _DOS_TIME, _DOS_DATE, crc,
+            _ZIP64_LIMIT if zip64 else compressed_size, _ZIP64_LIMIT if zip64 else size, len(name), len(extra)))
+        self._fp.write(name)
+        self._fp.write(extra)
+        if data is not None:
+            shutil.copyfileobj(data, self._fp, CHUNK_SIZE)
+        self._entries.append((name, external_attr, method, crc, size, compressed_size, offset))
+
+    def close(self):
+        cd_offset = self._fp.tell()
+        for name, external_attr, method, crc, size, compressed_size, offset in self._entries:
+            large = max(size, compressed_size) >= _ZIP64_LIMIT
+            far = offset >= _ZIP64_LIMIT
+            values = ([size, compressed_size] if large else []) + ([offset] if far else [])
+            extra = struct.pack(f'<HH{len(values)}Q', 1, 8 * len(values), *values) if values else b''
+            self._fp.write(struct.pack(
+                '<IHHHHHHIIIHHHHHII', 0x02014b50, (3 << 8) | 45, 45 if extra else 20, _UTF8_FLAG, method,
+                _DOS_TIME, _DOS_DATE, crc,
+                _ZIP64_LIMIT if large else compressed_size, _ZIP64_LIMIT if large else size,
+                len(name), len(extra), 0, 0, 0, external_attr, _ZIP64_LIMIT if far else offset))
+            self._fp.write(name)
+            self._fp.write(extra)
+        cd_end = self._fp.tell()
+        cd_size = cd_end - cd_offset
+        count = len(self._entries)
+        if count >= 0xFFFF or cd_offset >= _ZIP64_LIMIT or cd_size >= _ZIP64_LIMIT:
+            self._fp.write(struct.pack(
+                '<IQHHIIQQQQ', 0x06064b50, 44, 45, 45, 0, 0, count, count, cd_size, cd_offset))
+            self._fp.write(struct.pack('<IIQI', 0x07064b50, 0, cd_end, 1))
+            self._fp.write(struct.pack(
+                '<IHHHHIIH', 0x06054b50, 0, 0, min(count, 0xFFFF), min(count, 0xFFFF),
+                min(cd_size, _ZIP64_LIMIT), min(cd_offset, _ZIP64_LIMIT), 0))
+        else:
+            self._fp.write(struct.pack('<IHHHHIIH', 0x06054b50, 0, 0, count, count, cd_size, cd_offset, 0))
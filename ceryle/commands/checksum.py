@@ -0,0 +1,162 @@
+import hashlib
+import json
+import logging
+import os
+import pathlib
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import ceryle.util as util
+from ceryle.commands.executable import Executable, ExecutionResult
+from ceryle.dsl.support import ArgumentBase
+
+logger = logging.getLogger(__name__)
+
+BUFFER_SIZE = 1024 * 1024
+
+
+class Checksum(Executable):
+    def __init__(self, path, glob_pattern=None, exclude=None, algo='sha256', manifest=None, verify=False):
+        self._path = util.assert_type(path, str, pathlib.Path, ArgumentBase)
+        self._glob = util.to_patterns(glob_pattern)
+        self._exclude = util.to_patterns(exclude)
+        self._algo = util.assert_type(algo, str)
+        if self._algo not in hashlib.algorithms_available:
+            raise ValueError(f'unsupported hash algorithm: {algo}')
+        self._manifest = util.assert_type(manifest, None, str, pathlib.Path, ArgumentBase)
+        self._verify = util.assert_type(verify, bool)
+        if self._verify and self._manifest is None:
+            raise ValueError('manifest is required to verify checksums')
+
+    def execute(self, *args, context=None, **kwargs):
+        [path, manifest], _ = self.preprocess([self._path, self._manifest], {})
+        root = pathlib.Path(context, path)
+        manifest_path = manifest and pathlib.Path(context, manifest)
+
+        if not root.exists():
+            util.print_err(f'checksum target not found: {self._path}')
+            return ExecutionResult(1)
+
+        # the manifest is not hashed into itself when it is written in the hashed tree
+        skip = manifest_path and relative_within(root, manifest_path)
+
+        if self._verify:
+            return self._verify_manifest(root, manifest_path, skip)
+
+        files = [f for f in collect_files(root, self._glob, self._exclude) if f != skip]
+        logger.info(f'calculating {self._algo} of {len(files)} file(s) in {self._path}')
+        digests = hash_files(root, files, self._algo)
+        if manifest_path:
+            write_manifest(manifest_path, self._algo, digests)
+        return ExecutionResult(0, stdout=[f'{d}  {f}' for f, d in sorted(digests.items())])
+
+    def _verify_manifest(self, root, manifest_path, skip=None):
+        if not manifest_path.is_file():
+            util.print_err(f'manifest not found: {self._manifest}')
+            return ExecutionResult(1)
+        algo, expected = read_manifest(manifest_path)
+        expected = dict([(f, d) for f, d in expected.items() if f != skip])
+        logger.info(f'verifying {algo} of {len(expected)} file(s) in {self._path}')
+        mismatch = verify_files(root, expected, algo)
+        if mismatch:
+            msg = f'checksum mismatch: {mismatch}'
+            util.print_err(msg)
+            return ExecutionResult(1, stderr=[msg])
+        return ExecutionResult(0, stdout=[f'{len(expected)} file(s) OK'])
+
+    def __str__(self):
+        opts = [str(self._path)]
+        if self._glob:
+            opts.append(f'glob={self._glob}')
+        if self._exclude:
+            opts.append(f'exclude={self._exclude}')
+        opts.append(f'algo={self._algo}')
+        if self._manifest:
+            opts.append(f'manifest={self._manifest}')
+        if self._verify:
+            opts.append('verify=True')
+        return f'checksum({", ".join(opts)})'
+
+
+def collect_files(root, includes=None, excludes=None):
+    """
+    form: [<relative path in posix form: str>]
+    """
+    if not root.is_dir():
+        return [root.name]
+    matcher = util.GlobMatcher(includes or ['**/*'], excludes=excludes or [])
+    return sorted([p.relative_to(root).as_posix() for p in matcher.walk(root) if p.is_file()])
+
+
+def relative_within(root, path):
+    """
+    returns path relative to root directory in posix form if it is within root, otherwise None.
+    """
+    if not root.is_dir():
+        return None
+    root = pathlib.Path(os.path.realpath(root))
+    path = pathlib.Path(os.path.realpath(path.parent), path.name)
+    try:
+        return path.relative_to(root).as_posix()
+    except ValueError:
+        return None
+
+
+def file_digest(path, algo):
+    h = hashlib.new(algo)
+    buf = bytearray(BUFFER_SIZE)
+    view = memoryview(buf)
+    with open(path, 'rb', buffering=0) as fp:
+        while True:
+            n = fp.readinto(buf)
+            if not n:
+                break
+            h.update(view[:n])
+    return h.hexdigest()
+
+
+def _resolve(root, f):
+    return root if not root.is_dir() else root.joinpath(f)
+
+
+def hash_files(root, files, algo):
+    """
+    form: { <relative path: str>: <hex digest: str> }
+    """
+    with ThreadPoolExecutor(max_workers=util.default_workers()) as executor:
+        digests = executor.map(lambda f: file_digest(_resolve(root, f), algo), files)
+        return dict(zip(files, digests))
+
+
+def verify_files(root, expected, algo):
+    """
+    returns the first file whose digest does not match, or None when all files match.
+    """
+    def check(f):
+        p = _resolve(root, f)
+        if not p.is_file():
+            return f, False
+        return f, file_digest(p, algo) == expected[f]
+
+    with ThreadPoolExecutor(max_workers=util.default_workers()) as executor:
+        futures = [executor.submit(check, f) for f in sorted(expected)]
+        for fut in as_completed(futures):
+            f, ok = fut.result()
+            if not ok:
+                for other in futures:
+                    other.cancel()
+                return f
+    return None
+
+
+def write_manifest(path, algo, digests):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as fp:
+        json.dump({'algorithm': algo, 'files': digests}, fp, indent=2, sort_keys=True)
+        fp.write('\n')
+
+
+def read_manifest(path):
+    with open(path) as fp:
+        m = json.load(fp)
+    return m['algorithm'], m['files']
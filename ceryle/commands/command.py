@@ -1,7 +1,9 @@
+import functools
 import logging
 import os
 import pathlib
 import re
+import shlex
 import subprocess
 
 from concurrent.futures import ThreadPoolExecutor
@@ -15,8 +17,8 @@ logger = logging.getLogger(__name__)
 
 
 class Command(Executable):
-    def __init__(self, cmd, cwd=None, inputs_as_args=False, quiet=False, env={}):
-        self._cmd = extract_cmd(cmd)
+    def __init__(self, cmd, cwd=None, inputs_as_args=False, quiet=False, env={}, shlex=False):
+        self._cmd = extract_cmd(cmd, use_shlex=util.assert_type(shlex, bool))
         self._cwd = util.assert_type(cwd, None, str, pathlib.Path, ArgumentBase)
         self._as_args = util.assert_type(inputs_as_args, bool)
         self._quiet = quiet
@@ -35,18 +37,23 @@ class Command(Executable):
                 communicate = True
         logger.debug(f'actual command: {cmd}')
         logger.debug(f'additional environment variables: {env}')
-        proc = subprocess.Popen(
-            ['cmd', '/C', *cmd] if util.is_win() else cmd,
-            cwd=self._get_cwd(context),
-            env=self._with_os_env(env),
-            stdin=subprocess.PIPE if communicate else None,
-            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        if communicate:
-            stds = proc.communicate(input=os.linesep.join(inputs).encode(), timeout=timeout)
-            o, e = print_std_streams(*[std.decode().rstrip().split(os.linesep) for std in stds], quiet=self._quiet)
-        else:
-            o, e = print_std_streams(proc.stdout, proc.stderr, quiet=self._quiet)
-            proc.wait()
+        with util.trace_span(cmd_log, cat='process') as span:
+            with util.trace_span('spawn', cat='process'):
+                proc = subprocess.Popen(
+                    ['cmd', '/C', *cmd] if util.is_win() else cmd,
+                    cwd=self._get_cwd(context),
+                    env=self._with_os_env(env),
+                    stdin=subprocess.PIPE if communicate else None,
+                    stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            span.set(pid=proc.pid)
+            if communicate:
+                stds = proc.communicate(input=os.linesep.join(inputs).encode(), timeout=timeout)
+                o, e = print_std_streams(*[std.decode().rstrip().split(os.linesep) for std in stds],
+                                         quiet=self._quiet)
+            else:
+                o, e = print_std_streams(proc.stdout, proc.stderr, quiet=self._quiet)
+                proc.wait()
+            span.set(return_code=proc.returncode)
 
         res = ExecutionResult(proc.returncode, stdout=o, stderr=e)
         logger.info(f'finished with {proc.returncode} {cmd_log}')
@@ -110,19 +117,14 @@ def quote_if_needed(s):
     return str(s)
 
 
-def extract_cmd(cmd):
+def extract_cmd(cmd, use_shlex=False):
+    """
+    splits a command string into arguments.
+    by default, arguments are separated by spaces and an argument is enclosed by double quotes to contain spaces,
+    \\" is kept as is. when use_shlex is True, a command string is split by the syntax of POSIX shells.
+    """
     if isinstance(cmd, str):
-        trimmed = cmd.strip()
-        seed = 0
-        parts = []
-        while seed >= 0:
-            s, seed = next_part(trimmed)
-            if s is None:
-                if seed is None:
-                    raise CommandFormatError(f'invalid command format: [{cmd}]')
-                break
-            parts.append(s)
-            trimmed = trimmed[seed:].lstrip()
+        parts = list(_split_shlex(cmd) if use_shlex else split_cmd(cmd))
     elif isinstance(cmd, ArgumentBase):
         parts = [cmd]
     else:
@@ -132,31 +134,94 @@ def extract_cmd(cmd):
     return parts
 
 
-def next_part(cmdstr):
-    if len(cmdstr) == 0:
-        return None, -1
-
-    m = re.search(r'[ "]', cmdstr)
-    if m:
-        span = m.span()
-        if m.group() == '"':
-            if cmdstr[span[0] - 1] == '\\':
-                s, seed = next_part(cmdstr[span[1]:])
-                if s is None:
-                    return f'{cmdstr[:span[0]]}"', seed
-                return f'{cmdstr[:span[0]]}"{s}', (span[1] + seed) if seed > -1 else seed
-            m2 = re.search('"', cmdstr[span[1]:])
-            if m2 is None:
-                return None, None
-            span2 = m2.span()
-            return cmdstr[span[1]:span2[0] + 1], span2[1] + 1
-        return cmdstr[:span[0]], span[1]
-    return cmdstr.strip(), -1
+_DELIMITER = re.compile(r'[ "]')
+
+
+@functools.lru_cache(maxsize=1024)
+def split_cmd(cmd):
+    """
+    splits a command string in a single pass.
+    results are memoized since the same command strings are often declared repeatedly.
+    form: (<argument: str>, ...)
+    """
+    s = cmd.strip()
+    # a quote at the beginning of an argument following an escaped quote is regarded as escaped by the last char
+    escaped_at_end = s.endswith('\\')
+    parts = []
+    pos = 0
+    while True:
+        part, seed = _next_part(s, pos, escaped_at_end)
+        if seed is None:
+            raise CommandFormatError(f'invalid command format: [{cmd}]')
+        if part is None:
+            break
+        parts.append(part)
+        if seed < 0:
+            break
+        pos += seed
+        while pos < len(s) and s[pos].isspace():
+            pos += 1
+    return tuple(parts)
+
+
+def _next_part(s, start, escaped_at_end):
+    """
+    reads an argument from start.
+    form: (<argument: str or None if not found>, <length read: int, -1 if read to the end, or None if not closed>)
+    """
+    # pieces before escaped quotes are joined once, rebuilding the argument for each of them is quadratic
+    prefix = []
+    skipped = 0
+    base = start
+    while True:
+        if base >= len(s):
+            part, seed = None, -1
+            break
+        m = _DELIMITER.search(s, base)
+        if m is None:
+            part, seed = s[base:].strip(), -1
+            break
+        i = m.start()
+        if m.group() == ' ':
+            part, seed = s[base:i], i + 1 - base
+            break
+        if s[i - 1] == '\\' if i > base else escaped_at_end:
+            # \" does not quote, continues reading the argument
+            prefix.append(s[base:i])
+            skipped += i + 1 - base
+            base = i + 1
+            continue
+        j = s.find('"', i + 1)
+        if j < 0:
+            part, seed = None, None
+            break
+        rel = j - i - 1
+        part, seed = s[i + 1:base + rel + 1], rel + 2
+        break
+
+    if prefix:
+        prefix.append('' if part is None else part)
+        part = '"'.join(prefix)
+        if seed is not None and seed > -1:
+            seed += skipped
+    return part, seed
+
+
+def _split_shlex(cmd):
+    try:
+        return shlex.split(cmd)
+    except ValueError as e:
+        raise CommandFormatError(f'invalid command format: [{cmd}], {e}')
 
 
 def print_std_streams(stdout, stderr, quiet=False):
     with ThreadPoolExecutor(max_workers=2) as executor:
-        return executor.map(util.print_stream, [stdout, stderr], [False, True],  [quiet, False])
+        return executor.map(_print_stream, [stdout, stderr], [False, True],  [quiet, False])
+
+
+def _print_stream(s, error, quiet):
+    with util.trace_span('read stderr' if error else 'read stdout', cat='process'):
+        return util.print_stream(s, error=error, quiet=quiet)
 
 
 class CommandFormatError(CeryleException):
@@ -1,4 +1,6 @@
+import errno
 import logging
+import os
 import pathlib
 import shutil
 
@@ -6,58 +8,235 @@ import ceryle.util as util
 from ceryle.commands.executable import Executable, ExecutionResult
 from ceryle.dsl.support import ArgumentBase
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
 logger = logging.getLogger(__name__)
 
+COPY = 'copy'
+HARDLINK = 'hardlink'
+REFLINK = 'reflink'
+AUTO = 'auto'
+STRATEGIES = [COPY, HARDLINK, REFLINK, AUTO]
+
+# ioctl request number of FICLONE (linux/fs.h)
+FICLONE = 0x40049409
+
+_FALLBACK_ERRNOS = {
+    errno.EXDEV,
+    errno.EPERM,
+    errno.EINVAL,
+    errno.ENOTTY,
+    errno.EOPNOTSUPP,
+    errno.EMLINK,
+    errno.ENOSYS,
+}
+
 
 class Copy(Executable):
-    def __init__(self, src, dst, glob_pattern=None):
+    def __init__(self, src, dst, glob_pattern=None, exclude=None, strategy=COPY):
         self._src = util.assert_type(src, str, pathlib.Path, ArgumentBase)
         self._dst = util.assert_type(dst, str, pathlib.Path, ArgumentBase)
-        self._glob = util.assert_type(glob_pattern, None, str)
+        self._glob = util.to_patterns(glob_pattern)
+        self._exclude = util.to_patterns(exclude)
+        self._strategy = util.assert_type(strategy, str)
+        if self._strategy not in STRATEGIES:
+            raise ValueError(f'unknown copy strategy: {strategy}, must be one of {", ".join(STRATEGIES)}')
 
     def execute(self, *args, context=None, **kwargs):
-        [src, dst], _ = self.preprocess([self._src, self._dst], {})
-        srcpath = pathlib.Path(context, src)
-        dstpath = pathlib.Path(context, dst)
-
+        srcpath, dstpath = self._paths(context)
         if not srcpath.exists():
             util.print_err(f'copy source not found: {self._src}')
             return ExecutionResult(1)
 
-        if self._glob:
-            logger.info(f'copying file(s) {self._src} to {self._dst} (glob: {self._glob})')
-            _copy_glob(srcpath, dstpath, self._glob)
+        plan = self._plan(srcpath, dstpath)
+        if self._glob or self._exclude:
+            logger.info(f'copying {len(plan.files)} file(s) {self._src} to {self._dst} '
+                        f'(glob: {self._glob}, exclude: {self._exclude}, strategy: {self._strategy})')
+        else:
+            logger.info(f'copying {len(plan.files)} file(s) {self._src} to {self._dst} (strategy: {self._strategy})')
+        copier = FileCopier(self._strategy)
+        plan.execute(copier)
+
+        report = copier.report()
+        logger.info(report)
+        if self._strategy != COPY:
+            util.print_out(report)
+        return ExecutionResult(0, stdout=[report])
+
+    def plan(self, context=None):
+        srcpath, dstpath = self._paths(context)
+        return self._plan(srcpath, dstpath)
+
+    def dry_run(self, context=None, inputs=[]):
+        srcpath, dstpath = self._paths(context)
+        if not srcpath.exists():
+            return [f'copy source not found: {self._src}']
+        return self._plan(srcpath, dstpath).lines(relative_to=context)
+
+    def _paths(self, context):
+        [src, dst], _ = self.preprocess([self._src, self._dst], {})
+        return pathlib.Path(context, src), pathlib.Path(context, dst)
+
+    def _plan(self, srcpath, dstpath):
+        plan = CopyPlan()
+        if self._glob or self._exclude:
+            matcher = util.GlobMatcher(self._glob or ['**/*'], excludes=self._exclude or [])
+
+            def ignore(p):
+                return matcher.is_excluded(p.relative_to(srcpath), is_dir=p.is_dir())
+
+            # a matched directory is planned with all of its descendants
+            for p in matcher.walk(srcpath, descend_matched=False):
+                plan.add(p, dstpath.joinpath(p.relative_to(srcpath)), ignore=ignore)
         else:
-            logger.info(f'copying file(s) {self._src} to {self._dst}')
-            _copy_internal(srcpath, dstpath)
-        return ExecutionResult(0)
+            plan.add(srcpath, dstpath)
+        return plan
+
+    @property
+    def strategy(self):
+        return self._strategy
 
     def __str__(self):
-        return f'copy(src={self._src}, dst={self._dst}, glob={self._glob})'
+        glob = self._glob[0] if self._glob and len(self._glob) == 1 else self._glob
+        opts = [f'src={self._src}', f'dst={self._dst}', f'glob={glob}']
+        if self._exclude:
+            opts.append(f'exclude={self._exclude}')
+        if self._strategy != COPY:
+            opts.append(f'strategy={self._strategy}')
+        return f'copy({", ".join(opts)})'
+
+
+class FileCopier:
+    def __init__(self, strategy=COPY):
+        self._strategy = util.assert_type(strategy, str)
+        self._used = dict([(s, 0) for s in [REFLINK, HARDLINK, COPY]])
+
+    def __call__(self, src, dst):
+        used = self._copy(os.fspath(src), os.fspath(dst))
+        logger.debug(f'{used}: {src} -> {dst}')
+        self._used[used] += 1
+        return dst
+
+    def _copy(self, src, dst):
+        if os.path.exists(dst) and os.path.samefile(src, dst):
+            # dst is src itself or a hardlink of it, which has the content already
+            return HARDLINK if self._strategy in [HARDLINK, AUTO] else COPY
+        if os.path.lexists(dst):
+            # writing into existing dst would modify files hardlinked to it by a former copy
+            os.remove(dst)
+        if self._strategy in [REFLINK, AUTO] and _reflink(src, dst):
+            return REFLINK
+        if self._strategy in [HARDLINK, AUTO] and _hardlink(src, dst):
+            return HARDLINK
+        shutil.copyfile(src, dst)
+        return COPY
+
+    @property
+    def used(self):
+        return dict([(s, n) for s, n in self._used.items() if n > 0])
+
+    def report(self):
+        total = sum(self._used.values())
+        used = ', '.join([f'{s}: {n}' for s, n in self.used.items()])
+        if used:
+            return f'copied {total} file(s) ({used})'
+        return f'copied {total} file(s)'
+
 
+def _reflink(src, dst):
+    """
+    dst must not exist.
+    """
+    if fcntl is None:
+        return False
+    try:
+        with open(src, 'rb') as sfp, open(dst, 'xb') as dfp:
+            try:
+                fcntl.ioctl(dfp.fileno(), FICLONE, sfp.fileno())
+            except OSError:
+                dfp.close()
+                os.remove(dst)
+                raise
+        return True
+    except OSError as e:
+        if e.errno not in _FALLBACK_ERRNOS:
+            raise
+        logger.debug(f'reflink is not available for {src}: {e}')
+        return False
 
-def _copy_internal(srcpath, dstpath):
-    if srcpath.is_dir():
-        if dstpath.exists():
-            for s in srcpath.iterdir():
-                _copy_internal(s, dstpath.joinpath(s.name))
+
+def _hardlink(src, dst):
+    """
+    dst must not exist.
+    """
+    try:
+        os.link(src, dst)
+        return True
+    except OSError as e:
+        if e.errno not in _FALLBACK_ERRNOS:
+            raise
+        logger.debug(f'hardlink is not available for {src}: {e}')
+        return False
+
+
+class CopyPlan:
+    """
+    deduplicated set of directories to create and files to copy, computed before any I/O.
+    """
+
+    def __init__(self):
+        self._dirs = {}
+        self._files = {}
+        self._visited = set()
+
+    def add(self, srcpath, dstpath, ignore=None):
+        if srcpath.is_dir():
+            if (srcpath, dstpath) in self._visited:
+                return
+            self._visited.add((srcpath, dstpath))
+            self._add_dir(dstpath, srcpath)
+            for s in sorted(srcpath.iterdir()):
+                if ignore is None or not ignore(s):
+                    self.add(s, dstpath.joinpath(s.name), ignore=ignore)
         else:
-            shutil.copytree(srcpath, dstpath, copy_function=shutil.copyfile)
-    else:
-        _copy_file(srcpath, dstpath)
+            if dstpath in self._dirs or dstpath.is_dir():
+                dstpath = dstpath.joinpath(srcpath.name)
+            self._add_dir(dstpath.parent)
+            self._files[dstpath] = srcpath
+
+    def _add_dir(self, dstpath, srcpath=None):
+        if dstpath in self._dirs:
+            if srcpath is not None:
+                self._dirs[dstpath] = srcpath
+        elif not dstpath.exists():
+            self._dirs[dstpath] = srcpath
+
+    @property
+    def dirs(self):
+        return sorted(self._dirs, key=lambda d: len(d.parts))
 
+    @property
+    def files(self):
+        return list(self._files.items())
 
-def _copy_file(srcpath, dstpath):
-    if not dstpath.exists() and not dstpath.parent.exists():
-        dstpath.parent.mkdir(parents=True)
-    if dstpath.is_dir():
-        dst = dstpath.joinpath(srcpath.name)
-    else:
-        dst = dstpath
-    shutil.copyfile(srcpath, dst)
+    def execute(self, copier):
+        dirs = self.dirs
+        for d in dirs:
+            d.mkdir(parents=True, exist_ok=True)
+        for dst, src in self._files.items():
+            copier(src, dst)
+        for d in reversed(dirs):
+            if self._dirs[d] is not None:
+                shutil.copystat(self._dirs[d], d)
 
+    def lines(self, relative_to=None):
+        def rel(p):
+            return os.path.relpath(p, relative_to) if relative_to else str(p)
 
-def _copy_glob(srcpath, dstpath, pattern):
-    for p in srcpath.glob(pattern):
-        d = dstpath.joinpath(p.relative_to(srcpath))
-        _copy_internal(p, d)
+        return [
+            *[f'mkdir {rel(d)}' for d in self.dirs],
+            *[f'copy {rel(s)} -> {rel(d)}' for d, s in self._files.items()],
+        ]
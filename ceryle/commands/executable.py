@@ -1,5 +1,7 @@
 import abc
+import importlib
 import logging
+import pickle
 
 import ceryle.util as util
 from ceryle.dsl.support import eval_arg
@@ -15,6 +17,12 @@ class Executable(abc.ABC):
     def execute(self, *args, context=None, **kwargs):
         pass
 
+    def dry_run(self, context=None, inputs=[]):
+        """
+        returns lines describing what execute would do, printed when running with --dry-run.
+        """
+        return []
+
     def preprocess(self, args, kwargs):
         logger.debug(f'preprocessing args: [{args}], kwargs: {kwargs}')
         processed_args = [eval_arg(v, fail_on_unknown=False) for v in args]
@@ -22,6 +30,57 @@ class Executable(abc.ABC):
         return processed_args, processed_kwargs
 
 
+class DeferredExecutable(Executable):
+    """
+    holds arguments of an executable declared in a task file.
+    the executable is constructed and validated when it is used first.
+    """
+
+    def __init__(self, cls, args, kwargs):
+        self._cls = cls
+        self._args = args
+        self._kwargs = kwargs
+        self._materialized = None
+
+    def materialize(self):
+        if self._materialized is None:
+            self._materialized = self._cls(*self._args, **self._kwargs)
+        return self._materialized
+
+    def execute(self, *args, **kwargs):
+        return self.materialize().execute(*args, **kwargs)
+
+    def dry_run(self, *args, **kwargs):
+        return self.materialize().dry_run(*args, **kwargs)
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.materialize(), name)
+
+    def __str__(self):
+        return str(self.materialize())
+
+    def __repr__(self):
+        return repr(self.materialize())
+
+
+def deferred(cls):
+    """
+    returns a function declaring an executable of cls, which is constructed when it is used.
+    """
+    def declare(*args, **kwargs):
+        return DeferredExecutable(cls, args, kwargs)
+
+    declare.__name__ = cls.__name__
+    declare.__doc__ = cls.__doc__
+    return declare
+
+
+def materialize(exe):
+    return exe.materialize() if isinstance(exe, DeferredExecutable) else exe
+
+
 class ExecutionResult:
     def __init__(self, return_code, stdout=[], stderr=[]):
         self._return_code = return_code
@@ -105,6 +164,17 @@ class ExecutableWrapper(Executable):
         logger.debug(f'precice kwargs for {self._func.__name__}: {exact_kwargs}')
         return exact_kwargs
 
+    def __reduce__(self):
+        # the function is pickled by reference, through the module attribute decorated by executable
+        module, qualname = self._func.__module__, self._func.__qualname__
+        try:
+            found = _lookup(module, qualname)
+        except (ImportError, AttributeError, TypeError):
+            found = None
+        if found is not self._func and getattr(found, '__wrapped__', None) is not self._func:
+            raise pickle.PicklingError(f'{self} can not be serialized, {qualname} is not defined in a module')
+        return _restore_wrapper, (module, qualname, self._args, self._kwargs, self._name)
+
     def __str__(self):
         args = ', '.join([str(a) for a in self._args])
         kwargs = ', '.join([f'{k}={v}' for k, v in self._kwargs.items()])
@@ -113,6 +183,18 @@ class ExecutableWrapper(Executable):
         return f'{self._name or self._func.__name__}({args}{kwargs})'
 
 
+def _lookup(module, qualname):
+    obj = importlib.import_module(module)
+    for n in qualname.split('.'):
+        obj = getattr(obj, n)
+    return obj
+
+
+def _restore_wrapper(module, qualname, args, kwargs, name):
+    func = _lookup(module, qualname)
+    return ExecutableWrapper(getattr(func, '__wrapped__', func), args, kwargs, name=name)
+
+
 def executable(func, assertion=None, name=None):
     def wrapper(*args, **kwargs):
         logger.debug(f'ExecutableWrapper({func.__name__}, args={args}, kwargs={kwargs})')
@@ -121,6 +203,7 @@ def executable(func, assertion=None, name=None):
             assertion(*args, **kwargs)
         return ExecutableWrapper(func, args, kwargs, name=name)
 
+    wrapper.__wrapped__ = func
     return wrapper
 
 
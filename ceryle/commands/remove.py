@@ -1,7 +1,11 @@
-import glob
 import logging
 import os
 import pathlib
+import subprocess
+import sys
+import uuid
+
+from concurrent.futures import ThreadPoolExecutor
 
 import ceryle.util as util
 from ceryle.commands.executable import Executable, ExecutionResult
@@ -9,47 +13,175 @@ from ceryle.dsl.support import ArgumentBase
 
 logger = logging.getLogger(__name__)
 
+TRASH_PREFIX = '.ceryle-trash-'
+
+# Windows process creation flags: DETACHED_PROCESS | CREATE_NEW_PROCESS_GROUP
+_WIN_DETACHED_FLAGS = 0x00000008 | 0x00000200
+
+_BACKGROUND_WORKER = 'import shutil, sys; [shutil.rmtree(p, ignore_errors=True) for p in sys.argv[1:]]'
+
 
 class Remove(Executable):
-    def __init__(self, *targets, glob=False):
+    def __init__(self, *targets, glob=False, exclude=None, background=False):
         self._targets = [util.assert_type(t, str, pathlib.Path, ArgumentBase) for t in targets]
         self._glob = util.assert_type(glob, bool)
+        self._exclude = [util.assert_type(x, str) for x in
+                         ([exclude] if isinstance(exclude, str) else util.assert_type(exclude or [], list))]
+        self._background = util.assert_type(background, bool)
 
     def execute(self, context=None, **kwargs):
-        rm_fun = _remove_glob if self._glob else _remove
+        rm_fun = _remove_in_background if self._background else _remove
         targets, _ = self.preprocess(self._targets, {})
-        for target in targets:
-            if not rm_fun(pathlib.Path(context, target)):
-                return ExecutionResult(1)
+        paths = [pathlib.Path(context, t) for t in targets]
+        with ThreadPoolExecutor(max_workers=util.default_workers()) as executor:
+            if not self._glob:
+                return ExecutionResult(0 if all(rm_fun(p, executor) for p in paths) else 1)
+
+            for base, patterns in _group_by_base(paths):
+                if patterns is None:
+                    removed = rm_fun(base, executor)
+                else:
+                    removed = self._remove_matched(base, patterns, rm_fun, executor)
+                if not removed:
+                    return ExecutionResult(1)
         return ExecutionResult(0)
 
+    def _remove_matched(self, base, patterns, rm_fun, executor):
+        matcher = util.GlobMatcher(patterns, excludes=self._exclude, include_hidden=False)
+        if not self._exclude:
+            return all([rm_fun(p, executor) for p in matcher.walk(base, descend_matched=False)])
+
+        def keep(p, is_dir):
+            return matcher.is_excluded(os.path.relpath(p, base), is_dir=is_dir)
+
+        return all([_remove(p, executor, keep=keep) for p in matcher.walk(base, descend_matched=False)])
+
     def __str__(self):
-        files = ', '.join([str(f) for f in self._targets])
-        return f'remove({files})'
+        opts = [str(f) for f in self._targets]
+        if self._exclude:
+            opts.append(f'exclude={self._exclude}')
+        if self._background:
+            opts.append('background=True')
+        return f'remove({", ".join(opts)})'
 
 
-def _remove(target):
-    if target.is_symlink():
-        logger.debug(f'remove symlink: {target}')
-        target.unlink()
-        return True
-    if not target.exists():
-        return True
-    if target.is_dir():
-        for t in target.iterdir():
-            if not _remove(t):
-                logger.warn(f'failed to remove {t}')
-                return False
-        logger.debug(f'remove directory: {target}')
-        target.rmdir()
-        return True
-    if target.is_file():
+def _group_by_base(paths):
+    """
+    groups glob patterns by their literal base directory so that each base is walked only once.
+    form: [(<base: pathlib.Path>, <patterns: list or None>)]
+    """
+    groups = []
+    index = {}
+    for p in paths:
+        base, pattern = util.split_glob(str(p))
+        if pattern is None:
+            groups.append((pathlib.Path(base), None))
+            continue
+        if base not in index:
+            index[base] = len(groups)
+            groups.append((pathlib.Path(base), []))
+        groups[index[base]][1].append(pattern)
+    return groups
+
+
+def _remove(target, executor=None, keep=None):
+    try:
+        is_dir = target.is_dir() and not target.is_symlink()
+    except OSError:
+        is_dir = False
+    if not is_dir:
+        if not os.path.lexists(target):
+            return True
         logger.debug(f'remove file: {target}')
         os.remove(target)
         return True
 
+    if executor is None:
+        with ThreadPoolExecutor(max_workers=util.default_workers()) as e:
+            return _remove_tree(str(target), e, keep=keep)
+    return _remove_tree(str(target), executor, keep=keep)
 
-def _remove_glob(target):
-    for p in glob.glob(str(target), recursive=True):
-        _remove(pathlib.Path(p))
+
+def _remove_tree(top, executor, keep=None):
+    dirs = []
+    batches = []
+    stack = [top]
+    while stack:
+        d = stack.pop()
+        dirs.append(d)
+        files = []
+        with os.scandir(d) as it:
+            for entry in it:
+                # d_type of the entry is reused, no additional stat for most file systems
+                is_dir = entry.is_dir(follow_symlinks=False)
+                if keep is not None and keep(entry.path, is_dir):
+                    continue
+                if is_dir:
+                    stack.append(entry.path)
+                else:
+                    files.append(entry.path)
+        if files:
+            batches.append(executor.submit(_unlink_all, files))
+
+    failed = [f for b in batches for f in b.result()]
+    if failed:
+        for f in failed:
+            logger.warn(f'failed to remove {f}')
+        return False
+
+    for d in reversed(dirs):
+        logger.debug(f'remove directory: {d}')
+        try:
+            os.rmdir(d)
+        except OSError:
+            if keep is None or not os.listdir(d):
+                raise
+            logger.debug(f'keep directory containing excluded files: {d}')
+    return True
+
+
+def _unlink_all(files):
+    failed = []
+    for f in files:
+        try:
+            os.unlink(f)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            if os.path.islink(f) and os.path.isdir(f):
+                # directory symlink on Windows
+                os.rmdir(f)
+                continue
+            logger.debug(e)
+            failed.append(f)
+    return failed
+
+
+def _remove_in_background(target, executor=None):
+    if target.is_symlink() or not target.is_dir():
+        return _remove(target, executor)
+
+    trash = target.parent.joinpath(f'{TRASH_PREFIX}{target.name}-{uuid.uuid4().hex}')
+    try:
+        os.rename(target, trash)
+    except OSError as e:
+        logger.warn(f'could not move {target} to trash, removing in foreground: {e}')
+        return _remove(target, executor)
+
+    logger.debug(f'removing {trash} in background')
+    _spawn_detached([sys.executable, '-c', _BACKGROUND_WORKER, str(trash)])
     return True
+
+
+def _spawn_detached(cmd):
+    opts = dict(
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        close_fds=True,
+    )
+    if util.is_win():
+        opts.update(creationflags=_WIN_DETACHED_FLAGS)
+    else:
+        opts.update(start_new_session=True)
+    return subprocess.Popen(cmd, **opts)
@@ -5,3 +5,5 @@ CERYLE_TASK_EXT = '.ceryle'
 CERYLE_EX_DIR = 'extensions'
 CERYLE_EX_FILE_EXT = '.py'
 CERYLE_RUN_CACHE_DIRNAME = 'last-execution'
+CERYLE_CACHE_DIRNAME = 'cache'
+CERYLE_HISTORY_FILENAME = 'history.db'
@@ -11,3 +11,7 @@ class NoEnvironmentError(CeryleException):
 
 class NoArgumentError(CeryleException):
     pass
+
+
+class BundleError(CeryleException):
+    pass
@@ -1,29 +1,70 @@
+import logging
+import marshal
+import multiprocessing
+import os
 import pathlib
+import sys
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 import ceryle
 import ceryle.util as util
+from ceryle.dsl.loader import compile_task_file, compile_extension_file, Namespace
+
+logger = logging.getLogger(__name__)
+
+# compiling fewer files in a pool does not pay the cost of starting workers
+PARALLEL_COMPILE_THRESHOLD = 8
 
 
 class AggregateTaskFileLoader:
-    def __init__(self, files, root_context, extensions=[], additional_args={}):
+    def __init__(self, files, root_context, extensions=[], additional_args={}, target=None, index=None):
         self._files = util.assert_type(files, list)[:]
         self._root_context = util.assert_type(root_context, str, pathlib.Path)
         self._extensions = util.assert_type(extensions, list)[:]
         self._additional_args = additional_args.copy()
+        self._target = util.assert_type(target, None, str)
+        self._index = index
 
     def load(self):
+        selected = self._select()
+        if selected is None:
+            return self._load(self._files)
+
+        files, names, default = selected
+        logger.info(f'loading {len(files)} of {len(self._files)} task files for {self._target or default}')
+        d = self._load(files)
+        return ceryle.TaskDefinition([t for t in d.tasks if t.name in names], default or d.default_task)
+
+    def _select(self):
+        """
+        selects task files defining task groups in dependencies of the target by the group index.
+        default task can not be resolved statically when extensions exist, since they may declare it.
+        """
+        if self._index is None or (self._target is None and self._extensions):
+            return None
+        selected = self._index.select(self._files, target=self._target)
+        self._index.save()
+        if selected is None:
+            logger.info('task files to load could not be resolved statically, loading all')
+        return selected
+
+    def _load(self, files):
+        compiled = precompile(files, self._extensions)
         tasks = {}
         default = None
-        lvars = {}
+        namespace = Namespace(additional_args=self._additional_args)
+        xvars = {}
         for f in self._extensions:
-            x = ceryle.ExtensionLoader(f).load(
-                local_vars=lvars.copy(),
-                additional_args=self._additional_args)
-            lvars.update(x)
-        for f in self._files:
-            d = ceryle.TaskFileLoader(f, self._root_context).load(
-                local_vars=lvars.copy(),
-                additional_args=self._additional_args)
+            loader = ceryle.ExtensionLoader(f)
+            loader.set_compiled(compiled.get(('x', f)))
+            x = loader.load(global_vars=namespace)
+            namespace.update(x)
+            xvars.update(x)
+        for f in files:
+            loader = ceryle.TaskFileLoader(f, self._root_context)
+            loader.set_compiled(compiled.get(('t', f)))
+            d = loader.load(global_vars=namespace, local_vars=xvars)
             for t in d.tasks:
                 if t.name in tasks:
                     util.print_out(f'warn: {t.name} is overwritten')
@@ -33,5 +74,41 @@ class AggregateTaskFileLoader:
         return ceryle.TaskDefinition(list(tasks.values()), default)
 
 
-def load_task_files(files, extensions, root_context, additional_args={}):
-    return AggregateTaskFileLoader(files, root_context, extensions=extensions, additional_args=additional_args).load()
+def _compile(kind, f):
+    try:
+        return marshal.dumps(compile_task_file(f) if kind == 't' else compile_extension_file(f))
+    except Exception as e:
+        # evaluated again in order of the files to report the error
+        logger.debug(f'failed to compile {f}: {e}')
+        return None
+
+
+def _compile_pool(n):
+    # parsing is CPU bound, threads only overlap reading files.
+    # forked workers inherit loaded modules; spawning them costs more than compiling
+    cpus = os.cpu_count() or 1
+    if cpus > 1 and sys.version_info >= (3, 7) and not util.is_win() and not util.is_mac():
+        return ProcessPoolExecutor(max_workers=min(cpus, n), mp_context=multiprocessing.get_context('fork'))
+    return ThreadPoolExecutor(max_workers=min(util.default_workers(), n))
+
+
+def precompile(files, extensions):
+    """
+    reads, parses and compiles task files and extensions across a worker pool.
+    evaluation of them is not done here since it depends on the order of files.
+    form: {(<'t' for task file or 'x' for extension>, <file>): <compiled code>}
+    """
+    targets = [*[('x', f) for f in extensions], *[('t', f) for f in files]]
+    if len(targets) < PARALLEL_COMPILE_THRESHOLD:
+        return {}
+    with _compile_pool(len(targets)) as executor:
+        results = executor.map(_compile, *zip(*targets))
+        return dict([(t, marshal.loads(r)) for t, r in zip(targets, results) if r is not None])
+
+
+def load_task_files(files, extensions, root_context, additional_args={}, target=None, index=None):
+    """
+    loads all task files, or only ones needed to run target when index is given.
+    """
+    return AggregateTaskFileLoader(files, root_context, extensions=extensions, additional_args=additional_args,
+                                   target=target, index=index).load()
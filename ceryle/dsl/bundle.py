@@ -0,0 +1,57 @@
+import logging
+import pickle
+
+import ceryle
+import ceryle.util as util
+from . import BundleError
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_FORMAT = 'ceryle-bundle'
+BUNDLE_VERSION = 1
+
+
+def save_bundle(path, task_def, resolver, root_context):
+    """
+    serializes loaded task definition and validated dependency graph.
+    the bundle is usable only by the same version of ceryle.
+    """
+    util.assert_type(task_def, ceryle.TaskDefinition)
+    util.assert_type(resolver, ceryle.DependencyResolver)
+    resolver.validate()
+    header = {
+        'format': BUNDLE_FORMAT,
+        'version': BUNDLE_VERSION,
+        'ceryle': ceryle.__version__,
+    }
+    payload = {
+        'task_def': task_def,
+        'resolver': resolver,
+        'root_context': root_context,
+    }
+    try:
+        # header is pickled separately so that it is read even if classes in payload changed
+        data = pickle.dumps(header, protocol=pickle.HIGHEST_PROTOCOL) \
+            + pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, TypeError, AttributeError) as e:
+        raise BundleError(f'could not bundle task definitions: {e}')
+    with open(path, 'wb') as fp:
+        fp.write(data)
+
+
+def load_bundle(path):
+    """
+    form: (<task definition: TaskDefinition>, <resolver: DependencyResolver>, <root context: str or None>)
+    """
+    try:
+        with open(path, 'rb') as fp:
+            header = pickle.load(fp)
+            if not isinstance(header, dict) or header.get('format') != BUNDLE_FORMAT:
+                raise BundleError(f'not a task bundle: {path}')
+            if header.get('version') != BUNDLE_VERSION or header.get('ceryle') != ceryle.__version__:
+                raise BundleError(f'{path} was compiled by ceryle {header.get("ceryle")}, compile it again')
+            payload = pickle.load(fp)
+    except (OSError, pickle.UnpicklingError, EOFError) as e:
+        raise BundleError(f'could not load task bundle {path}: {e}')
+    logger.info(f'loaded task bundle: {path}')
+    return payload['task_def'], payload['resolver'], payload['root_context']
@@ -0,0 +1,171 @@
+import ast
+import logging
+import os
+import pathlib
+
+import ceryle.util as util
+from ceryle.const import CERYLE_DIR, CERYLE_CACHE_DIRNAME
+from ceryle.util.cache import load_json_cache, save_json_cache, trusted_mtime
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = 'group-index.json'
+INDEX_VERSION = 1
+
+DEPENDENCIES = 'dependencies'
+DEFAULT = 'default'
+
+
+_NOT_LITERAL = object()
+
+
+def _literal_value(node):
+    try:
+        return ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError):
+        return _NOT_LITERAL
+
+
+def _literal(node, *types):
+    v = _literal_value(node)
+    return v if isinstance(v, types) else None
+
+
+def _extract_dependencies(node):
+    """
+    form: <dependencies: list>, or None if not static
+    """
+    if isinstance(node, ast.List):
+        return []
+    if not isinstance(node, ast.Dict):
+        return None
+    deps = []
+    for k, v in zip(node.keys, node.values):
+        key = k is not None and _literal(k, str)
+        if not key:
+            return None
+        if key == DEPENDENCIES:
+            deps = _literal(v, list, tuple)
+            if deps is None or not all([isinstance(d, str) for d in deps]):
+                return None
+    return list(deps)
+
+
+def _extract_default(body):
+    """
+    form: (<default task: str or None>, <static: bool>)
+    """
+    default = None
+    for stmt in body:
+        for node in ast.walk(stmt):
+            if not isinstance(node, ast.Name) or node.id != DEFAULT or not isinstance(node.ctx, ast.Store):
+                continue
+            if not (isinstance(stmt, ast.Assign) and len(stmt.targets) == 1 and stmt.targets[0] is node):
+                return None, False
+            default = _literal_value(stmt.value)
+            if default is not None and not isinstance(default, str):
+                return None, False
+    return default, True
+
+
+def extract_groups(f):
+    """
+    extracts task groups from the dict literal of a task file without executing it.
+    form: {
+      'groups': {<name: str>: <dependencies: list or None if not static>}, or None if names are not static,
+      'default': <default task: str or None>,
+      'default_static': <bool>,
+    }
+    """
+    entry = {'groups': None, 'default': None, 'default_static': False}
+    try:
+        body = util.parse_to_ast(f).body
+    except (SyntaxError, ValueError) as e:
+        logger.debug(f'could not parse {f}: {e}')
+        return entry
+    if not body or not isinstance(body[-1], ast.Expr) or not isinstance(body[-1].value, ast.Dict):
+        return entry
+
+    entry['default'], entry['default_static'] = _extract_default(body[:-1])
+    groups = {}
+    node = body[-1].value
+    for k, v in zip(node.keys, node.values):
+        name = k is not None and _literal(k, str)
+        if not name:
+            return entry
+        groups[name] = _extract_dependencies(v)
+    entry['groups'] = groups
+    return entry
+
+
+class GroupIndex:
+    """
+    persisted index of task group names and dependencies of each task file, invalidated by mtime of the file.
+    """
+
+    def __init__(self, cache_file=None):
+        self._cache_file = cache_file and pathlib.Path(cache_file)
+        self._entries = load_json_cache(self._cache_file, INDEX_VERSION) or {}
+        self._dirty = False
+
+    @staticmethod
+    def default():
+        return GroupIndex(pathlib.Path.home().joinpath(CERYLE_DIR, CERYLE_CACHE_DIRNAME, INDEX_FILENAME))
+
+    def entry(self, f):
+        key = os.path.abspath(f)
+        st = os.stat(key)
+        cached = self._entries.get(key)
+        if cached is not None and cached['mtime'] == st.st_mtime_ns and cached['size'] == st.st_size:
+            return cached
+        logger.debug(f'indexing {key}')
+        entry = extract_groups(key)
+        entry.update(mtime=trusted_mtime(st.st_mtime_ns), size=st.st_size)
+        self._entries[key] = entry
+        self._dirty = True
+        return entry
+
+    def save(self):
+        if self._cache_file is None or not self._dirty:
+            return
+        if save_json_cache(self._cache_file, INDEX_VERSION, self._entries):
+            self._dirty = False
+
+    def select(self, files, target=None):
+        """
+        selects task files needed to load target and task groups it depends on.
+        default task is used if target is None.
+        returns None if the files can not be determined statically.
+        form: (<files: list>, <task group names: set>, <default task: str or None>)
+        """
+        entries = [(f, self.entry(f)) for f in files]
+        if any([e['groups'] is None for _, e in entries]):
+            return None
+
+        default = None
+        default_static = all([e['default_static'] for _, e in entries])
+        for _, e in entries:
+            default = e['default'] or default
+        target = target or (default_static and default)
+        if not target:
+            return None
+
+        # a task group defined in several files is overwritten by the last one
+        defined = {}
+        for f, e in entries:
+            for name, deps in e['groups'].items():
+                defined[name] = (f, deps)
+
+        names = set()
+        stack = [target]
+        while stack:
+            name = stack.pop()
+            if name in names:
+                continue
+            if name not in defined or defined[name][1] is None:
+                return None
+            names.add(name)
+            stack.extend(defined[name][1])
+
+        selected = set([defined[n][0] for n in names])
+        return [f for f in files if f in selected], names, default if default_static else None
@@ -1,8 +1,10 @@
 import abc
 import ast
+import collections
 import os
 import pathlib
 import sys
+import types
 
 import ceryle
 import ceryle.util as util
@@ -10,7 +12,9 @@ import ceryle.util as util
 from ceryle.commands.command import Command
 from ceryle.commands.copy import Copy
 from ceryle.commands.remove import Remove
-from ceryle.commands.executable import executable, executable_with
+from ceryle.commands.archive import Archive, Extract
+from ceryle.commands.checksum import Checksum
+from ceryle.commands.executable import executable, executable_with, deferred
 from ceryle.commands.builtin import mkdir, save_input_to
 from ceryle.tasks.task import SingleValueCommandInput
 from ceryle.tasks.condition import Condition
@@ -28,13 +32,41 @@ else:
         return ast.Module(body, [])
 
 
+def compile_task_file(f):
+    """
+    parses and compiles a task file without evaluating it.
+    form: (<code of statements before task definition: code>, <code of task definition dict: code>)
+    """
+    body = util.parse_to_ast(f).body
+    if len(body) == 0:
+        raise TaskFileError(f'No task definition found: {f}')
+    task_node = body[-1]
+    if not isinstance(task_node, ast.Expr) or not isinstance(task_node.value, ast.Dict):
+        raise TaskFileError(f'Not task definition, declare by dict form: {f}')
+    return (
+        compile(ast_module(body[:-1]), str(f), 'exec'),
+        compile(ast.Expression(task_node.value), str(f), 'eval'),
+    )
+
+
+def compile_extension_file(f):
+    return compile(util.parse_to_ast(f), str(f), 'exec')
+
+
 class FileLoaderBase(abc.ABC):
     def __init__(self, file):
         self._file = util.assert_type(file, str, pathlib.Path)
+        self._compiled = None
 
-    def _evaluate_file(self, body, gvars, lvars):
-        co = compile(ast_module(body), str(self._file), 'exec')
-        exec(co, gvars, lvars)
+    def set_compiled(self, compiled):
+        """
+        sets code compiled in advance, e.g. in parallel with other files.
+        """
+        self._compiled = compiled
+
+    @abc.abstractmethod
+    def compile(self):
+        pass
 
     @abc.abstractmethod
     def load(self, global_vars={}, local_vars={}, additional_args={}):
@@ -46,20 +78,15 @@ class TaskFileLoader(FileLoaderBase):
         super().__init__(file)
         self._root_context = pathlib.Path(util.assert_type(root_context, str, pathlib.Path))
 
-    def load(self, global_vars={}, local_vars={}, additional_args={}):
-        module = util.parse_to_ast(self._file)
+    def compile(self):
+        return compile_task_file(self._file)
 
-        body = module.body
-        if len(body) == 0:
-            raise TaskFileError(f'No task definition found: {self._file}')
+    def load(self, global_vars={}, local_vars={}, additional_args={}):
+        body_code, tasks_code = self._compiled or self.compile()
 
         gvars, lvars = _prepare_vars(global_vars, local_vars, additional_args)
-        task_node = body[-1]
-        if not isinstance(task_node, ast.Expr) or not isinstance(task_node.value, ast.Dict):
-            raise TaskFileError(f'Not task definition, declare by dict form: {self._file}')
-
-        self._evaluate_file(body[:-1], gvars, lvars)
-        tasks = eval(compile(ast.Expression(task_node.value), self._file, 'eval'), gvars, lvars)
+        exec(body_code, gvars, lvars)
+        tasks = eval(tasks_code, gvars, lvars)
         context = self._resolve_context(lvars.get('context'))
         return TaskDefinition(parse_tasks(tasks, str(context), self._file), lvars.get('default'))
 
@@ -75,35 +102,65 @@ class ExtensionLoader(FileLoaderBase):
     def __init__(self, file):
         super().__init__(file)
 
+    def compile(self):
+        return compile_extension_file(self._file)
+
     def load(self, global_vars={}, local_vars={}, additional_args={}):
-        module = util.parse_to_ast(self._file)
+        code = self._compiled or self.compile()
         gvars, lvars = _prepare_vars(global_vars, local_vars, additional_args)
-        self._evaluate_file(module.body, gvars, lvars)
+        exec(code, gvars, lvars)
         return lvars
 
 
+_BUILTIN_VARS = types.MappingProxyType(dict(
+    ceryle=ceryle,
+    command=deferred(Command),
+    copy=deferred(Copy),
+    remove=deferred(Remove),
+    archive=deferred(Archive),
+    extract=deferred(Extract),
+    checksum=deferred(Checksum),
+    save_input_to=save_input_to,
+    mkdir=mkdir,
+    executable=executable,
+    executable_with=executable_with,
+    condition=Condition,
+    path=support.joinpath,
+    env=support.Env,
+    as_single_value=SingleValueCommandInput,
+))
+
+
+class Namespace(dict):
+    """
+    global variables of task files and extensions.
+    this is built once for a set of files and shared by all of them, variables defined by extensions are added
+    to it as they are loaded.
+    """
+
+    def __init__(self, global_vars={}, additional_args={}):
+        super().__init__(global_vars)
+        self.update(_BUILTIN_VARS)
+        args = support.Arguments(additional_args)
+
+        def arg_fun(name, **kwargs):
+            return support.Arg(name, args, **kwargs)
+
+        self['arg'] = arg_fun
+
+
 def _prepare_vars(global_vars, local_vars, additional_args):
-    def arg_fun(name, **kwargs):
-        return support.Arg(name, additional_args, **kwargs)
-
-    gvars = global_vars.copy()
-    gvars.update(
-        ceryle=ceryle,
-        command=Command,
-        copy=Copy,
-        remove=Remove,
-        save_input_to=save_input_to,
-        mkdir=mkdir,
-        executable=executable,
-        executable_with=executable_with,
-        condition=Condition,
-        path=support.joinpath,
-        env=support.Env,
-        arg=arg_fun,
-        as_single_value=SingleValueCommandInput,
-    )
-    gvars.update(**local_vars)
-    return gvars, local_vars.copy()
+    """
+    local variables are layered on local_vars, so that they are not copied for each file.
+    form: (<global variables: Namespace>, <local variables: ChainMap>)
+    """
+    if isinstance(global_vars, Namespace):
+        # shared namespace already has arguments and variables of extensions
+        gvars = global_vars
+    else:
+        gvars = Namespace(global_vars, additional_args)
+        gvars.update(local_vars)
+    return gvars, collections.ChainMap({}, local_vars)
 
 
 class TaskDefinition:
@@ -4,7 +4,7 @@ import ceryle.util as util
 
 from . import TaskFileError
 from ceryle.commands.executable import Executable
-from ceryle.tasks.task import Task, TaskGroup
+from ceryle.tasks.task import TaskGroup, TaskSpec
 
 TASKS = 'tasks'
 RUN = 'run'
@@ -30,7 +30,7 @@ def parse_tasks(raw_tasks, context, filename):
 
 def _to_task(raw_task, group):
     if isinstance(raw_task, Executable):
-        return Task(raw_task)
+        return TaskSpec(raw_task)
     if RUN not in raw_task:
         raise TaskFileError(f'`{RUN}` is not declared in a task of {group}')
-    return Task(raw_task.pop(RUN), **raw_task)
+    return TaskSpec(raw_task.pop(RUN), **raw_task)
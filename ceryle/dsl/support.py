@@ -1,4 +1,5 @@
 import abc
+import collections.abc
 import logging
 import os
 import pathlib
@@ -121,14 +122,35 @@ class Env(ArgumentBase):
         return f'env({args})'
 
 
-class Arg(ArgumentBase):
-    def __init__(self, name, args, default=None, allow_empty=False, format=None):
-        super().__init__(name, default=default, allow_empty=allow_empty, format=format)
+class Arguments(collections.abc.Mapping):
+    """
+    immutable arguments given by --arg, validated once and shared by every arg() of task files.
+    """
+
+    def __init__(self, args={}):
         self._args = dict(**args)
         for k, v in self._args.items():
             util.assert_type(k, str)
             util.assert_type(v, str)
 
+    def __getitem__(self, key):
+        return self._args[key]
+
+    def __iter__(self):
+        return iter(self._args)
+
+    def __len__(self):
+        return len(self._args)
+
+    def __repr__(self):
+        return f'Arguments({self._args})'
+
+
+class Arg(ArgumentBase):
+    def __init__(self, name, args, default=None, allow_empty=False, format=None):
+        super().__init__(name, default=default, allow_empty=allow_empty, format=format)
+        self._args = args if isinstance(args, Arguments) else Arguments(args)
+
     def _eval_var(self):
         v = self._args.get(self._name) or os.environ.get(self._name) or self._default or ''
         if not self._allow_empty and v == '':
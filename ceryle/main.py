@@ -1,53 +1,279 @@
 import argparse
+import itertools
 import logging
 import os
 import pathlib
 import re
 import sys
+import time
 
 import ceryle
 import ceryle.const as const
+import ceryle.dsl.index
+import ceryle.tasks.affected
 import ceryle.util as util
 
 logger = logging.getLogger(__name__)
 
+# lines of a large tree are printed by chunks instead of building all of them in memory
+_PRINT_CHUNK = 1000
 
-def load_tasks(additional_args={}):
-    task_files, root_context = util.collect_task_files(os.getcwd())
+# errors of invalid declarations of tasks, raised when task groups are validated or run
+_TASK_ERRORS = (ceryle.CeryleException, TypeError, ValueError)
+
+PROFILE_CERYLE = 'ceryle'
+PROFILE_CHILDREN = 'waiting on children'
+PROFILE_FILESYSTEM = 'filesystem builtins'
+PROFILE_PYTHON = 'python executables'
+
+
+def load_tasks(additional_args={}, lazy=False, target=None):
+    """
+    when lazy is True, only task files needed to run target, or default task if target is None, are loaded.
+    """
+    with util.trace_span('discover files', cat='load'):
+        task_files, extensions, root_context = util.discover_files(
+            os.getcwd(), index=util.DirectoryIndex.default())
     logger.info(f'task files: {task_files}')
     if not task_files:
         raise ceryle.TaskFileError('task file not found')
-    extensions = util.collect_extension_files(os.getcwd())
     logger.info(f'extensions: {extensions}')
 
-    return ceryle.load_task_files(task_files, extensions, root_context, additional_args=additional_args), root_context
+    with util.trace_span('load task files', cat='load', files=len(task_files), lazy=lazy):
+        if lazy:
+            task_def = ceryle.load_task_files(task_files, extensions, root_context, additional_args=additional_args,
+                                              target=target, index=ceryle.dsl.index.GroupIndex.default())
+            return task_def, root_context
+        return ceryle.load_task_files(task_files, extensions, root_context,
+                                      additional_args=additional_args), root_context
 
 
-def run(task=None, dry_run=False, additional_args={},
-        continue_last_run=False, **kwargs):
+def compile_tasks(output, additional_args={}):
+    """
+    saves all task definitions and the validated dependency graph to output to skip loading them in later runs.
+    """
+    from ceryle.dsl.bundle import save_bundle
 
     task_def, root_context = load_tasks(additional_args=additional_args)
+    resolver = ceryle.DependencyResolver(task_def.tasks)
+    resolver.validate()
+    if _print_invalid_task_groups(task_def.tasks):
+        raise ceryle.TaskFileError('could not compile invalid task groups')
+    save_bundle(output, task_def, resolver, root_context)
+    util.print_out(f'compiled {len(task_def.tasks)} task groups to {output}')
+    return 0
+
+
+def validate_all(additional_args={}):
+    """
+    loads all task files and validates dependencies and every task without running them.
+    """
+    task_def, _ = load_tasks(additional_args=additional_args)
+    ceryle.DependencyResolver(task_def.tasks).validate()
+    invalid = _print_invalid_task_groups(task_def.tasks)
+    if invalid:
+        util.print_err(f'{invalid} of {len(task_def.tasks)} task groups are invalid')
+        return 1
+    util.print_out(f'{len(task_def.tasks)} task groups are valid')
+    return 0
+
+
+def _print_invalid_task_groups(task_groups):
+    """
+    returns the number of task groups failed to validate.
+    """
+    invalid = 0
+    for tg in sorted(task_groups, key=lambda t: t.name):
+        try:
+            tg.validate()
+        except _TASK_ERRORS as e:
+            logger.debug(e, exc_info=True)
+            util.print_err(f'{tg.name} ({relpath_to_cwd(tg.filename)}): {e}')
+            invalid += 1
+    return invalid
+
+
+def run(task=None, dry_run=False, additional_args={},
+        continue_last_run=False, bundle=None, affected_since=None, metrics_file=None, **kwargs):
+    """
+    when affected_since is given, only task groups affected by files changed since the git ref are run.
+    when metrics_file is given, metrics of the run are written to it.
+    """
+
+    if bundle is not None:
+        from ceryle.dsl.bundle import load_bundle
+
+        if additional_args:
+            logger.warn('--arg is ignored with --bundle, arguments are fixed when the bundle is compiled')
+        with util.trace_span('load bundle', cat='load'):
+            task_def, resolver, root_context = load_bundle(bundle)
+    else:
+        task_def, root_context = load_tasks(additional_args=additional_args, lazy=True, target=task)
+        resolver = None
     target = task or task_def.default_task
     if target is None:
         raise ceryle.TaskDefinitionError('default task is not declared, specify task to run')
 
-    runner = ceryle.TaskRunner(task_def.tasks)
+    with util.trace_span('validate dependencies', cat='resolve', task_groups=len(task_def.tasks)):
+        runner = ceryle.TaskRunner(task_def.tasks) if resolver is None else \
+            ceryle.TaskRunner(task_def.tasks, resolver=resolver)
+    only = None
+    if affected_since is not None:
+        only = _affected_since(runner.get_chain(target), affected_since, root_context)
+        if not only:
+            util.print_out(f'no task group is affected since {affected_since}')
+            return 0
+        util.print_out(f'affected: {", ".join(sorted(only))}')
     last_run = load_run_cache(root_context, target) if continue_last_run else None
     cached = False
+    success = False
+    started, beg = time.time(), time.perf_counter()
     try:
-        res = runner.run(target, dry_run=dry_run, last_run=last_run)
+        res = runner.run(target, dry_run=dry_run, last_run=last_run, only=only)
+        success = res is True
     except Exception as ex:
         if not dry_run and not isinstance(ex, ceryle.TaskDefinitionError):
             save_run_cache(root_context, runner.get_cache())
         cached = True
         raise ex
     finally:
+        duration = time.perf_counter() - beg
         not dry_run and not cached and save_run_cache(root_context, runner.get_cache())
+        not dry_run and save_run_history(target, root_context, started, duration, success, runner.get_timings())
+        not dry_run and metrics_file and save_metrics(metrics_file, target, started, duration, success,
+                                                      runner.get_timings())
     if res is not True:
         return 1
     return 0
 
 
+def watch(task=None, dry_run=False, additional_args={}, debounce=0.2, metrics_file=None, **kwargs):
+    state = _load_watch_state(task, additional_args)
+    rc = 0
+    try:
+        while True:
+            runner, chain, definition_files = state
+            with util.create_watcher(_watch_roots(chain, definition_files)) as watcher:
+                rc = _run_watched(runner, chain.task_name, dry_run, metrics_file=metrics_file)
+                register = runner.get_cache().register
+                watcher.drain()
+                util.print_out(f'watching changes for {chain.task_name}')
+                while True:
+                    changed = watcher.wait(debounce=debounce)
+                    logger.debug(f'changed: {sorted(changed)}')
+                    if any([_is_definition_file(f, definition_files) for f in changed]):
+                        util.print_out('task files changed, reloading')
+                        reloaded = _reload_watch_state(task, additional_args)
+                        if reloaded is not None:
+                            state = reloaded
+                            break
+                        util.print_out(f'watching changes for {chain.task_name}')
+                        continue
+
+                    affected = ceryle.tasks.affected.affected_task_groups(
+                        _task_groups_of(chain), chain, changed)
+                    if not affected:
+                        logger.info('no task group is affected')
+                        continue
+                    util.print_out(f'affected: {", ".join(sorted(affected))}')
+                    rc = _run_watched(runner, chain.task_name, dry_run, metrics_file=metrics_file,
+                                      only=affected, register=register)
+                    if rc == 0:
+                        register = runner.get_cache().register
+                    # discards changes made by the tasks themselves
+                    watcher.drain()
+                    util.print_out(f'watching changes for {chain.task_name}')
+    except KeyboardInterrupt:
+        return rc
+
+
+def list_affected(ref, task=None):
+    """
+    prints task groups affected by files changed since the git ref, in order to run.
+    """
+    task_def, root_context = load_tasks(lazy=True, target=task)
+    target = task or task_def.default_task
+    if target is None:
+        raise ceryle.TaskDefinitionError('default task is not declared, specify task to list affected')
+    chain = ceryle.TaskRunner(task_def.tasks).get_chain(target)
+    names = ceryle.tasks.affected.in_run_order(chain, _affected_since(chain, ref, root_context))
+    names and util.print_out(*names)
+    return 0
+
+
+def _affected_since(chain, ref, root_context):
+    changed = ceryle.tasks.affected.changed_files_since(ref, cwd=root_context or os.getcwd())
+    logger.debug(f'changed since {ref}: {changed}')
+    task_groups = _task_groups_of(chain)
+    affected = ceryle.tasks.affected.affected_task_groups(task_groups, chain, changed)
+    # a run without the last register needs the producers of outputs read by affected task groups
+    return ceryle.tasks.affected.with_register_producers(
+        task_groups, affected, scope=ceryle.tasks.affected.closure(chain))
+
+
+def _load_watch_state(task, additional_args):
+    task_def, _ = load_tasks(additional_args=additional_args, lazy=True, target=task)
+    target = task or task_def.default_task
+    if target is None:
+        raise ceryle.TaskDefinitionError('default task is not declared, specify task to run')
+    runner = ceryle.TaskRunner(task_def.tasks)
+    chain = runner.get_chain(target)
+    definition_files = [
+        *[str(tg.filename) for tg in _task_groups_of(chain)],
+        *util.discover_files(os.getcwd(), index=util.DirectoryIndex.default())[1],
+    ]
+    return runner, chain, set([os.path.abspath(f) for f in definition_files])
+
+
+def _reload_watch_state(task, additional_args):
+    """
+    returns None if task files are broken, which are often saved in the middle of editing.
+    """
+    try:
+        return _load_watch_state(task, additional_args)
+    except Exception as e:
+        logger.exception(e)
+        util.print_err(f'failed to reload task files, keeps the last ones: {type(e).__name__}: {e}')
+        return None
+
+
+def _task_groups_of(chain):
+    groups = {}
+    stack = [chain]
+    while stack:
+        c = stack.pop()
+        groups[c.task_name] = c.root
+        stack.extend(c.deps)
+    return list(groups.values())
+
+
+def _watch_roots(chain, definition_files):
+    return sorted(set([
+        *[os.path.abspath(tg.context) for tg in _task_groups_of(chain)],
+        *[os.path.dirname(f) for f in definition_files],
+    ]))
+
+
+def _is_definition_file(f, definition_files):
+    name = os.path.basename(f)
+    return f in definition_files or name == const.DEFAULT_TASK_FILE or name.endswith(const.CERYLE_TASK_EXT)
+
+
+def _run_watched(runner, target, dry_run, metrics_file=None, **kwargs):
+    success = False
+    started, beg = time.time(), time.perf_counter()
+    try:
+        success = runner.run(target, dry_run=dry_run, **kwargs) is True
+        return 0 if success else 1
+    except _TASK_ERRORS as e:
+        logger.exception(e)
+        util.print_err(str(e))
+        return 255
+    finally:
+        not dry_run and metrics_file and save_metrics(metrics_file, target, started, time.perf_counter() - beg,
+                                                      success, runner.get_timings())
+
+
 def save_run_cache(root_context, run_cache):
     try:
         cache_file = _run_cache_file(root_context, run_cache.task_name)
@@ -61,6 +287,35 @@ def save_run_cache(root_context, run_cache):
         util.print_err('failed to save last execution result', str(e))
 
 
+def save_run_history(task, root_context, started, duration, success, timings):
+    """
+    appends durations of the run to the history database in the home directory, a run running nothing is ignored.
+    """
+    if not timings:
+        return
+    try:
+        from ceryle.tasks.history import RunHistory
+
+        with RunHistory.default() as history:
+            history.record(task, root_context, started, duration, success, timings)
+    except Exception as e:
+        logger.warn('failed to save run history')
+        logger.warn(e)
+
+
+def save_metrics(metrics_file, task, started, duration, success, timings):
+    """
+    overwrites metrics_file with metrics of the run, which is read by the textfile collector of node_exporter.
+    """
+    try:
+        from ceryle.tasks.metrics import metrics_lines, write_metrics_file
+
+        write_metrics_file(metrics_file, metrics_lines(task, started, duration, success, timings))
+    except OSError as e:
+        logger.warn(f'failed to save metrics: {metrics_file}')
+        logger.warn(e)
+
+
 def load_run_cache(root_context, target):
     cache_file = _run_cache_file(root_context, target)
     if cache_file.is_file():
@@ -96,8 +351,11 @@ def list_tasks(verbose=0):
     return 0
 
 
-def show_tree(task=None, verbose=0):
-    task_def, _ = load_tasks()
+def show_tree(task=None, verbose=0, output_format='text'):
+    """
+    prints the dependency tree of task as it is generated, in text, DOT or JSON format.
+    """
+    task_def, _ = load_tasks(lazy=True, target=task)
     if task is None and task_def.default_task is None:
         raise ceryle.TaskDefinitionError('default task is not declared, specify task to show info')
 
@@ -105,34 +363,131 @@ def show_tree(task=None, verbose=0):
     tg_name = task or task_def.default_task
     tg = resolver.deps_chain_map().get(tg_name)
     if tg is None:
-        ceryle.tasks.runner.print_similar_task_groups(resolver.find_similar(tg_name))
+        from ceryle.tasks.runner import print_similar_task_groups
+        print_similar_task_groups(resolver.find_similar(tg_name))
         raise ceryle.TaskDefinitionError(f'{task or task_def.default_task} not found')
 
-    lines = []
-    printed = []
+    from ceryle.tasks.tree import tree_lines
+    lines = tree_lines(tg, output_format=output_format, verbose=verbose, relpath=relpath_to_cwd)
+    while True:
+        chunk = list(itertools.islice(lines, _PRINT_CHUNK))
+        if not chunk:
+            break
+        util.print_out(*chunk)
+    return 0
 
-    def _append(g, depth):
-        printed.append(g.root)
-        if verbose > 0:
-            lines.append(util.indent_s(f'{g.root.name}: ({relpath_to_cwd(g.root.filename)})', depth * 4))
-        else:
-            lines.append(util.indent_s(f'{g.root.name}:', depth * 4))
-
-        deps = [d for d in g.deps
-                if not d.root.allow_skip or d.root not in printed]
-        if deps:
-            lines.append(util.indent_s('dependencies:', depth * 4 + 2))
-        for d in deps:
-            _append(d, depth + 1)
-        if verbose > 0 and g.root.tasks:
-            lines.append(util.indent_s('tasks:', depth * 4 + 2))
-            for t in g.root.tasks:
-                lines.append(util.indent_s(f'{t.executable}', depth * 4 + 4))
-    _append(tg, 0)
+
+def why(task, dep):
+    """
+    prints the shortest dependency path from task to dep.
+    """
+    index = _load_reachability_index([task, dep])
+    path = index.shortest_path(task, dep)
+    if path is None:
+        util.print_out(f'{task} does not depend on {dep}')
+        return 1
+    util.print_out(' -> '.join(path))
+    return 0
+
+
+def list_deps(task, flat=False):
+    """
+    prints task groups which task depends on directly, or all of them in order to run if flat.
+    """
+    index = _load_reachability_index([task], target=task)
+    names = index.dependencies(task, transitive=flat)
+    names and util.print_out(*names)
+    return 0
+
+
+def list_rdeps(task, flat=False):
+    """
+    prints task groups depending on task directly, or all of them in order to run if flat.
+    """
+    index = _load_reachability_index([task])
+    names = index.dependents(task, transitive=flat)
+    names and util.print_out(*names)
+    return 0
+
+
+def _load_reachability_index(names, target=None):
+    task_def, _ = load_tasks(lazy=target is not None, target=target)
+    resolver = ceryle.DependencyResolver(task_def.tasks)
+    index = resolver.reachability_index()
+    for name in names:
+        if name not in index:
+            from ceryle.tasks.runner import print_similar_task_groups
+            print_similar_task_groups(resolver.find_similar(name))
+            raise ceryle.TaskDefinitionError(f'task {name} is not defined')
+    return index
+
+
+def show_stats(task_group=None, last=20):
+    """
+    prints durations of the last runs in the project of the current directory, and the slowest task groups.
+    a task group is given, its durations and ones of the tasks are printed instead.
+    """
+    from ceryle.tasks.history import RunHistory
+
+    task_file = util.find_task_file(os.getcwd())
+    root_context = str(pathlib.Path(task_file).parent) if task_file else None
+    with RunHistory.default() as history:
+        if task_group:
+            return _show_group_stats(history, task_group, root_context, last)
+        runs = history.runs(root_context, last=last)
+        if not runs:
+            util.print_out('no run is recorded')
+            return 0
+        lines = [f'last {len(runs)} runs:']
+        for task, started, duration, success in runs:
+            lines.append(util.indent_s(f'{_format_time(started)}  {_format_duration(duration)}  '
+                                       f'{"ok    " if success else "failed"}  {task}', 2))
+        lines.append('slowest task groups:')
+        lines.extend(_stats_lines(history.group_stats(root_context, last=last)[:20]))
+        util.print_out(*lines)
+    return 0
+
+
+def _show_group_stats(history, task_group, root_context, last):
+    runs = history.group_history(task_group, root_context, last=last)
+    if not runs:
+        util.print_out(f'no run of {task_group} is recorded')
+        return 1
+    lines = [f'{task_group}:']
+    lines.extend(_stats_lines([s for s in history.group_stats(root_context, last=last) if s['name'] == task_group]))
+    tasks = history.task_stats(task_group, root_context, last=last)
+    if tasks:
+        lines.append('tasks:')
+        lines.extend(_stats_lines(tasks))
+    lines.append('recent runs:')
+    for started, duration, success in runs:
+        lines.append(util.indent_s(f'{_format_time(started)}  {_format_duration(duration)}  '
+                                   f'{"ok" if success else "failed"}', 2))
     util.print_out(*lines)
     return 0
 
 
+def _stats_lines(stats):
+    width = max([len(s['name']) for s in stats] + [4])
+    lines = [util.indent_s(f'{"name":{width}}  {"runs":>5}  {"p50":>9}  {"p95":>9}  {"max":>9}  trend', 2)]
+    for s in stats:
+        t = '-' if s['trend'] is None else f'{(s["trend"] - 1) * 100:+.0f}%'
+        runs = f'{s["runs"]}' if not s['failures'] else f'{s["runs"]}({s["failures"]}!)'
+        lines.append(util.indent_s(f'{s["name"]:{width}}  {runs:>5}  {_format_duration(s["p50"])}  '
+                                   f'{_format_duration(s["p95"])}  {_format_duration(s["max"])}  {t}', 2))
+    return lines
+
+
+def _format_duration(seconds):
+    return f'{seconds:8.3f}s'
+
+
+def _format_time(epoch):
+    import datetime
+
+    return datetime.datetime.fromtimestamp(epoch).strftime('%Y-%m-%d %H:%M:%S')
+
+
 def relpath_to_cwd(f):
     return os.path.relpath(f, pathlib.Path.cwd())
 
@@ -143,10 +498,45 @@ def parse_args(argv):
                    help='list all task groups')
     p.add_argument('--show', action='store_true',
                    help='show dependency tree of <TASK GROUP>')
+    p.add_argument('--format', choices=['text', 'dot', 'json'], default='text',
+                   help='output format of --show')
+    p.add_argument('--why', nargs=2, metavar=('A', 'B'),
+                   help='show the shortest dependency path from task group A to B')
+    p.add_argument('--deps', metavar='TASK_GROUP',
+                   help='list task groups which TASK_GROUP depends on')
+    p.add_argument('--rdeps', metavar='TASK_GROUP',
+                   help='list task groups depending on TASK_GROUP')
+    p.add_argument('--flat', action='store_true',
+                   help='list all of transitive dependencies in order to run with --deps or --rdeps')
+    p.add_argument('--stats', nargs='?', const='', metavar='TASK_GROUP',
+                   help='show durations of the last runs and the slowest task groups, or ones of TASK_GROUP')
+    p.add_argument('--last-runs', type=int, default=20, metavar='N',
+                   help='number of runs to aggregate with --stats')
+    p.add_argument('--affected-since', metavar='REF',
+                   help='run only task groups affected by files changed since git REF and the ones registering '
+                        'outputs read by them, or list them with --list-tasks')
     p.add_argument('-n', '--dry-run', action='store_true')
+    p.add_argument('--watch', action='store_true',
+                   help='run <TASK GROUP> and rerun affected task groups on file changes')
+    p.add_argument('--validate-all', action='store_true',
+                   help='load all task files and validate every task group without running')
+    p.add_argument('--compile', action='store_true',
+                   help='compile all task files to a bundle file specified by --output')
+    p.add_argument('-o', '--output', default='tasks.bundle',
+                   help='bundle file written by --compile')
+    p.add_argument('--bundle',
+                   help='run <TASK GROUP> defined in a bundle file instead of loading task files')
     p.add_argument('--continue', action='store_true',
                    help='run tasks from last failure of <TASK GROUP>')
     p.add_argument('--arg', action='append', default=[])
+    p.add_argument('--metrics-file', metavar='PATH',
+                   help='write metrics of the run to PATH for the textfile collector of node_exporter')
+    p.add_argument('--trace', metavar='PATH',
+                   help='write spans of the run to PATH in trace event format, viewable in Perfetto')
+    p.add_argument('--profile', action='store_true',
+                   help='print how time of the run is divided between ceryle and processes, builtins and functions')
+    p.add_argument('--profile-output', metavar='PATH',
+                   help='write sampled stacks to PATH in collapsed format for flame graphs, implies --profile')
     p.add_argument('--log-level', choices=['DEBUG', 'INFO', 'WARN', 'ERROR'], default='INFO')
     p.add_argument('--log-stream', action='store_true')
     p.add_argument('--log-filename')
@@ -195,15 +585,13 @@ def main(argv):
         filename=args.pop('log_filename'))
     logger.debug(f'arguments: {args}')
 
+    trace_file = args.pop('trace')
+    trace_file and util.start_tracing()
+    profile, profile_output = args.pop('profile'), args.pop('profile_output')
+    profiler = start_profiler() if profile or profile_output else None
     try:
-        if args.pop('version', False):
-            util.print_out(ceryle.__version__)
-            return 0
-        if args.pop('list_tasks', False):
-            return list_tasks(verbose=args['verbose'])
-        if args.pop('show', False):
-            return show_tree(task=args['task'], verbose=args['verbose'])
-        return run(**args)
+        with util.trace_span('ceryle', cat='main', argv=list(argv)):
+            return _dispatch(args)
     except Exception as e:
         logger.exception(e)
         if isinstance(e, ceryle.CeryleException):
@@ -211,6 +599,90 @@ def main(argv):
             return 255
         else:
             raise e
+    finally:
+        trace_file and save_trace(trace_file)
+        profiler and print_profile(profiler.stop(), profile_output)
+
+
+def _dispatch(args):
+    if args.pop('version', False):
+        util.print_out(ceryle.__version__)
+        return 0
+    stats, last_runs = args.pop('stats'), args.pop('last_runs')
+    if stats is not None:
+        return show_stats(task_group=stats or None, last=last_runs)
+    affected_since = args.pop('affected_since')
+    if args.pop('list_tasks', False):
+        if affected_since is not None:
+            return list_affected(affected_since, task=args['task'])
+        return list_tasks(verbose=args['verbose'])
+    output_format = args.pop('format')
+    if args.pop('show', False):
+        return show_tree(task=args['task'], verbose=args['verbose'], output_format=output_format)
+    why_args, deps, rdeps, flat = args.pop('why'), args.pop('deps'), args.pop('rdeps'), args.pop('flat')
+    if why_args:
+        return why(*why_args)
+    if deps:
+        return list_deps(deps, flat=flat)
+    if rdeps:
+        return list_rdeps(rdeps, flat=flat)
+    if args.pop('validate_all', False):
+        return validate_all(additional_args=args['additional_args'])
+    output = args.pop('output')
+    bundle = args.pop('bundle')
+    if args.pop('compile', False):
+        return compile_tasks(output, additional_args=args['additional_args'])
+    if args.pop('watch', False):
+        return watch(**args)
+    return run(bundle=bundle, affected_since=affected_since, **args)
+
+
+def save_trace(trace_file):
+    tracer = util.stop_tracing()
+    try:
+        tracer.save(trace_file)
+        logger.info(f'trace saved: {trace_file}')
+    except OSError as e:
+        logger.warn(f'failed to save trace: {trace_file}')
+        logger.warn(e)
+
+
+def start_profiler():
+    """
+    starts a sampling profiler attributing wall time to child processes, filesystem builtins,
+    python functions run as executables, or ceryle itself.
+    """
+    from ceryle.commands.builtin import mkdir
+    from ceryle.commands.executable import ExecutableWrapper
+
+    return util.SamplingProfiler(categories=[
+        (PROFILE_CHILDREN, [ceryle.Command.execute]),
+        (PROFILE_FILESYSTEM, [ceryle.Copy.execute, ceryle.Remove.execute, ceryle.Archive.execute,
+                              ceryle.Extract.execute, ceryle.Checksum.execute, ceryle.save_input_to, mkdir]),
+        (PROFILE_PYTHON, [ExecutableWrapper.execute]),
+    ], default=PROFILE_CERYLE).start()
+
+
+def print_profile(profiler, output=None):
+    report = profiler.report()
+    wall = report['wall']
+    lines = [f'profile: {_format_duration(wall).strip()} wall, {report["samples"]} samples']
+    for name, t in report['categories']:
+        share = t / wall * 100 if wall else 0
+        lines.append(f'  {name:20} {_format_duration(t)} {share:5.1f}%')
+    lines.append(f'  cpu: ceryle {_format_duration(report["cpu"]).strip()}, '
+                 f'child processes {_format_duration(report["children_cpu"]).strip()}')
+    if report['top']:
+        lines.append(f'functions taking most of {PROFILE_CERYLE}:')
+        lines.extend([f'  {_format_duration(t)} {f}' for f, t in report['top']])
+    print(*lines, sep=os.linesep, file=sys.stderr)
+    if output:
+        try:
+            profiler.save_collapsed(output)
+            logger.info(f'profile saved: {output}')
+        except OSError as e:
+            logger.warn(f'failed to save profile: {output}')
+            logger.warn(e)
 
 
 def entry_point():
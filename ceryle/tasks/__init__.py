@@ -11,3 +11,7 @@ class TaskDefinitionError(CeryleException):
 
 class TaskIOError(CeryleException):
     pass
+
+
+class ChangeDetectionError(CeryleException):
+    pass
@@ -0,0 +1,157 @@
+import os
+
+import ceryle.util as util
+from ceryle.tasks import ChangeDetectionError
+
+
+def _is_under(path, directory):
+    return path == directory or path.startswith(directory.rstrip(os.sep) + os.sep)
+
+
+def changed_task_groups(task_groups, changed_paths):
+    """
+    returns names of task groups whose declared inputs match to any of changed paths.
+    a task group without inputs is regarded as changed by any change under its context.
+    """
+    paths = [os.path.abspath(p) for p in changed_paths]
+    names = []
+    for tg in task_groups:
+        context = os.path.abspath(tg.context)
+        under = [p for p in paths if _is_under(p, context)]
+        if not under:
+            continue
+        if tg.inputs:
+            matcher = util.GlobMatcher(tg.inputs)
+            if not any([matcher.match(os.path.relpath(p, context)) for p in under]):
+                continue
+        names.append(tg.name)
+    return names
+
+
+def closure(chain):
+    """
+    returns names of the task group of chain and all of its dependencies.
+    """
+    names = set()
+    stack = [chain]
+    while stack:
+        c = stack.pop()
+        if c.task_name not in names:
+            names.add(c.task_name)
+            stack.extend(c.deps)
+    return names
+
+
+def with_dependents(task_groups, names, scope=None):
+    """
+    returns names and all task groups depending on them directly or transitively.
+    result is limited in scope if given.
+    """
+    rdeps = {}
+    for tg in task_groups:
+        for d in tg.dependencies:
+            rdeps.setdefault(d, []).append(tg.name)
+
+    res = set()
+    stack = list(names)
+    while stack:
+        n = stack.pop()
+        if n in res:
+            continue
+        res.add(n)
+        stack.extend(rdeps.get(n, []))
+    if scope is not None:
+        res &= set(scope)
+    return res
+
+
+def affected_task_groups(task_groups, chain, changed_paths):
+    """
+    returns names of task groups in chain to rerun for changed paths.
+    """
+    scope = closure(chain)
+    changed = changed_task_groups([tg for tg in task_groups if tg.name in scope], changed_paths)
+    return with_dependents(task_groups, changed, scope=scope)
+
+
+def with_register_producers(task_groups, names, scope=None):
+    """
+    returns names and task groups whose outputs in the register are read by them, directly or transitively.
+    outputs of a skipped task group are not registered, so task groups reading them fail without producers.
+    result is limited in scope if given.
+    """
+    groups = dict([(tg.name, tg) for tg in task_groups])
+    res = set()
+    stack = list(names)
+    while stack:
+        n = stack.pop()
+        if n in res:
+            continue
+        res.add(n)
+        tg = groups.get(n)
+        if tg is not None:
+            stack.extend([g for g in _input_groups(tg) if scope is None or g in scope])
+    return res
+
+
+def _input_groups(tg):
+    for t in tg.tasks:
+        for key in _input_keys(t.command_input):
+            # a key without a task group refers to the task group itself
+            if isinstance(key, tuple):
+                yield key[0]
+
+
+def _input_keys(command_input):
+    if command_input is None:
+        return []
+    key = command_input.key
+    if isinstance(key, list):
+        return [k for c in key for k in _input_keys(c)]
+    return [key]
+
+
+def in_run_order(chain, names):
+    """
+    returns names ordered as task groups of chain run, dependencies first.
+    """
+    ordered = []
+    visited = set()
+    stack = [(chain, False)]
+    while stack:
+        c, expanded = stack.pop()
+        if expanded:
+            ordered.append(c.task_name)
+            continue
+        if c.task_name in visited:
+            continue
+        visited.add(c.task_name)
+        stack.append((c, True))
+        stack.extend([(d, False) for d in reversed(c.deps)])
+    return [n for n in ordered if n in names]
+
+
+def _git(args, cwd):
+    # subprocess is imported here not to slow down startup of the CLI
+    import subprocess
+    try:
+        p = subprocess.run(['git', *args], cwd=cwd, stdin=subprocess.DEVNULL,
+                           stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    except OSError as e:
+        raise ChangeDetectionError(f'failed to run git: {e}')
+    if p.returncode != 0:
+        raise ChangeDetectionError(f'git {args[0]} failed: {p.stderr.strip()}')
+    return p.stdout
+
+
+def changed_files_since(ref, cwd=None):
+    """
+    returns absolute paths of files changed since ref in the git repository of cwd.
+    uncommitted and untracked files are regarded as changed as well.
+    """
+    if ref.startswith('-'):
+        raise ChangeDetectionError(f'invalid git ref: {ref}')
+    top = _git(['rev-parse', '--show-toplevel'], cwd).strip()
+    changed = _git(['diff', '--name-only', '-z', ref, '--'], top).split('\0')
+    untracked = _git(['ls-files', '--others', '--exclude-standard', '-z'], top).split('\0')
+    return sorted(set([os.path.join(top, f) for f in [*changed, *untracked] if f]))
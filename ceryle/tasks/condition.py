@@ -8,10 +8,22 @@ from ceryle.commands.executable import Executable
 logger = logging.getLogger(__name__)
 
 
+class _PlatformFlag:
+    """
+    evaluates the platform when the flag is accessed, not when this module is imported.
+    """
+
+    def __init__(self, test):
+        self._test = test
+
+    def __get__(self, obj, owner):
+        return self._test()
+
+
 class Condition:
-    WIN = util.is_win()
-    LINUX = util.is_linux()
-    MAC = util.is_mac()
+    WIN = _PlatformFlag(util.is_win)
+    LINUX = _PlatformFlag(util.is_linux)
+    MAC = _PlatformFlag(util.is_mac)
     NO_INPUT = builtin.no_input()
     HAS_INPUT = builtin.has_input()
     all = builtin.execute_all
@@ -29,7 +41,12 @@ class Condition:
         logger.debug(f'inputs: {inputs}')
         if isinstance(self._condition, bool):
             return dry_run or self._condition
-        return dry_run or self._test_executable(context=context, inputs=inputs)
+        if dry_run:
+            return True
+        with util.trace_span(str(self._condition), cat='condition') as span:
+            res = self._test_executable(context=context, inputs=inputs)
+            span.set(result=res)
+            return res
 
     def _test_executable(self, context=None, inputs=[]):
         res = self._condition.execute(context=context, inputs=inputs)
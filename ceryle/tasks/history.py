@@ -0,0 +1,200 @@
+import logging
+import os
+import pathlib
+import platform
+import sqlite3
+
+from ceryle.const import CERYLE_DIR, CERYLE_HISTORY_FILENAME
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    task TEXT NOT NULL,
+    root_context TEXT,
+    started REAL NOT NULL,
+    duration REAL NOT NULL,
+    success INTEGER NOT NULL,
+    host TEXT,
+    cpus INTEGER
+);
+CREATE INDEX IF NOT EXISTS runs_context_started ON runs (root_context, started);
+CREATE TABLE IF NOT EXISTS groups (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    name TEXT NOT NULL,
+    started REAL NOT NULL,
+    duration REAL NOT NULL,
+    success INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS groups_name_started ON groups (name, started);
+CREATE INDEX IF NOT EXISTS groups_run ON groups (run_id);
+CREATE TABLE IF NOT EXISTS tasks (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    group_name TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    duration REAL NOT NULL,
+    return_code INTEGER
+);
+CREATE INDEX IF NOT EXISTS tasks_group ON tasks (group_name, run_id);
+'''
+
+
+def percentile(values, p):
+    """
+    nearest-rank percentile of values, or None if empty.
+    """
+    if not values:
+        return None
+    s = sorted(values)
+    return s[max(0, min(len(s) - 1, -(-len(s) * p // 100) - 1))]
+
+
+def trend(durations):
+    """
+    ratio of the median of the later half to the one of the former half, or None if less than 4 durations.
+    durations are in chronological order.
+    """
+    if len(durations) < 4:
+        return None
+    half = len(durations) // 2
+    before = percentile(durations[:half], 50)
+    if not before:
+        return None
+    return percentile(durations[-half:], 50) / before
+
+
+class RunHistory:
+    """
+    durations and results of task groups and tasks of each run, stored in SQLite.
+    """
+
+    def __init__(self, path):
+        self._path = pathlib.Path(path)
+        self._conn = None
+
+    @staticmethod
+    def default():
+        return RunHistory(pathlib.Path.home().joinpath(CERYLE_DIR, CERYLE_HISTORY_FILENAME))
+
+    def _connect(self):
+        if self._conn is None:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self._path), timeout=10)
+            version = conn.execute('PRAGMA user_version').fetchone()[0]
+            if version not in (0, SCHEMA_VERSION):
+                conn.close()
+                raise sqlite3.DatabaseError(f'unsupported schema version {version} of {self._path}')
+            with conn:
+                conn.executescript(_SCHEMA)
+                conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def record(self, task, root_context, started, duration, success, timings):
+        """
+        timings are the form of TaskRunner.get_timings().
+        """
+        conn = self._connect()
+        with conn:
+            run_id = conn.execute(
+                'INSERT INTO runs (task, root_context, started, duration, success, host, cpus) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (task, root_context, started, duration, int(success), platform.node(), os.cpu_count())).lastrowid
+            conn.executemany(
+                'INSERT INTO groups (run_id, name, started, duration, success) VALUES (?, ?, ?, ?, ?)',
+                [(run_id, g['name'], g['started'], g['duration'], int(g['success'])) for g in timings])
+            conn.executemany(
+                'INSERT INTO tasks (run_id, group_name, seq, name, duration, return_code) VALUES (?, ?, ?, ?, ?, ?)',
+                [(run_id, g['name'], i, t['name'], t['duration'], t['return_code'])
+                 for g in timings for i, t in enumerate(g['tasks'])])
+        return run_id
+
+    def _last_run_ids(self, root_context, last):
+        rows = self._connect().execute(
+            'SELECT id FROM runs WHERE root_context IS ? ORDER BY started DESC LIMIT ?', (root_context, last))
+        return [r[0] for r in rows]
+
+    def runs(self, root_context, last=20):
+        """
+        form: [(<task: str>, <started: float>, <duration: float>, <success: bool>)], the latest first
+        """
+        rows = self._connect().execute(
+            'SELECT task, started, duration, success FROM runs WHERE root_context IS ? '
+            'ORDER BY started DESC LIMIT ?', (root_context, last))
+        return [(t, s, d, bool(ok)) for t, s, d, ok in rows]
+
+    def group_stats(self, root_context, last=20):
+        """
+        statistics of each task group in the last runs, the slowest by p95 first.
+        form: [{'name': <str>, 'runs': <int>, 'failures': <int>, 'p50': <float>, 'p95': <float>, 'max': <float>,
+                'trend': <float or None>}]
+        """
+        ids = self._last_run_ids(root_context, last)
+        if not ids:
+            return []
+        rows = self._connect().execute(
+            f'SELECT name, duration, success FROM groups WHERE run_id IN ({",".join(["?"] * len(ids))}) '
+            'ORDER BY started', ids)
+        durations = {}
+        failures = {}
+        for name, duration, success in rows:
+            durations.setdefault(name, []).append(duration)
+            failures[name] = failures.get(name, 0) + (0 if success else 1)
+        stats = [_stats(name, ds, failures[name]) for name, ds in durations.items()]
+        return sorted(stats, key=lambda s: s['p95'], reverse=True)
+
+    def group_history(self, name, root_context, last=20):
+        """
+        durations of a task group in the last runs running it, the latest first.
+        form: [(<started: float>, <duration: float>, <success: bool>)]
+        """
+        rows = self._connect().execute(
+            'SELECT g.started, g.duration, g.success FROM groups g JOIN runs r ON g.run_id = r.id '
+            'WHERE g.name = ? AND r.root_context IS ? ORDER BY g.started DESC LIMIT ?', (name, root_context, last))
+        return [(s, d, bool(ok)) for s, d, ok in rows]
+
+    def task_stats(self, group_name, root_context, last=20):
+        """
+        statistics of tasks of a task group in the last runs running it, in order of the tasks.
+        form: [{'name': <str>, 'runs': <int>, 'failures': <int>, 'p50': <float>, 'p95': <float>, 'max': <float>,
+                'trend': <float or None>}]
+        """
+        rows = self._connect().execute(
+            'SELECT t.seq, t.name, t.duration, t.return_code FROM tasks t WHERE t.group_name = ? AND t.run_id IN ('
+            '  SELECT g.run_id FROM groups g JOIN runs r ON g.run_id = r.id'
+            '  WHERE g.name = ? AND r.root_context IS ? ORDER BY g.started DESC LIMIT ?'
+            ') ORDER BY t.run_id, t.seq', (group_name, group_name, root_context, last))
+        tasks = {}
+        for seq, name, duration, return_code in rows:
+            durations, failures = tasks.setdefault((seq, name), ([], [0]))
+            durations.append(duration)
+            failures[0] += 0 if return_code in (0, None) else 1
+        return [_stats(name, ds, f[0]) for (_, name), (ds, f) in sorted(tasks.items())]
+
+
+def _stats(name, durations, failures):
+    return {
+        'name': name,
+        'runs': len(durations),
+        'failures': failures,
+        'p50': percentile(durations, 50),
+        'p95': percentile(durations, 95),
+        'max': max(durations),
+        'trend': trend(durations),
+    }
@@ -0,0 +1,98 @@
+import os
+import pathlib
+
+# name, type, help and value of each metric of a run, which dashboards depend on
+_RUN_METRICS = [
+    ('ceryle_run_duration_seconds', 'gauge', 'wall time of the last run.',
+     lambda r: r['duration']),
+    ('ceryle_run_success', 'gauge', '1 if the last run succeeded, otherwise 0.',
+     lambda r: int(r['success'])),
+    ('ceryle_run_timestamp_seconds', 'gauge', 'time when the last run started in seconds since the epoch.',
+     lambda r: r['started']),
+    ('ceryle_run_task_groups', 'gauge', 'number of task groups run by the last run.',
+     lambda r: len(r['timings'])),
+]
+
+_TASK_GROUP_METRICS = [
+    ('ceryle_task_group_duration_seconds', 'gauge', 'wall time of the task group in the last run.',
+     lambda g: g['duration']),
+    ('ceryle_task_group_success', 'gauge', '1 if the task group succeeded in the last run, otherwise 0.',
+     lambda g: int(g['success'])),
+    ('ceryle_task_group_tasks', 'gauge', 'number of tasks of the task group run by the last run.',
+     lambda g: len(g['tasks'])),
+    ('ceryle_task_group_task_failures', 'gauge',
+     'number of tasks of the task group which exited with non-zero codes in the last run, including ignored ones.',
+     lambda g: len([t for t in g['tasks'] if t['return_code'] not in (0, None)])),
+    ('ceryle_task_group_registered_bytes', 'gauge',
+     'bytes of outputs of the task group stored into the register in the last run.',
+     lambda g: sum([t.get('registered_bytes', 0) for t in g['tasks']])),
+]
+
+_CPU_METRIC = ('ceryle_process_cpu_seconds_total', 'counter',
+               'CPU time of the ceryle process and of its child processes since it started.')
+
+
+def cpu_seconds():
+    """
+    form: {<process: str>: <seconds: float>}, processes are ceryle and children.
+    """
+    t = os.times()
+    return {'ceryle': t.user + t.system, 'children': t.children_user + t.children_system}
+
+
+def metrics_lines(task, started, duration, success, timings, cpu=None):
+    """
+    generates metrics of a run in the Prometheus text format read by the textfile collector of node_exporter.
+    timings are the form of TaskRunner.get_timings(), and cpu is the form of cpu_seconds().
+    """
+    run = {'started': started, 'duration': duration, 'success': success, 'timings': timings}
+    labels = {'task': task}
+    for name, metric_type, help_text, value in _RUN_METRICS:
+        yield from _header(name, metric_type, help_text)
+        yield _sample(name, labels, value(run))
+    for name, metric_type, help_text, value in _TASK_GROUP_METRICS:
+        yield from _header(name, metric_type, help_text)
+        for g in timings:
+            yield _sample(name, {'task': task, 'task_group': g['name']}, value(g))
+    name, metric_type, help_text = _CPU_METRIC
+    yield from _header(name, metric_type, help_text)
+    for process, seconds in sorted((cpu or cpu_seconds()).items()):
+        yield _sample(name, {'task': task, 'process': process}, seconds)
+
+
+def write_metrics_file(path, lines):
+    """
+    writes lines atomically, so that a collector never reads a partial file.
+    the temporary file does not end with .prom, which the collector ignores.
+    """
+    path = pathlib.Path(path)
+    tmp = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    try:
+        with open(tmp, 'w') as fp:
+            for line in lines:
+                fp.write(line + '\n')
+        os.replace(str(tmp), str(path))
+    except BaseException:
+        if tmp.exists():
+            tmp.unlink()
+        raise
+
+
+def _header(name, metric_type, help_text):
+    yield f'# HELP {name} {help_text}'
+    yield f'# TYPE {name} {metric_type}'
+
+
+def _sample(name, labels, value):
+    label_s = ','.join([f'{k}="{_escape(v)}"' for k, v in labels.items()])
+    return f'{name}{{{label_s}}} {_format_value(value)}'
+
+
+def _escape(v):
+    return str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(v):
+    if isinstance(v, float):
+        return repr(round(v, 6))
+    return str(v)
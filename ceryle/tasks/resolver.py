@@ -1,4 +1,5 @@
-import difflib
+import collections
+import heapq
 import logging
 
 import ceryle.util as util
@@ -12,11 +13,13 @@ class DependencyResolver:
         self._task_groups = [util.assert_type(tg, TaskGroup)
                              for tg in util.assert_type(task_groups, list)]
         self._deps_chain_map = None
+        self._name_index = None
 
     def validate(self):
         if self._deps_chain_map is None:
-            chain_map = _construct_chain_map(self._task_groups)
-            self._deps_chain_map = _reconstruct(chain_map)
+            graph = _Graph(self._task_groups)
+            graph.check()
+            self._deps_chain_map = graph.chain_map()
 
     def deps_chain_map(self):
         """
@@ -26,6 +29,14 @@ class DependencyResolver:
         self.validate()
         return dict(self._deps_chain_map)
 
+    def reachability_index(self):
+        """
+        builds the transitive closure of dependencies to answer queries on the graph.
+        """
+        graph = _Graph(self._task_groups)
+        graph.check()
+        return graph.reachability_index()
+
     def find_similar(self, task_group_name, ratio=0.55):
         tg = util.assert_type(task_group_name, str)
         r = util.assert_type(ratio, float)
@@ -33,45 +44,260 @@ class DependencyResolver:
             raise ValueError(f'ratio must by in range 0.0 to 1.0, but {r}')
 
         self.validate()
-        seqs = [(s.ratio(), s.b) for s in
-                [difflib.SequenceMatcher(a=tg, b=name) for name in self._deps_chain_map]]
-        return [self._deps_chain_map[seq[1]] for seq in sorted(seqs, key=lambda s: s[0], reverse=True)
-                if seq[0] > r]
-
-
-def _construct_chain_map(task_groups):
-    deps_map = dict([(tg.name, tg) for tg in task_groups])
-    dcm = {}
-    for tg in task_groups:
-        tgn = tg.name
-        c = dcm.get(tgn)
-        if c is None:
-            c = DependencyChain(tg)
-            dcm[tgn] = c
-        for tg_dep in tg.dependencies:
-            if tg_dep not in deps_map:
-                raise TaskDependencyError(f'task {tg_dep} depended by {tgn} is not defined')
-            if tgn == tg_dep:
-                raise TaskDependencyError(f'cyclic dependency was found: {tgn} -> {tg_dep}')
-            tg_dep_c = dcm.get(tg_dep, DependencyChain(deps_map.get(tg_dep)))
-            if tg_dep_c.depends_on(c):
-                chain_str = ' -> '.join([tgn, *[c1.task_name for c1 in tg_dep_c.get_chain(c, include_self=True)]])
-                raise TaskDependencyError(f'cyclic dependency was found: {chain_str}')
-
-            dcm[tg_dep] = tg_dep_c
-            c.add_dependency(tg_dep_c)
-    return dcm
-
-
-def _reconstruct(chain_map):
-    reconstructed = {}
-    for t, chain in chain_map.items():
-        c = DependencyChain(chain.root)
-        for d in chain.deps:
-            if not c.add_dependency(d):
-                logger.debug(f'{t} is already depending {d}')
-        reconstructed[t] = c
-    return reconstructed
+        if self._name_index is None:
+            self._name_index = util.SimilarNameIndex(self._deps_chain_map)
+        return [self._deps_chain_map[name] for _, name in self._name_index.find(tg, ratio=r)]
+
+
+class _Graph:
+    """
+    dependency graph of task groups, in which task groups are interned to integer ids.
+    """
+
+    def __init__(self, task_groups):
+        ids = {}
+        for tg in task_groups:
+            ids[tg.name] = len(ids) if tg.name not in ids else ids[tg.name]
+        self._ids = ids
+        self._nodes = [None] * len(ids)
+        for tg in task_groups:
+            # the last one is used if task groups of the same name are given
+            self._nodes[ids[tg.name]] = tg
+        self._edges = None
+
+    def check(self):
+        """
+        raises TaskDependencyError if undefined task groups are depended or dependencies are cyclic.
+        """
+        edges = []
+        for tg in self._nodes:
+            for d in tg.dependencies:
+                if d not in self._ids:
+                    raise TaskDependencyError(f'task {d} depended by {tg.name} is not defined')
+            edges.append([self._ids[d] for d in tg.dependencies])
+        self._edges = edges
+
+        self._order, cycles = self._strongly_connected_components()
+        if cycles:
+            raise TaskDependencyError(f'cyclic dependency was found: {", ".join(cycles)}')
+
+    def _strongly_connected_components(self):
+        """
+        finds strongly connected components by Tarjan's algorithm without recursion.
+        form: (<ids in order that dependencies come first: list>, <cycles: list of str>)
+        """
+        n = len(self._nodes)
+        edges = self._edges
+        index = [-1] * n
+        low = [0] * n
+        on_stack = [False] * n
+        stack = []
+        order = []
+        cycles = []
+        counter = 0
+        for root in range(n):
+            if index[root] >= 0:
+                continue
+            work = [(root, 0)]
+            while work:
+                v, i = work.pop()
+                if i == 0:
+                    index[v] = low[v] = counter
+                    counter += 1
+                    stack.append(v)
+                    on_stack[v] = True
+                if i < len(edges[v]):
+                    work.append((v, i + 1))
+                    w = edges[v][i]
+                    if index[w] < 0:
+                        work.append((w, 0))
+                    elif on_stack[w]:
+                        low[v] = min(low[v], index[w])
+                    continue
+                if work:
+                    u = work[-1][0]
+                    low[u] = min(low[u], low[v])
+                if low[v] == index[v]:
+                    component = []
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = False
+                        component.append(w)
+                        if w == v:
+                            break
+                    if len(component) > 1 or v in edges[v]:
+                        cycles.append(self._cycle_str(min(component), set(component)))
+                    order.extend(reversed(component))
+        return order, cycles
+
+    def _cycle_str(self, start, component):
+        """
+        returns the shortest cycle from start in a strongly connected component.
+        """
+        prev = {}
+        queue = collections.deque([start])
+        while queue:
+            v = queue.popleft()
+            for w in self._edges[v]:
+                if w == start:
+                    path = [v]
+                    while path[-1] != start:
+                        path.append(prev[path[-1]])
+                    names = [self._nodes[i].name for i in [start, *reversed(path[:-1]), start]]
+                    return ' -> '.join(names)
+                if w in component and w not in prev:
+                    prev[w] = v
+                    queue.append(w)
+        raise AssertionError(f'no cycle from {self._nodes[start].name}')
+
+    def chain_map(self):
+        """
+        constructs chains in order that dependencies come first.
+        a dependency is omitted if it can be skipped and is reachable from preceding dependencies.
+        """
+        pos = [0] * len(self._nodes)
+        for i, v in enumerate(self._order):
+            pos[v] = i
+        chains = {}
+        for v in self._order:
+            c = DependencyChain(self._nodes[v])
+            c._deps = [chains[d] for d in self._kept_deps(v, pos)]
+            chains[v] = c
+        return dict([(self._nodes[v].name, chains[v]) for v in range(len(self._nodes))])
+
+    def _kept_deps(self, v, pos):
+        """
+        a dependency is reachable from preceding ones only through task groups ordered after it,
+        so task groups found from preceding dependencies are expanded lazily in descending order
+        until the position of the dependency looked for.
+        this visits task groups near the dependencies in most graphs, instead of all reachable ones.
+        """
+        deps = self._edges[v]
+        if len(deps) < 2:
+            return list(deps)
+        kept = []
+        seen = set()
+        # found but not expanded yet, the latest in order first
+        pending = []
+        for d in deps:
+            if self._nodes[d].allow_skip:
+                while pending and -pending[0][0] > pos[d]:
+                    _, w = heapq.heappop(pending)
+                    for x in self._edges[w]:
+                        if x not in seen:
+                            seen.add(x)
+                            heapq.heappush(pending, (-pos[x], x))
+                if d in seen:
+                    continue
+            kept.append(d)
+            if d not in seen:
+                seen.add(d)
+                heapq.heappush(pending, (-pos[d], d))
+        return kept
+
+    def reachability_index(self):
+        number = [0] * len(self._nodes)
+        for i, v in enumerate(self._order):
+            number[v] = i
+        return ReachabilityIndex([self._nodes[v].name for v in self._order],
+                                 [[number[d] for d in self._edges[v]] for v in self._order])
+
+
+class ReachabilityIndex:
+    """
+    transitive closure of dependencies in bit sets, over task groups numbered in topological order.
+    a task group is numbered after all of its dependencies, so ascending numbers are the order to run.
+    this takes n^2 / 4 bytes for n task groups.
+    """
+
+    def __init__(self, names, edges):
+        self._names = names
+        self._ids = dict([(name, i) for i, name in enumerate(names)])
+        self._edges = [sorted(set(deps)) for deps in edges]
+        self._redges = [[] for _ in names]
+        for v, deps in enumerate(self._edges):
+            for d in deps:
+                self._redges[d].append(v)
+
+        # dependencies are numbered smaller, dependents are numbered larger
+        self._deps = [0] * len(names)
+        for v, deps in enumerate(self._edges):
+            bits = 0
+            for d in deps:
+                bits |= self._deps[d] | (1 << d)
+            self._deps[v] = bits
+        self._rdeps = [0] * len(names)
+        for v in reversed(range(len(names))):
+            bits = 0
+            for r in self._redges[v]:
+                bits |= self._rdeps[r] | (1 << r)
+            self._rdeps[v] = bits
+
+    def __contains__(self, name):
+        return name in self._ids
+
+    def _id(self, name):
+        i = self._ids.get(util.assert_type(name, str))
+        if i is None:
+            raise TaskDependencyError(f'task {name} is not defined')
+        return i
+
+    def depends_on(self, name, dep):
+        """
+        returns True if name depends on dep directly or transitively.
+        """
+        return bool(self._deps[self._id(name)] >> self._id(dep) & 1)
+
+    def dependencies(self, name, transitive=True):
+        """
+        returns names of task groups which name depends on, in order to run.
+        """
+        i = self._id(name)
+        if not transitive:
+            return [self._names[d] for d in self._edges[i]]
+        return [self._names[d] for d in _bit_indices(self._deps[i])]
+
+    def dependents(self, name, transitive=True):
+        """
+        returns names of task groups depending on name, in order to run.
+        """
+        i = self._id(name)
+        if not transitive:
+            return [self._names[r] for r in sorted(self._redges[i])]
+        return [self._names[r] for r in _bit_indices(self._rdeps[i])]
+
+    def shortest_path(self, name, dep):
+        """
+        returns the shortest dependency path from name to dep, or None if name does not depend on dep.
+        form: [<name>, ..., <dep>]
+        """
+        src, dst = self._id(name), self._id(dep)
+        if not self._deps[src] >> dst & 1:
+            return None
+        prev = {src: None}
+        queue = collections.deque([src])
+        while dst not in prev:
+            v = queue.popleft()
+            for d in self._edges[v]:
+                # only task groups which reach to dep are visited
+                if d not in prev and (d == dst or self._deps[d] >> dst & 1):
+                    prev[d] = v
+                    queue.append(d)
+        path = [dst]
+        while prev[path[-1]] is not None:
+            path.append(prev[path[-1]])
+        return [self._names[v] for v in reversed(path)]
+
+
+def _bit_indices(bits):
+    # scanning the binary string runs in C, much faster than shifting a large int bit by bit
+    s = bin(bits)[:1:-1]
+    res = []
+    i = s.find('1')
+    while i >= 0:
+        res.append(i)
+        i = s.find('1', i + 1)
+    return res
 
 
 class DependencyChain:
@@ -129,6 +355,8 @@ class DependencyChain:
         return str(self)
 
     def __eq__(self, other):
+        if self is other:
+            return True
         if isinstance(other, DependencyChain):
             return self.task_name == other.task_name and self._deps == other._deps
         return False
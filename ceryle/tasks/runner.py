@@ -1,5 +1,6 @@
 import logging
 import pickle
+import time
 
 import ceryle.util as util
 from ceryle import IllegalOperation
@@ -11,43 +12,85 @@ logger = logging.getLogger(__name__)
 
 
 class TaskRunner:
-    def __init__(self, task_groups):
-        self._resolver = DependencyResolver(task_groups)
+    def __init__(self, task_groups, resolver=None):
+        """
+        resolver already validated, e.g. loaded from a task bundle, is used as is if given.
+        """
+        self._resolver = resolver or DependencyResolver(task_groups)
         self._resolver.validate()
         self._run_cache = None
+        self._timings = []
         self._sw = util.StopWatch()
 
-    def run(self, task_group, dry_run=False, last_run=None):
-        chain = self._resolver.deps_chain_map().get(util.assert_type(task_group, str))
-        if chain is None:
-            print_similar_task_groups(self._resolver.find_similar(task_group))
-            raise TaskDefinitionError(f'task {task_group} is not defined')
+    def run(self, task_group, dry_run=False, last_run=None, only=None, register={}):
+        """
+        when only is given, task groups not in it are skipped and outputs of them are taken from register.
+        """
+        chain = self.get_chain(task_group)
         self._run_cache = RunCache(task_group)
+        self._timings = []
         if last_run is not None:
             logger.debug(f'last run: {last_run}')
         last_execution = LastExecution(last_run)
         if last_execution.task_name != task_group:
             last_execution.stop()
         self._sw.start()
-        res, _ = self._run(chain, dry_run=dry_run, last_execution=last_execution)
+        res, _ = self._run(chain, dry_run=dry_run, register=register, last_execution=last_execution,
+                           only=None if only is None else set(only))
         return res
 
+    def get_chain(self, task_group):
+        chain = self._resolver.deps_chain_map().get(util.assert_type(task_group, str))
+        if chain is None:
+            print_similar_task_groups(self._resolver.find_similar(task_group))
+            raise TaskDefinitionError(f'task {task_group} is not defined')
+        return chain
+
     def get_cache(self):
         if self._run_cache is None:
             raise IllegalOperation('could not get cache before running')
         return self._run_cache
 
-    def _run(self, chain, dry_run=False, register={}, last_execution=None):
+    def get_timings(self):
+        """
+        timings of task groups run by the last run, skipped ones are not included.
+        form: [{
+          'name': <str>, 'started': <epoch seconds: float>, 'duration': <seconds: float>, 'success': <bool>,
+          'tasks': [{'name': <str>, 'duration': <seconds: float>, 'return_code': <int or None>,
+                     'registered_bytes': <int>}],
+        }]
+        """
+        return list(self._timings)
+
+    def _add_timing(self, tg, started, beg, success):
+        self._timings.append({
+            'name': tg.name,
+            'started': started,
+            'duration': time.perf_counter() - beg,
+            'success': bool(success),
+            'tasks': [{'name': str(t.executable), 'duration': t.duration, 'return_code': t.return_code,
+                       'registered_bytes': t.registered_bytes}
+                      for t in tg.tasks if t.duration is not None],
+        })
+
+    def _run(self, chain, dry_run=False, register={}, last_execution=None, only=None):
+        tg = chain.root
+        # checked before dependencies, otherwise dependencies shared by many task groups are walked repeatedly
+        if tg.allow_skip and self._run_cache.has(chain.task_name):
+            logger.info(f'skipping {chain} since it has already run')
+            return True, register
+
         reg = copy_register(register)
         for c in chain.deps:
-            res, reg = self._run(c, dry_run=dry_run, register=reg, last_execution=last_execution)
+            res, reg = self._run(c, dry_run=dry_run, register=reg, last_execution=last_execution, only=only)
             if not res:
                 return False, reg
 
-        tg = chain.root
-        if tg.allow_skip and self._run_cache.has(chain.task_name):
-            logger.info(f'skipping {chain} since it has already run')
-            return True, register
+        if only is not None and chain.task_name not in only:
+            logger.info(f'skipping {chain} since it is not affected')
+            self._run_cache.add_result((chain.task_name, True))
+            self._run_cache.update_register(reg)
+            return True, reg
 
         if last_execution.check_skip(chain.task_name):
             logger.info(f'skipping {chain} since succeeded last run')
@@ -58,14 +101,19 @@ class TaskRunner:
         else:
             last_execution.stop()
 
+        started, beg = time.time(), time.perf_counter()
         try:
             util.print_out(f'running task group {chain.task_name} ({tg.context})', level=logging.INFO)
-            res, reg = tg.run(dry_run=dry_run, register=reg)
+            with util.trace_span(chain.task_name, cat='task group', context=str(tg.context)) as span:
+                res, reg = tg.run(dry_run=dry_run, register=reg)
+                span.set(success=res)
             self._sw.elapse()
             util.print_out(f'finished {chain.task_name} {self._sw.str_last_lap()}', level=logging.INFO)
         except Exception:
             self._run_cache.add_result((chain.task_name, False))
+            self._add_timing(tg, started, beg, False)
             raise
+        self._add_timing(tg, started, beg, res)
         self._run_cache.add_result((chain.task_name, res and not dry_run))
         self._run_cache.update_register(reg)
         return res, reg
@@ -2,11 +2,12 @@ import abc
 import logging
 import os
 import pathlib
+import time
 
 import ceryle
 import ceryle.util as util
 
-from ceryle.commands.executable import Executable, ExecutionResult
+from ceryle.commands.executable import Executable, ExecutionResult, materialize
 from ceryle.tasks import TaskIOError
 from ceryle.tasks.condition import Condition
 
@@ -24,8 +25,17 @@ class Task:
         self._ignore_failure = util.assert_type(ignore_failure, bool)
         self._condition = None if conditional_on is None else Condition(conditional_on)
         self._res = None
+        self._duration = None
 
     def run(self, context, dry_run=False, inputs=[]):
+        with util.trace_span(str(self._executable), cat='task', dry_run=dry_run) as span:
+            beg = time.perf_counter()
+            success = self._run(context, dry_run=dry_run, inputs=inputs)
+            self._duration = time.perf_counter() - beg
+            span.set(success=success)
+            return success
+
+    def _run(self, context, dry_run=False, inputs=[]):
         msg = f'running {self._executable}'
         iomsg = ', '.join([f'{io[0]}={io[1]}'
                            for io in [('input', self._input), ('stdout', self._stdout), ('stderr', self._stderr)]
@@ -38,6 +48,8 @@ class Task:
             self._res = ExecutionResult(0)
             return True
         if dry_run:
+            for line in self._executable.dry_run(context=context, inputs=inputs):
+                util.print_out(util.indent_s(line, 2))
             self._res = ExecutionResult(0)
             return True
         logger.debug(f'context={context}')
@@ -77,6 +89,27 @@ class Task:
             raise ceryle.IllegalOperation('task is not run yet')
         return self._res.stderr
 
+    @property
+    def duration(self):
+        """
+        seconds taken by the last run, or None if not run yet.
+        """
+        return self._duration
+
+    @property
+    def return_code(self):
+        return None if self._res is None else self._res.return_code
+
+    @property
+    def registered_bytes(self):
+        """
+        size of outputs of the last run stored into the register.
+        """
+        if self._res is None:
+            return 0
+        stds = [std for key, std in [(self._stdout, self._res.stdout), (self._stderr, self._res.stderr)] if key]
+        return sum([len(line.encode()) for std in stds for line in std])
+
     @property
     def ignore_failure(self):
         return self._ignore_failure
@@ -86,6 +119,19 @@ class Task:
         return self._condition
 
 
+class TaskSpec:
+    """
+    arguments of a task declared in a task file, built into Task when the task group is run or validated.
+    """
+
+    def __init__(self, executable, **kwargs):
+        self._executable = executable
+        self._kwargs = kwargs
+
+    def build(self):
+        return Task(materialize(self._executable), **self._kwargs)
+
+
 def _to_command_input(input):
     if input is None:
         return None
@@ -106,13 +152,14 @@ def _to_command_input(input):
 
 class TaskGroup:
     def __init__(self, name, tasks, context, filename,
-                 dependencies=[], allow_skip=True):
+                 dependencies=[], allow_skip=True, inputs=[]):
         self._name = util.assert_type(name, str)
-        self._tasks = [util.assert_type(t, Task) for t in util.assert_type(tasks, list)]
+        self._tasks = [util.assert_type(t, Task, TaskSpec) for t in util.assert_type(tasks, list)]
         self._context = util.assert_type(context, str, pathlib.Path)
         self._dependencies = [util.assert_type(d, str) for d in util.assert_type(dependencies, list)]
         self._filename = util.assert_type(filename, str, pathlib.Path)
         self._allow_skip = util.assert_type(allow_skip, bool)
+        self._inputs = util.to_patterns(inputs)
 
     @property
     def name(self):
@@ -120,8 +167,17 @@ class TaskGroup:
 
     @property
     def tasks(self):
+        self.validate()
         return list(self._tasks)
 
+    def validate(self):
+        """
+        builds tasks declared in a task file, which raises errors of their declarations.
+        this is deferred until tasks are needed since most of task groups are not run.
+        """
+        if any([isinstance(t, TaskSpec) for t in self._tasks]):
+            self._tasks = [t.build() if isinstance(t, TaskSpec) else t for t in self._tasks]
+
     @property
     def context(self):
         return self._context
@@ -134,6 +190,13 @@ class TaskGroup:
     def allow_skip(self):
         return self._allow_skip
 
+    @property
+    def inputs(self):
+        """
+        glob patterns relative to context of files the tasks read, empty when not declared.
+        """
+        return list(self._inputs)
+
     @property
     def filename(self):
         return self._filename
@@ -0,0 +1,107 @@
+import json
+
+import ceryle.util as util
+
+_EXPAND = 0
+_TASKS = 1
+
+
+def _unique_chains(chain):
+    """
+    visits chain and all of its dependencies once in depth first order.
+    """
+    visited = set([chain.task_name])
+    stack = [chain]
+    while stack:
+        c = stack.pop()
+        yield c
+        for d in reversed(c.deps):
+            if d.task_name not in visited:
+                visited.add(d.task_name)
+                stack.append(d)
+
+
+def text_lines(chain, verbose=0, relpath=str):
+    """
+    generates lines of the dependency tree of chain.
+    a task group shown once is referred afterwards instead of expanding its dependencies again,
+    and is omitted if it is skippable.
+    """
+    shown = set()
+    stack = [(_EXPAND, chain, 0)]
+    while stack:
+        op, c, depth = stack.pop()
+        indent = depth * 4
+        if op == _TASKS:
+            yield util.indent_s('tasks:', indent + 2)
+            for t in c.root.tasks:
+                yield util.indent_s(f'{t.executable}', indent + 4)
+            continue
+
+        if c.task_name in shown:
+            yield util.indent_s(f'{c.task_name}: (see above)', indent)
+            continue
+        shown.add(c.task_name)
+        if verbose > 0:
+            yield util.indent_s(f'{c.task_name}: ({relpath(c.root.filename)})', indent)
+        else:
+            yield util.indent_s(f'{c.task_name}:', indent)
+
+        if verbose > 0 and c.root.tasks:
+            stack.append((_TASKS, c, depth))
+        deps = [d for d in c.deps if not d.root.allow_skip or d.task_name not in shown]
+        if deps:
+            yield util.indent_s('dependencies:', indent + 2)
+        stack.extend([(_EXPAND, d, depth + 1) for d in reversed(deps)])
+
+
+def _dot_id(name):
+    return json.dumps(name, ensure_ascii=False)
+
+
+def dot_lines(chain, verbose=0, relpath=str):
+    """
+    generates a graph of chain in DOT language, in which each task group is a node.
+    """
+    yield f'digraph {_dot_id(chain.task_name)} {{'
+    for c in _unique_chains(chain):
+        if verbose > 0:
+            yield f'    {_dot_id(c.task_name)} [tooltip={_dot_id(relpath(c.root.filename))}];'
+        else:
+            yield f'    {_dot_id(c.task_name)};'
+        for d in c.deps:
+            yield f'    {_dot_id(c.task_name)} -> {_dot_id(d.task_name)};'
+    yield '}'
+
+
+def json_lines(chain, verbose=0, relpath=str):
+    """
+    generates a JSON document of chain, one task group per line.
+    form: {
+      'root': <name: str>,
+      'task_groups': [{'name': <str>, 'filename': <str>, 'dependencies': [<str>], 'tasks': [<str>] if verbose}],
+    }
+    """
+    yield f'{{"root": {json.dumps(chain.task_name)}, "task_groups": ['
+    last = None
+    for c in _unique_chains(chain):
+        entry = {
+            'name': c.task_name,
+            'filename': relpath(c.root.filename),
+            'dependencies': [d.task_name for d in c.deps],
+        }
+        if verbose > 0:
+            entry['tasks'] = [f'{t.executable}' for t in c.root.tasks]
+        if last is not None:
+            yield f'    {last},'
+        last = json.dumps(entry)
+    yield f'    {last}'
+    yield ']}'
+
+
+def tree_lines(chain, output_format='text', verbose=0, relpath=str):
+    return {
+        'text': text_lines,
+        'dot': dot_lines,
+        'json': json_lines,
+    }[output_format](chain, verbose=verbose, relpath=relpath)
@@ -1,6 +1,12 @@
 from .assertions import assert_type
 from .capture import std_capture
-from .functions import getin, find_task_file, parse_to_ast, collect_task_files, collect_extension_files
+from .discovery import DirectoryIndex, discover_files, collect_task_files, collect_extension_files
+from .functions import getin, default_workers, find_task_file, parse_to_ast
+from .pathmatch import GlobMatcher, split_glob, to_patterns, walk_glob
 from .platform import is_linux, is_mac, is_win
 from .printutils import print_out, print_err, print_stream, indent_s
+from .profile import SamplingProfiler
+from .similarity import SimilarNameIndex
 from .time import StopWatch
+from .trace import Tracer, start_tracing, stop_tracing, trace_span
+from .watcher import create_watcher
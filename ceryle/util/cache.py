@@ -0,0 +1,52 @@
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# files modified within this period may be modified again within the same mtime tick
+_RACY_PERIOD_NS = 2 * 10 ** 9
+
+
+def load_json_cache(path, version):
+    """
+    returns cached data, or None if the cache does not exist, is broken or has another version.
+    """
+    if path is None or not path.is_file():
+        return None
+    try:
+        with open(path) as fp:
+            data = json.load(fp)
+        if data.get('version') == version:
+            return data['data']
+    except Exception as e:
+        logger.warn(f'failed to load cache: {path}')
+        logger.warn(e)
+    return None
+
+
+def save_json_cache(path, version, data):
+    """
+    writes data atomically so that concurrent invocations never read a partial cache.
+    """
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f'{path.name}.{os.getpid()}')
+        with open(tmp, 'w') as fp:
+            json.dump({'version': version, 'data': data}, fp)
+        os.replace(tmp, path)
+        return True
+    except OSError as e:
+        logger.warn(f'failed to save cache: {path}')
+        logger.warn(e)
+        return False
+
+
+def trusted_mtime(mtime_ns):
+    """
+    returns mtime_ns, or None if it is too recent to detect a following modification by mtime.
+    """
+    if int(time.time() * 10 ** 9) - mtime_ns > _RACY_PERIOD_NS:
+        return mtime_ns
+    return None
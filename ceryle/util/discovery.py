@@ -0,0 +1,134 @@
+import logging
+import os
+import pathlib
+
+from ceryle.const import CERYLE_DIR, CERYLE_TASK_DIR, CERYLE_TASK_EXT, CERYLE_EX_DIR, CERYLE_EX_FILE_EXT
+from ceryle.const import CERYLE_CACHE_DIRNAME
+from ceryle.util.cache import load_json_cache, save_json_cache, trusted_mtime
+from ceryle.util.functions import find_task_file
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = 'dir-index.json'
+INDEX_VERSION = 1
+
+
+class DirectoryIndex:
+    """
+    caches entries of directories keyed by absolute path, validated with mtime of each directory.
+    a directory whose mtime is not changed is not listed again, only stat is called.
+    """
+
+    def __init__(self, cache_file=None):
+        self._cache_file = cache_file and pathlib.Path(cache_file)
+        self._entries = self._load()
+        self._dirty = False
+
+    @staticmethod
+    def default():
+        return DirectoryIndex(pathlib.Path.home().joinpath(CERYLE_DIR, CERYLE_CACHE_DIRNAME, INDEX_FILENAME))
+
+    def _load(self):
+        return load_json_cache(self._cache_file, INDEX_VERSION) or {}
+
+    def save(self):
+        if self._cache_file is None or not self._dirty:
+            return
+        if save_json_cache(self._cache_file, INDEX_VERSION, self._entries):
+            self._dirty = False
+
+    def list_dir(self, d):
+        """
+        form: (<subdirectory names: list>, <file names: list>), or None if d is not a directory
+        """
+        key = str(d)
+        try:
+            mtime = os.stat(key).st_mtime_ns
+        except (FileNotFoundError, NotADirectoryError):
+            self._forget(key)
+            return None
+
+        cached = self._entries.get(key)
+        if cached is not None and cached['mtime'] == mtime:
+            return cached['dirs'], cached['files']
+
+        dirs, files = [], []
+        try:
+            with os.scandir(key) as it:
+                for entry in it:
+                    if not entry.is_dir():
+                        files.append(entry.name)
+                    elif not entry.is_symlink():
+                        dirs.append(entry.name)
+        except NotADirectoryError:
+            self._forget(key)
+            return None
+        dirs.sort()
+        files.sort()
+        self._entries[key] = {
+            'mtime': trusted_mtime(mtime),
+            'dirs': dirs,
+            'files': files,
+        }
+        self._dirty = True
+        return dirs, files
+
+    def _forget(self, key):
+        if self._entries.pop(key, None) is not None:
+            self._dirty = True
+
+    def rglob_files(self, root, ext):
+        """
+        returns sorted paths of files with ext under root recursively.
+        """
+        found = []
+        stack = [pathlib.Path(root)]
+        while stack:
+            d = stack.pop()
+            listed = self.list_dir(d)
+            if listed is None:
+                continue
+            dirs, files = listed
+            found.extend([str(d.joinpath(f)) for f in files if f.endswith(ext)])
+            stack.extend([d.joinpath(s) for s in dirs])
+        return sorted(found)
+
+
+def discover_files(start, index=None):
+    """
+    finds the task file from start to upper directories once, and lists both task files and extensions
+    in ceryle directories of the home and the root context.
+    form: (<task files: list>, <extension files: list>, <root context: str or None>)
+    """
+    idx = index or DirectoryIndex()
+    home = pathlib.Path.home().joinpath(CERYLE_DIR)
+    task_files = idx.rglob_files(home.joinpath(CERYLE_TASK_DIR), CERYLE_TASK_EXT)
+    ex_files = idx.rglob_files(home.joinpath(CERYLE_EX_DIR), CERYLE_EX_FILE_EXT)
+
+    default_task_file = find_task_file(start)
+    root_context = None
+    if default_task_file:
+        logger.debug(f'task file found: {default_task_file}')
+        root_context = str(pathlib.Path(default_task_file).parent)
+        root_dir = pathlib.Path(root_context, CERYLE_DIR)
+        task_files = [
+            *task_files,
+            default_task_file,
+            *idx.rglob_files(root_dir.joinpath(CERYLE_TASK_DIR), CERYLE_TASK_EXT),
+        ]
+        ex_files = [
+            *ex_files,
+            *idx.rglob_files(root_dir.joinpath(CERYLE_EX_DIR), CERYLE_EX_FILE_EXT),
+        ]
+    idx.save()
+    return task_files, ex_files, root_context
+
+
+def collect_task_files(start):
+    task_files, _, root_context = discover_files(start)
+    return task_files, root_context
+
+
+def collect_extension_files(start):
+    _, ex_files, _ = discover_files(start)
+    return ex_files
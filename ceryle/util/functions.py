@@ -1,9 +1,9 @@
 import ast
 import logging
+import os
 import pathlib
 
-from ceryle.const import DEFAULT_TASK_FILE, CERYLE_DIR, CERYLE_TASK_DIR, CERYLE_TASK_EXT
-from ceryle.const import CERYLE_EX_DIR, CERYLE_EX_FILE_EXT
+from ceryle.const import DEFAULT_TASK_FILE
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +18,10 @@ def getin(d, *keys, default=None):
     return getin(d[k], *keys[1:], default=default)
 
 
+def default_workers():
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
 def parse_to_ast(f):
     with open(f) as fp:
         code = fp.read()
@@ -38,40 +42,3 @@ def find_task_file(start):
         if t.is_file():
             return str(t)
     return None
-
-
-def collect_task_files(start):
-    home = pathlib.Path.home().joinpath(CERYLE_DIR, CERYLE_TASK_DIR)
-    files = _rglob_files(home, CERYLE_TASK_EXT)
-
-    default_task_file = find_task_file(start)
-    if default_task_file:
-        logger.debug(f'task file found: {default_task_file}')
-        files.append(default_task_file)
-
-        root_dir = pathlib.Path(default_task_file).parent.joinpath(CERYLE_DIR, CERYLE_TASK_DIR)
-        files = [
-            *files,
-            *_rglob_files(root_dir, CERYLE_TASK_EXT)
-        ]
-
-    return files, default_task_file and str(pathlib.Path(default_task_file).parent)
-
-
-def collect_extension_files(start):
-    home = pathlib.Path.home().joinpath(CERYLE_DIR, CERYLE_EX_DIR)
-    ex_files = _rglob_files(home, CERYLE_EX_FILE_EXT)
-
-    default_task_file = find_task_file(start)
-    if default_task_file:
-        ex_dir = pathlib.Path(default_task_file).parent.joinpath(CERYLE_DIR, CERYLE_EX_DIR)
-        ex_files = [
-            *ex_files,
-            *_rglob_files(ex_dir, CERYLE_EX_FILE_EXT)
-        ]
-
-    return ex_files
-
-
-def _rglob_files(p, ext):
-    return sorted([str(p) for p in p.rglob('*' + ext)])
@@ -0,0 +1,197 @@
+import fnmatch
+import os
+import pathlib
+import re
+
+from ceryle.util.assertions import assert_type
+from ceryle.util.platform import is_win
+
+RECURSIVE = '**'
+
+_MAGIC = re.compile(r'[*?[]')
+
+
+def has_magic(s):
+    return _MAGIC.search(s) is not None
+
+
+def to_patterns(patterns):
+    """
+    normalizes a glob pattern option given as None, str or list of str.
+    """
+    if patterns is None:
+        return None
+    if isinstance(assert_type(patterns, str, list), str):
+        return [patterns]
+    return [assert_type(p, str) for p in patterns]
+
+
+def split_glob(pattern):
+    """
+    splits a glob pattern into the literal base directory and the rest pattern.
+    form: (<base: str>, <pattern: str or None>)
+    """
+    parts = pathlib.PurePath(pattern).parts
+    for i, p in enumerate(parts):
+        if has_magic(p):
+            base = str(pathlib.PurePath(*parts[:i])) if i > 0 else '.'
+            return base, '/'.join(parts[i:])
+    return str(pattern), None
+
+
+class _Segment:
+    def __init__(self, s):
+        self.recursive = s == RECURSIVE
+        self._hidden = s.startswith('.')
+        self._match = re.compile(fnmatch.translate(s), re.IGNORECASE if is_win() else 0).match
+
+    def match(self, name, hidden=False):
+        if hidden and not self._hidden:
+            return False
+        return self._match(name) is not None
+
+
+def _compile(pattern):
+    return tuple([_Segment(s) for s in re.split(r'[\\/]' if is_win() else '/', pattern)
+                  if s not in ['', '.']])
+
+
+class _Patterns:
+    """
+    segment based automaton over a set of glob patterns.
+    a state is a pair of (<pattern index>, <position of the next segment>).
+    """
+
+    def __init__(self, patterns, include_hidden=True):
+        self._patterns = [_compile(p) for p in patterns]
+        self._include_hidden = include_hidden
+
+    def initial(self):
+        return self._closure([(i, 0) for i in range(len(self._patterns))])
+
+    def _closure(self, states):
+        res = set(states)
+        stack = list(states)
+        while stack:
+            i, pos = stack.pop()
+            segs = self._patterns[i]
+            if pos < len(segs) and segs[pos].recursive and (i, pos + 1) not in res:
+                res.add((i, pos + 1))
+                stack.append((i, pos + 1))
+        return frozenset(res)
+
+    def step(self, states, name):
+        if not states:
+            return states
+        hidden = not self._include_hidden and name.startswith('.')
+        nxt = []
+        for i, pos in states:
+            segs = self._patterns[i]
+            if pos >= len(segs):
+                continue
+            seg = segs[pos]
+            if seg.recursive:
+                if not hidden:
+                    nxt.append((i, pos))
+            elif seg.match(name, hidden=hidden):
+                nxt.append((i, pos + 1))
+        return self._closure(nxt)
+
+    def accepts(self, states, is_dir):
+        for i, pos in states:
+            segs = self._patterns[i]
+            if pos == len(segs):
+                # trailing '**' matches only directories as well as pathlib.Path.glob
+                if is_dir or not segs or not segs[-1].recursive:
+                    return True
+        return False
+
+    def can_descend(self, states):
+        for i, pos in states:
+            if pos < len(self._patterns[i]):
+                return True
+        return False
+
+
+class GlobMatcher:
+    """
+    matches paths against multiple include and exclude glob patterns in a single directory traversal.
+    excluded directories are pruned before descending into them.
+    """
+
+    def __init__(self, includes, excludes=[], include_hidden=True):
+        self._includes = _Patterns(includes, include_hidden=include_hidden)
+        self._excludes = _Patterns(excludes)
+
+    def walk(self, root, descend_matched=True):
+        """
+        yields pathlib.Path of matched files and directories under root.
+        descendants of a matched directory are not visited when descend_matched is False.
+        """
+        root = os.fspath(root)
+        if not os.path.isdir(root):
+            return
+
+        inc = self._includes.initial()
+        exc = self._excludes.initial()
+        if self._excludes.accepts(exc, True):
+            return
+        if self._includes.accepts(inc, True):
+            yield pathlib.Path(root)
+            if not descend_matched:
+                return
+
+        stack = [(root, inc, exc)]
+        while stack:
+            d, inc, exc = stack.pop()
+            try:
+                with os.scandir(d) as it:
+                    entries = sorted(it, key=lambda e: e.name)
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+
+            subdirs = []
+            for entry in entries:
+                is_dir = entry.is_dir()
+                exc_next = self._excludes.step(exc, entry.name)
+                if self._excludes.accepts(exc_next, is_dir):
+                    continue
+                inc_next = self._includes.step(inc, entry.name)
+                matched = self._includes.accepts(inc_next, is_dir)
+                if matched:
+                    yield pathlib.Path(entry.path)
+                if (is_dir and not entry.is_symlink()
+                        and (descend_matched or not matched)
+                        and self._includes.can_descend(inc_next)):
+                    subdirs.append((entry.path, inc_next, exc_next))
+            stack.extend(reversed(subdirs))
+
+    def match(self, relpath, is_dir=False):
+        return not self.is_excluded(relpath, is_dir=is_dir) and self._accepts(self._includes, relpath, is_dir)
+
+    def is_excluded(self, relpath, is_dir=False):
+        """
+        tests whether relpath or one of its parent directories matches to exclude patterns.
+        """
+        parts = [p for p in pathlib.PurePath(relpath).parts if p != '.']
+        states = self._excludes.initial()
+        for i, p in enumerate(parts):
+            states = self._excludes.step(states, p)
+            if not states:
+                return False
+            last = i == len(parts) - 1
+            if self._excludes.accepts(states, True if not last else is_dir):
+                return True
+        return False
+
+    def _accepts(self, patterns, relpath, is_dir):
+        states = patterns.initial()
+        for p in pathlib.PurePath(relpath).parts:
+            if p != '.':
+                states = patterns.step(states, p)
+        return patterns.accepts(states, is_dir)
+
+
+def walk_glob(root, includes, excludes=[], include_hidden=True, descend_matched=True):
+    matcher = GlobMatcher(includes, excludes=excludes, include_hidden=include_hidden)
+    return matcher.walk(root, descend_matched=descend_matched)
@@ -1,13 +1,19 @@
+import functools
 import platform
 
 
+@functools.lru_cache(maxsize=None)
+def _system():
+    return platform.system()
+
+
 def is_linux():
-    return platform.system() == 'Linux'
+    return _system() == 'Linux'
 
 
 def is_mac():
-    return platform.system() == 'Darwin'
+    return _system() == 'Darwin'
 
 
 def is_win():
-    return platform.system() == 'Windows'
+    return _system() == 'Windows'
@@ -0,0 +1,141 @@
+import os
+import sys
+import threading
+import time
+
+DEFAULT_INTERVAL = 0.005
+
+
+class SamplingProfiler:
+    """
+    samples stacks of all threads periodically in a background thread, which costs little to profiled code.
+    wall time of the profiled thread is attributed to the category of the innermost frame running
+    one of the categorized functions, or to the default category.
+    form of categories: [(<name: str>, [<function>])]
+    """
+
+    def __init__(self, categories=[], default='other', interval=DEFAULT_INTERVAL):
+        self._codes = dict([(_code_of(f), name) for name, functions in categories for f in functions])
+        self._default = default
+        self._times = dict([(name, 0.0) for name in [default, *[name for name, _ in categories]]])
+        self._interval = interval
+        self._ident = None
+        self._thread_names = {}
+        self._stacks = {}
+        self._leaves = {}
+        self._samples = 0
+        self._stop = threading.Event()
+        self._sampler = None
+        self._beg = None
+        self._wall = None
+        self._cpu = None
+        self._children_cpu = None
+
+    def start(self):
+        """
+        starts sampling, the calling thread is profiled.
+        """
+        self._ident = threading.get_ident()
+        self._beg = time.perf_counter(), time.process_time(), _children_cpu()
+        self._sampler = threading.Thread(target=self._sample_loop, name='ceryle-profiler', daemon=True)
+        self._sampler.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._sampler.join()
+        wall, cpu, children_cpu = self._beg
+        self._wall = time.perf_counter() - wall
+        self._cpu = time.process_time() - cpu
+        self._children_cpu = _children_cpu() - children_cpu
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def _sample_loop(self):
+        own = threading.get_ident()
+        last = time.perf_counter()
+        while not self._stop.wait(self._interval):
+            now = time.perf_counter()
+            self._sample(now - last, own)
+            last = now
+
+    def _sample(self, elapsed, own):
+        self._samples += 1
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            if ident not in self._thread_names:
+                self._thread_names.update([(t.ident, t.name) for t in threading.enumerate()])
+            codes = _stack(frame)
+            key = (ident, codes)
+            self._stacks[key] = self._stacks.get(key, 0) + 1
+            if ident == self._ident:
+                self._attribute(codes, elapsed)
+
+    def _attribute(self, codes, elapsed):
+        for code in reversed(codes):
+            category = self._codes.get(code)
+            if category is not None:
+                self._times[category] += elapsed
+                return
+        self._times[self._default] += elapsed
+        if codes:
+            self._leaves[codes[-1]] = self._leaves.get(codes[-1], 0.0) + elapsed
+
+    def report(self, top=10):
+        """
+        seconds of the profile, top is the number of functions taking the most time in the default category.
+        form: {
+          'wall': <float>, 'cpu': <float>, 'children_cpu': <float>, 'samples': <int>,
+          'categories': [(<name: str>, <float>)], 'top': [(<function: str>, <float>)],
+        }
+        """
+        leaves = sorted(self._leaves.items(), key=lambda e: e[1], reverse=True)[:top]
+        return {
+            'wall': self._wall,
+            'cpu': self._cpu,
+            'children_cpu': self._children_cpu,
+            'samples': self._samples,
+            'categories': list(self._times.items()),
+            'top': [(_frame_name(code), t) for code, t in leaves],
+        }
+
+    def collapsed_lines(self):
+        """
+        generates sampled stacks in the collapsed format of flamegraph.pl and speedscope, the root first.
+        """
+        for (ident, codes), count in sorted(self._stacks.items(), key=lambda e: e[1], reverse=True):
+            frames = [self._thread_names.get(ident, str(ident)), *[_frame_name(c) for c in codes]]
+            yield f'{";".join([f.replace(";", ":") for f in frames])} {count}'
+
+    def save_collapsed(self, path):
+        with open(path, 'w') as fp:
+            for line in self.collapsed_lines():
+                fp.write(line + '\n')
+
+
+def _code_of(f):
+    return getattr(f, '__wrapped__', f).__code__
+
+
+def _stack(frame):
+    codes = []
+    while frame is not None:
+        codes.append(frame.f_code)
+        frame = frame.f_back
+    return tuple(reversed(codes))
+
+
+def _frame_name(code):
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+
+def _children_cpu():
+    t = os.times()
+    return t.children_user + t.children_system
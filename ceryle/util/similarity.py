@@ -0,0 +1,64 @@
+import collections
+import difflib
+import heapq
+
+# names less than this are compared all, as the index does not pay
+EXHAUSTIVE_LIMIT = 200
+
+# candidates sharing most bigrams with a query are compared by ratio of difflib
+CANDIDATES = 100
+
+
+def _bigrams(s):
+    padded = f' {s} '
+    return set([padded[i:i + 2] for i in range(len(padded) - 1)])
+
+
+class SimilarNameIndex:
+    """
+    finds names similar to a given one by ratio of difflib.SequenceMatcher.
+    for many names, only candidates sharing bigrams with the query are compared, found by an inverted index.
+    """
+
+    def __init__(self, names):
+        self._names = list(names)
+        self._postings = None
+        self._sizes = None
+
+    def _build(self):
+        postings = collections.defaultdict(list)
+        sizes = []
+        for i, name in enumerate(self._names):
+            grams = _bigrams(name)
+            sizes.append(len(grams))
+            for g in grams:
+                postings[g].append(i)
+        self._postings, self._sizes = postings, sizes
+
+    def _candidates(self, name):
+        if len(self._names) <= EXHAUSTIVE_LIMIT:
+            return self._names
+        if self._postings is None:
+            self._build()
+        grams = _bigrams(name)
+        counts = collections.Counter()
+        for g in grams:
+            counts.update(self._postings.get(g, []))
+        # ranked by dice coefficient of bigrams, so that long names sharing many bigrams are not preferred
+        n = len(grams)
+        dice = [(c / (n + self._sizes[i]), i) for i, c in counts.items()]
+        return [self._names[i] for _, i in heapq.nlargest(CANDIDATES, dice)]
+
+    def find(self, name, ratio=0.55):
+        """
+        returns names more similar than ratio, in descending order of similarity.
+        form: [(<ratio: float>, <name: str>)]
+        """
+        matcher = difflib.SequenceMatcher(a=name)
+        res = []
+        for c in self._candidates(name):
+            matcher.set_seq2(c)
+            r = matcher.ratio()
+            if r > ratio:
+                res.append((r, c))
+        return sorted(res, key=lambda s: s[0], reverse=True)
@@ -0,0 +1,118 @@
+import os
+import pathlib
+import threading
+import time
+
+_tracer = None
+
+
+class _NoSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+class _Span:
+    def __init__(self, tracer, name, cat, args):
+        self._tracer = tracer
+        self._name = name
+        self._cat = cat
+        self._args = args
+        self._beg = None
+
+    def __enter__(self):
+        self._beg = self._tracer.now()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self._args['error'] = exc_type.__name__
+        dur = round(self._tracer.now() - self._beg, 3)
+        self._tracer.complete(self._name, self._cat, self._beg, dur, self._args)
+        return False
+
+    def set(self, **args):
+        self._args.update(args)
+
+
+class Tracer:
+    """
+    records spans in trace event format, which chrome://tracing and Perfetto load.
+    each thread is shown in its own lane.
+    """
+
+    def __init__(self):
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._threads = {}
+        self._events = [
+            {'name': 'process_name', 'ph': 'M', 'pid': self._pid, 'tid': 0, 'args': {'name': 'ceryle'}},
+        ]
+
+    def now(self):
+        """
+        microseconds from creation of the tracer.
+        """
+        return round((time.perf_counter() - self._origin) * 10 ** 6, 3)
+
+    def _tid(self):
+        ident = threading.get_ident()
+        tid = self._threads.get(ident)
+        if tid is None:
+            with self._lock:
+                tid = len(self._threads) + 1
+                self._threads[ident] = tid
+                self._events.append({'name': 'thread_name', 'ph': 'M', 'pid': self._pid, 'tid': tid,
+                                     'args': {'name': threading.current_thread().name}})
+        return tid
+
+    def span(self, name, cat, args):
+        return _Span(self, name, cat, args)
+
+    def complete(self, name, cat, ts, dur, args):
+        event = {'name': name, 'cat': cat, 'ph': 'X', 'ts': ts, 'dur': dur,
+                 'pid': self._pid, 'tid': self._tid(), 'args': args}
+        with self._lock:
+            self._events.append(event)
+
+    @property
+    def events(self):
+        with self._lock:
+            return list(self._events)
+
+    def save(self, path):
+        import json
+
+        with open(pathlib.Path(path), 'w') as fp:
+            json.dump({'traceEvents': self.events, 'displayTimeUnit': 'ms'}, fp)
+
+
+def start_tracing():
+    global _tracer
+    _tracer = Tracer()
+    return _tracer
+
+
+def stop_tracing():
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def trace_span(name, cat='ceryle', **args):
+    """
+    returns a context manager recording a span while tracing is started, otherwise one doing nothing.
+    """
+    tracer = _tracer
+    if tracer is None:
+        return _NO_SPAN
+    return tracer.span(name, cat, args)
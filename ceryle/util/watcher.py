@@ -0,0 +1,240 @@
+import logging
+import os
+import select
+import struct
+import time
+
+from ceryle.const import CERYLE_RUN_CACHE_DIRNAME
+from ceryle.util.platform import is_linux
+
+logger = logging.getLogger(__name__)
+
+IGNORE_NAMES = [CERYLE_RUN_CACHE_DIRNAME, '.git']
+
+# inotify(7)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+              | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+
+_EVENT = struct.Struct('iIII')
+
+
+def minimize_roots(roots):
+    """
+    drops directories contained in another one.
+    """
+    res = []
+    for r in sorted(set([os.path.abspath(r) for r in roots])):
+        if not any([r == p or r.startswith(p.rstrip(os.sep) + os.sep) for p in res]):
+            res.append(r)
+    return res
+
+
+def _walk_dirs(root, ignore):
+    stack = [root]
+    while stack:
+        d = stack.pop()
+        yield d
+        try:
+            with os.scandir(d) as it:
+                for entry in it:
+                    if entry.name not in ignore and entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            continue
+
+
+def _walk_files(root, ignore):
+    for d in _walk_dirs(root, ignore):
+        try:
+            with os.scandir(d) as it:
+                for entry in it:
+                    if entry.name not in ignore and not entry.is_dir(follow_symlinks=False):
+                        yield entry
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            continue
+
+
+class Watcher:
+    """
+    watches files under root directories recursively.
+    subclasses implement poll() which returns changed paths found within timeout.
+    """
+
+    def __init__(self, roots, ignore=IGNORE_NAMES):
+        self._roots = minimize_roots(roots)
+        self._ignore = set(ignore)
+
+    @property
+    def roots(self):
+        return list(self._roots)
+
+    def poll(self, timeout=None):
+        raise NotImplementedError()
+
+    def wait(self, debounce=0.2):
+        """
+        blocks until any change, then collects following changes until no change for debounce seconds.
+        form: {<absolute path: str>}
+        """
+        changed = set()
+        while not changed:
+            changed |= self.poll(timeout=None)
+        while True:
+            more = self.poll(timeout=debounce)
+            if not more:
+                return changed
+            changed |= more
+
+    def drain(self):
+        """
+        discards pending changes, e.g. ones made by the tasks themselves.
+        """
+        return self.poll(timeout=0)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class PollingWatcher(Watcher):
+    def __init__(self, roots, ignore=IGNORE_NAMES, interval=0.5):
+        super().__init__(roots, ignore=ignore)
+        self._interval = interval
+        self._snapshot = self._take_snapshot()
+
+    def _take_snapshot(self):
+        snapshot = {}
+        for root in self._roots:
+            for entry in _walk_files(root, self._ignore):
+                try:
+                    st = entry.stat(follow_symlinks=False)
+                except FileNotFoundError:
+                    continue
+                snapshot[entry.path] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def poll(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            current = self._take_snapshot()
+            changed = set([p for p in set(current) | set(self._snapshot)
+                           if current.get(p) != self._snapshot.get(p)])
+            self._snapshot = current
+            if changed:
+                return changed
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return changed
+                time.sleep(min(self._interval, remaining))
+            else:
+                time.sleep(self._interval)
+
+
+class InotifyWatcher(Watcher):
+    def __init__(self, roots, ignore=IGNORE_NAMES):
+        super().__init__(roots, ignore=ignore)
+        self._libc, self._get_errno = _load_libc()
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            e = self._get_errno()
+            raise OSError(e, os.strerror(e))
+        self._watches = {}
+        for root in self._roots:
+            self._add_tree(root)
+
+    def _add_tree(self, root):
+        for d in _walk_dirs(root, self._ignore):
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(d), WATCH_MASK)
+            if wd < 0:
+                e = self._get_errno()
+                logger.debug(f'could not watch {d}: {os.strerror(e)}')
+                continue
+            self._watches[wd] = d
+
+    def poll(self, timeout=None):
+        r, _, _ = select.select([self._fd], [], [], timeout)
+        if not r:
+            return set()
+        try:
+            buf = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        return self._parse(buf)
+
+    def _parse(self, buf):
+        changed = set()
+        i = 0
+        while i + _EVENT.size <= len(buf):
+            wd, mask, _, length = _EVENT.unpack_from(buf, i)
+            name = os.fsdecode(buf[i + _EVENT.size:i + _EVENT.size + length].rstrip(b'\0'))
+            i += _EVENT.size + length
+
+            if mask & IN_Q_OVERFLOW:
+                logger.warn('inotify event queue overflowed, regarding all files as changed')
+                changed.update(self._roots)
+                continue
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+            d = self._watches.get(wd)
+            if d is None:
+                continue
+            if name in self._ignore:
+                continue
+            path = os.path.join(d, name) if name else d
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                # files may be created before the new directory is watched
+                self._add_tree(path)
+                changed.update([e.path for e in _walk_files(path, self._ignore)])
+            changed.add(path)
+        return changed
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def _load_libc():
+    # ctypes is imported only when inotify is used
+    import ctypes
+
+    # symbols of the running process, including libc
+    libc = ctypes.CDLL(None, use_errno=True)
+    libc.inotify_init1.argtypes = [ctypes.c_int]
+    libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    return libc, ctypes.get_errno
+
+
+def create_watcher(roots, ignore=IGNORE_NAMES):
+    """
+    creates an inotify based watcher on linux, otherwise falls back to polling.
+    """
+    if is_linux():
+        try:
+            return InotifyWatcher(roots, ignore=ignore)
+        except (OSError, AttributeError) as e:
+            logger.info(f'inotify is not available, falling back to polling: {e}')
+    return PollingWatcher(roots, ignore=ignore)
@@ -0,0 +1,259 @@
+import hashlib
+import io
+import os
+import pathlib
+import tarfile
+import tempfile
+import zipfile
+
+import pytest
+
+from ceryle import Archive, Extract, ExecutionResult
+from ceryle.commands.archive import guess_format
+
+
+def create_files(root, files):
+    for f in files:
+        p = pathlib.Path(root, f)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        with open(p, 'w') as fp:
+            fp.write(f'archive test {f}' * 100)
+
+
+def digest(p):
+    with open(p, 'rb') as fp:
+        return hashlib.sha256(fp.read()).hexdigest()
+
+
+def list_files(root):
+    root = pathlib.Path(root)
+    return sorted([p.relative_to(root).as_posix() for p in root.rglob('*') if p.is_file()])
+
+
+@pytest.mark.parametrize('fmt', ['zip', 'tar.gz', 'tar.xz', 'tar'])
+def test_archive_and_extract(fmt):
+    '''
+    src: d1/
+      d1/f1.txt
+      d1/d2/f2.txt
+      d1/d2/d3/f3.bin
+    '''
+    with tempfile.TemporaryDirectory() as tmpd:
+        files = ['f1.txt', 'd2/f2.txt', 'd2/d3/f3.bin']
+        create_files(pathlib.Path(tmpd, 'd1'), files)
+
+        res = Archive('d1', f'out/d1.{fmt}').execute(context=tmpd)
+
+        assert isinstance(res, ExecutionResult)
+        assert res.return_code == 0
+        assert pathlib.Path(tmpd, 'out', f'd1.{fmt}').is_file() is True
+
+        res = Extract(f'out/d1.{fmt}', 'extracted').execute(context=tmpd)
+
+        assert res.return_code == 0
+        assert list_files(pathlib.Path(tmpd, 'extracted')) == sorted(files)
+        for f in files:
+            assert digest(pathlib.Path(tmpd, 'extracted', f)) == digest(pathlib.Path(tmpd, 'd1', f))
+
+
+@pytest.mark.parametrize('fmt', ['zip', 'tar.gz', 'tar.xz'])
+def test_archive_is_reproducible(fmt):
+    with tempfile.TemporaryDirectory() as tmpd:
+        create_files(pathlib.Path(tmpd, 'd1'), ['f1.txt', 'd2/f2.txt'])
+
+        Archive('d1', f'a.{fmt}').execute(context=tmpd)
+        # touching files does not change archive
+        for f in pathlib.Path(tmpd, 'd1').rglob('*'):
+            os.utime(f, (0, 12345678))
+        Archive('d1', f'b.{fmt}').execute(context=tmpd)
+
+        assert digest(pathlib.Path(tmpd, f'a.{fmt}')) == digest(pathlib.Path(tmpd, f'b.{fmt}'))
+
+
+@pytest.mark.parametrize('fmt', ['zip', 'tar.gz'])
+def test_archive_into_source_twice(fmt):
+    with tempfile.TemporaryDirectory() as tmpd:
+        create_files(pathlib.Path(tmpd, 'd1'), ['f1.txt', 'd2/f2.txt'])
+
+        res1 = Archive('d1', f'd1/out.{fmt}').execute(context=tmpd)
+        first = digest(pathlib.Path(tmpd, 'd1', f'out.{fmt}'))
+        res2 = Archive('d1', f'd1/out.{fmt}').execute(context=tmpd)
+
+        assert res1.return_code == 0
+        assert res2.return_code == 0
+        assert res2.stdout == ['archived 3 member(s) to d1/out.' + fmt]
+        assert digest(pathlib.Path(tmpd, 'd1', f'out.{fmt}')) == first
+        res = Extract(f'd1/out.{fmt}', 'extracted').execute(context=tmpd)
+        assert res.return_code == 0
+        assert list_files(pathlib.Path(tmpd, 'extracted')) == ['d2/f2.txt', 'f1.txt']
+
+
+def test_archive_by_glob():
+    with tempfile.TemporaryDirectory() as tmpd:
+        create_files(pathlib.Path(tmpd, 'd1'), ['f1.txt', 'f2.py', 'd2/f3.txt', 'build/f4.txt'])
+
+        res = Archive('d1', 'd1.tar.gz', glob_pattern='**/*.txt', exclude='build').execute(context=tmpd)
+
+        assert res.return_code == 0
+        with tarfile.open(pathlib.Path(tmpd, 'd1.tar.gz')) as tf:
+            assert tf.getnames() == ['d2', 'd2/f3.txt', 'f1.txt']
+
+
+def test_archive_zip_members():
+    with tempfile.TemporaryDirectory() as tmpd:
+        files = [f'd{i % 3}/f{i}.txt' for i in range(20)]
+        create_files(pathlib.Path(tmpd, 'd1'), files)
+        os.chmod(pathlib.Path(tmpd, 'd1', 'd0', 'f0.txt'), 0o755)
+
+        res = Archive('d1', 'd1.zip', level=9).execute(context=tmpd)
+
+        assert res.return_code == 0
+        with zipfile.ZipFile(pathlib.Path(tmpd, 'd1.zip')) as zf:
+            assert zf.testzip() is None
+            infos = zf.infolist()
+            assert [i.filename for i in infos] == sorted(['d0/', 'd1/', 'd2/', *files])
+            assert all([i.date_time == (1980, 1, 1, 0, 0, 0) for i in infos])
+            if os.name != 'nt':
+                assert zf.getinfo('d0/f0.txt').external_attr >> 16 & 0o777 == 0o755
+                assert zf.getinfo('d0/f3.txt').external_attr >> 16 & 0o777 == 0o644
+
+
+def test_archive_single_file():
+    with tempfile.TemporaryDirectory() as tmpd:
+        create_files(tmpd, ['f1.txt'])
+
+        res = Archive('f1.txt', 'f1.zip').execute(context=tmpd)
+
+        assert res.return_code == 0
+        with zipfile.ZipFile(pathlib.Path(tmpd, 'f1.zip')) as zf:
+            assert zf.namelist() == ['f1.txt']
+
+
+def test_archive_source_not_found():
+    with tempfile.TemporaryDirectory() as tmpd:
+        res = Archive('d1', 'd1.zip').execute(context=tmpd)
+
+        assert res.return_code == 1
+        assert pathlib.Path(tmpd, 'd1.zip').exists() is False
+
+
+def test_archive_unknown_format():
+    with pytest.raises(ValueError):
+        Archive('d1', 'd1.rar', format='rar')
+
+    with tempfile.TemporaryDirectory() as tmpd:
+        create_files(tmpd, ['d1/f1.txt'])
+        res = Archive('d1', 'd1.rar').execute(context=tmpd)
+        assert res.return_code == 1
+
+
+def test_extract_rejects_path_traversal():
+    with tempfile.TemporaryDirectory() as tmpd:
+        create_files(tmpd, ['f1.txt'])
+        with tarfile.open(pathlib.Path(tmpd, 'evil.tar'), 'w') as tf:
+            tf.add(pathlib.Path(tmpd, 'f1.txt'), arcname='../evil.txt')
+
+        res = Extract('evil.tar', 'extracted').execute(context=tmpd)
+
+        assert res.return_code == 1
+        assert pathlib.Path(tmpd, 'evil.txt').exists() is False
+
+
+@pytest.mark.parametrize('name, data', [
+    ('broken.zip', b'not a zip file'),
+    ('broken.tar.gz', b'not a gzip file'),
+    ('broken.tar', b'not a tar file'),
+])
+def test_extract_broken_archive(name, data):
+    with tempfile.TemporaryDirectory() as tmpd:
+        pathlib.Path(tmpd, name).write_bytes(data)
+
+        res = Extract(name, 'extracted').execute(context=tmpd)
+
+        assert res.return_code == 1
+
+
+def _link_then_file_tar(path, link_type, linkname):
+    with tarfile.open(path, 'w') as tf:
+        link = tarfile.TarInfo('a')
+        link.type = link_type
+        link.linkname = linkname
+        tf.addfile(link)
+        data = b'escaped'
+        f = tarfile.TarInfo('a/x')
+        f.size = len(data)
+        tf.addfile(f, io.BytesIO(data))
+
+
+@pytest.fixture(params=['data_filter', 'no_data_filter'])
+def tar_filter(request, monkeypatch):
+    if request.param == 'no_data_filter':
+        # python before 3.8.17 does not have extraction filters
+        monkeypatch.delattr(tarfile, 'data_filter', raising=False)
+    elif not hasattr(tarfile, 'data_filter'):
+        pytest.skip('extraction filters are not supported')
+
+
+@pytest.mark.parametrize('linkname', [
+    '{outside}',
+    '../outside',
+])
+def test_extract_rejects_file_beneath_symlink_to_outside(tar_filter, linkname):
+    with tempfile.TemporaryDirectory() as tmpd:
+        outside = pathlib.Path(tmpd, 'outside')
+        outside.mkdir()
+        _link_then_file_tar(pathlib.Path(tmpd, 'evil.tar'), tarfile.SYMTYPE, linkname.format(outside=outside))
+
+        res = Extract('evil.tar', 'extracted').execute(context=tmpd)
+
+        assert res.return_code == 1
+        assert outside.joinpath('x').exists() is False
+
+
+def test_extract_rejects_hardlink_to_outside(tar_filter):
+    with tempfile.TemporaryDirectory() as tmpd:
+        create_files(tmpd, ['secret.txt'])
+        with tarfile.open(pathlib.Path(tmpd, 'evil.tar'), 'w') as tf:
+            link = tarfile.TarInfo('a')
+            link.type = tarfile.LNKTYPE
+            link.linkname = '../secret.txt'
+            tf.addfile(link)
+
+        res = Extract('evil.tar', 'extracted').execute(context=tmpd)
+
+        assert res.return_code == 1
+        assert pathlib.Path(tmpd, 'extracted', 'a').exists() is False
+
+
+def test_extract_symlink_within_destination(tar_filter):
+    with tempfile.TemporaryDirectory() as tmpd:
+        os.mkdir(pathlib.Path(tmpd, 'extracted'))
+        with tarfile.open(pathlib.Path(tmpd, 'ok.tar'), 'w') as tf:
+            d = tarfile.TarInfo('d')
+            d.type = tarfile.DIRTYPE
+            tf.addfile(d)
+            link = tarfile.TarInfo('a')
+            link.type = tarfile.SYMTYPE
+            link.linkname = 'd'
+            tf.addfile(link)
+            f = tarfile.TarInfo('a/x')
+            f.size = 2
+            tf.addfile(f, io.BytesIO(b'ok'))
+
+        res = Extract('ok.tar', 'extracted').execute(context=tmpd)
+
+        assert res.return_code == 0
+        assert pathlib.Path(tmpd, 'extracted', 'd', 'x').read_bytes() == b'ok'
+
+
+@pytest.mark.parametrize(
+    'name, fmt', [
+        ('a.zip', 'zip'),
+        ('a.tar.gz', 'tar.gz'),
+        ('a.TGZ', 'tar.gz'),
+        ('a.tar.xz', 'tar.xz'),
+        ('a.tar', 'tar'),
+        ('a.7z', None),
+    ])
+def test_guess_format(name, fmt):
+    assert guess_format(name) == fmt
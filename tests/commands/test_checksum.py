@@ -0,0 +1,129 @@
+import hashlib
+import json
+import pathlib
+import tempfile
+
+import pytest
+
+from ceryle import Checksum, ExecutionResult
+
+
+def create_files(root, files):
+    for f in files:
+        p = pathlib.Path(root, f)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        with open(p, 'w') as fp:
+            fp.write(f'checksum test {f}')
+
+
+def sha256(s):
+    return hashlib.sha256(s.encode()).hexdigest()
+
+
+def test_checksum_files():
+    '''
+    context:
+      d1/f1.txt
+      d1/d2/f2.txt
+      d1/d2/f3.py
+    '''
+    with tempfile.TemporaryDirectory() as tmpd:
+        create_files(pathlib.Path(tmpd, 'd1'), ['f1.txt', 'd2/f2.txt', 'd2/f3.py'])
+
+        res = Checksum('d1', glob_pattern='**/*.txt').execute(context=tmpd)
+
+        assert isinstance(res, ExecutionResult)
+        assert res.return_code == 0
+        assert res.stdout == [
+            f'{sha256("checksum test d2/f2.txt")}  d2/f2.txt',
+            f'{sha256("checksum test f1.txt")}  f1.txt',
+        ]
+
+
+def test_checksum_writes_sorted_manifest():
+    with tempfile.TemporaryDirectory() as tmpd:
+        files = [f'd{i % 4}/f{i}' for i in range(30)]
+        create_files(pathlib.Path(tmpd, 'd1'), files)
+
+        res = Checksum('d1', manifest='out/manifest.json').execute(context=tmpd)
+
+        assert res.return_code == 0
+        with open(pathlib.Path(tmpd, 'out', 'manifest.json')) as fp:
+            text = fp.read()
+        manifest = json.loads(text)
+        assert manifest['algorithm'] == 'sha256'
+        assert list(manifest['files']) == sorted(files)
+        assert manifest['files']['d1/f1'] == sha256('checksum test d1/f1')
+
+
+def test_checksum_algorithm():
+    with tempfile.TemporaryDirectory() as tmpd:
+        create_files(tmpd, ['f1'])
+
+        res = Checksum('f1', algo='md5').execute(context=tmpd)
+
+        assert res.return_code == 0
+        assert res.stdout == [f'{hashlib.md5(b"checksum test f1").hexdigest()}  f1']
+
+    with pytest.raises(ValueError):
+        Checksum('f1', algo='unknown')
+
+
+def test_checksum_verify():
+    with tempfile.TemporaryDirectory() as tmpd:
+        create_files(pathlib.Path(tmpd, 'd1'), ['f1', 'd2/f2', 'd2/f3'])
+        Checksum('d1', manifest='manifest.json').execute(context=tmpd)
+
+        res = Checksum('d1', manifest='manifest.json', verify=True).execute(context=tmpd)
+
+        assert res.return_code == 0
+        assert res.stdout == ['3 file(s) OK']
+
+
+def test_checksum_manifest_within_target():
+    with tempfile.TemporaryDirectory() as tmpd:
+        create_files(pathlib.Path(tmpd, 'd1'), ['f1', 'd2/f2'])
+
+        Checksum('d1', manifest='d1/SUMS.json').execute(context=tmpd)
+        res = Checksum('d1', manifest='d1/SUMS.json').execute(context=tmpd)
+
+        assert res.return_code == 0
+        assert [line.split('  ')[1] for line in res.stdout] == ['d2/f2', 'f1']
+        with open(pathlib.Path(tmpd, 'd1', 'SUMS.json')) as fp:
+            assert list(json.load(fp)['files']) == ['d2/f2', 'f1']
+
+        res = Checksum('d1', manifest='d1/SUMS.json', verify=True).execute(context=tmpd)
+
+        assert res.return_code == 0
+        assert res.stdout == ['2 file(s) OK']
+
+
+@pytest.mark.parametrize('modify', ['change', 'remove'])
+def test_checksum_verify_fails_by_mismatch(modify):
+    with tempfile.TemporaryDirectory() as tmpd:
+        create_files(pathlib.Path(tmpd, 'd1'), ['f1', 'd2/f2', 'd2/f3'])
+        Checksum('d1', manifest='manifest.json').execute(context=tmpd)
+
+        f2 = pathlib.Path(tmpd, 'd1', 'd2', 'f2')
+        if modify == 'change':
+            with open(f2, 'a') as fp:
+                fp.write('modified')
+        else:
+            f2.unlink()
+
+        res = Checksum('d1', manifest='manifest.json', verify=True).execute(context=tmpd)
+
+        assert res.return_code == 1
+        assert res.stderr == ['checksum mismatch: d2/f2']
+
+
+def test_checksum_verify_requires_manifest():
+    with pytest.raises(ValueError):
+        Checksum('d1', verify=True)
+
+
+def test_checksum_target_not_found():
+    with tempfile.TemporaryDirectory() as tmpd:
+        res = Checksum('d1').execute(context=tmpd)
+
+        assert res.return_code == 1
@@ -8,6 +8,7 @@ import tempfile
 import pytest
 
 from ceryle import Command, CommandFormatError
+from ceryle.commands.executable import deferred, materialize
 from ceryle.dsl.support import Arg, Env, PathArg
 from ceryle.util import std_capture
 
@@ -360,3 +361,30 @@ class TestForWin:
 
         assert with_env_res.return_code == 0
         assert with_env_res.stdout == ['""']
+
+
+def test_deferred_command(mocker):
+    init = mocker.spy(Command, '__init__')
+
+    cmd = deferred(Command)('do some', cwd='foo')
+    init.assert_not_called()
+
+    assert cmd.cmd == ['do', 'some']
+    assert cmd.cwd == 'foo'
+    assert str(cmd) == '[do some] (foo)'
+    assert materialize(cmd) is materialize(cmd)
+    assert isinstance(materialize(cmd), Command)
+    init.assert_called_once()
+
+
+def test_deferred_command_raises_when_materialized():
+    cmd = deferred(Command)('do "some')
+
+    with pytest.raises(CommandFormatError):
+        materialize(cmd)
+
+
+def test_new_command_shlex():
+    command = Command('echo \'a b\' c\\ d', shlex=True)
+    assert command.cmd == ['echo', 'a b', 'c d']
+    assert str(command) == '[echo "a b" "c d"]'
@@ -0,0 +1,121 @@
+import random
+import re
+
+import pytest
+
+from ceryle import CommandFormatError
+from ceryle.commands.command import extract_cmd, split_cmd
+
+
+def reference_extract_cmd(cmd):
+    """
+    the former recursive implementation, kept as an oracle of the tokenizer.
+    """
+    trimmed = cmd.strip()
+    seed = 0
+    parts = []
+    while seed >= 0:
+        s, seed = reference_next_part(trimmed)
+        if s is None:
+            if seed is None:
+                raise CommandFormatError(f'invalid command format: [{cmd}]')
+            break
+        parts.append(s)
+        trimmed = trimmed[seed:].lstrip()
+    return parts
+
+
+def reference_next_part(cmdstr):
+    if len(cmdstr) == 0:
+        return None, -1
+
+    m = re.search(r'[ "]', cmdstr)
+    if m:
+        span = m.span()
+        if m.group() == '"':
+            if cmdstr[span[0] - 1] == '\\':
+                s, seed = reference_next_part(cmdstr[span[1]:])
+                if s is None:
+                    return f'{cmdstr[:span[0]]}"', seed
+                return f'{cmdstr[:span[0]]}"{s}', (span[1] + seed) if seed > -1 else seed
+            m2 = re.search('"', cmdstr[span[1]:])
+            if m2 is None:
+                return None, None
+            span2 = m2.span()
+            return cmdstr[span[1]:span2[0] + 1], span2[1] + 1
+        return cmdstr[:span[0]], span[1]
+    return cmdstr.strip(), -1
+
+
+def random_command(rnd):
+    tokens = ['a', 'bc', ' ', '  ', '\t', '"', '\\', '\\"', '"d e"', '-x=1']
+    return ''.join([rnd.choice(tokens) for _ in range(rnd.randint(0, 12))])
+
+
+def well_formed_command(rnd):
+    words = []
+    for _ in range(rnd.randint(1, 8)):
+        kind = rnd.randint(0, 2)
+        if kind == 0:
+            words.append(rnd.choice(['ls', '-a', 'foo', 'x=1', './run.sh']))
+        elif kind == 1:
+            words.append('"' + rnd.choice(['a b', 'c', '', ' d ', 'e\tf']) + '"')
+        else:
+            words.append(rnd.choice(['a\\"b', '\\"c', 'd\\"']))
+    return (' ' * rnd.randint(0, 2)).join(words) if rnd.random() < 0.3 else ' '.join(words)
+
+
+@pytest.mark.parametrize('generate', [random_command, well_formed_command])
+def test_equivalent_to_reference(generate):
+    rnd = random.Random(20201019)
+    for _ in range(3000):
+        cmd = generate(rnd)
+        try:
+            expected = reference_extract_cmd(cmd)
+        except (CommandFormatError, TypeError):
+            # former implementation failed with TypeError for a few malformed commands
+            with pytest.raises(CommandFormatError):
+                extract_cmd(cmd)
+            continue
+        assert extract_cmd(cmd) == expected, cmd
+
+
+def test_split_long_command():
+    words = ['a\\"b', '"c d"', 'e'] * 20000
+    cmd = ' '.join(words)
+
+    parts = split_cmd(cmd)
+
+    assert len(parts) == 60000
+    assert parts[:3] == ('a\\"b', 'c d', 'e')
+
+
+def test_split_many_escaped_quotes_in_argument():
+    word = 'a\\"' * 5000
+
+    assert split_cmd(f'echo {word} b') == ('echo', word, 'b')
+
+
+def test_split_cmd_memoized():
+    split_cmd.cache_clear()
+    parts = extract_cmd('echo "a b" c')
+    parts.append('d')
+
+    assert extract_cmd('echo "a b" c') == ['echo', 'a b', 'c']
+    assert split_cmd.cache_info().hits == 1
+
+
+@pytest.mark.parametrize(
+    'cmd_in, cmd', [
+        ('ls -a', ['ls', '-a']),
+        ('echo "a b" \'c d\'', ['echo', 'a b', 'c d']),
+        ('echo a\\ b "c \\"d\\""', ['echo', 'a b', 'c "d"']),
+        ('git log --format="%h %s"', ['git', 'log', '--format=%h %s']),
+    ])
+def test_extract_cmd_shlex(cmd_in, cmd):
+    assert extract_cmd(cmd_in, use_shlex=True) == cmd
+
+
+def test_extract_cmd_shlex_not_closed():
+    with pytest.raises(CommandFormatError, match=r'invalid command format: \[echo "a\]'):
+        extract_cmd('echo "a', use_shlex=True)
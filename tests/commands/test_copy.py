@@ -1,11 +1,18 @@
+import errno
+import os
 import pathlib
+import platform
+import shutil
 import tempfile
 
 import pytest
 
 from ceryle import Copy, ExecutionResult
+from ceryle.commands.copy import FICLONE
 from ceryle.dsl.support import Arg, PathArg
 
+IS_WIN = platform.system() == 'Windows'
+
 
 def test_copy_file_to_file():
     '''
@@ -326,3 +333,347 @@ def test_copy_file_by_arg(src_arg, dst_arg):
         assert dstf.is_file() is True
         with open(dstf) as fp:
             assert fp.read().rstrip() == 'copy test'
+
+
+def test_copy_unknown_strategy():
+    with pytest.raises(ValueError):
+        Copy('file1', 'dst_file', strategy='symlink')
+
+
+@pytest.mark.skipif(IS_WIN, reason='hardlink is not tested on Windows')
+def test_copy_directory_by_hardlink():
+    '''
+    src: d1/
+      d1/f1
+      d1/d2/f2
+    dst: d3 (not exist)
+    expected:
+      d3/f1 (hardlink of d1/f1)
+      d3/d2/f2 (hardlink of d1/d2/f2)
+    '''
+    with tempfile.TemporaryDirectory() as tmpd:
+        srcd = pathlib.Path(tmpd, 'd1')
+        srcd.joinpath('d2').mkdir(parents=True)
+        srcf1 = srcd.joinpath('f1')
+        srcf2 = srcd.joinpath('d2', 'f2')
+        for p in [srcf1, srcf2]:
+            with open(p, 'w') as fp:
+                fp.write(f'copy test {p.name}')
+
+        copy = Copy('d1', 'd3', strategy='hardlink')
+        res = copy.execute(context=tmpd)
+
+        assert isinstance(res, ExecutionResult)
+        assert res.return_code == 0
+        assert res.stdout == ['copied 2 file(s) (hardlink: 2)']
+        dstf1 = pathlib.Path(tmpd, 'd3', 'f1')
+        dstf2 = pathlib.Path(tmpd, 'd3', 'd2', 'f2')
+        for s, d in [(srcf1, dstf1), (srcf2, dstf2)]:
+            assert d.is_file() is True
+            assert os.path.samefile(s, d) is True
+
+
+@pytest.mark.skipif(IS_WIN, reason='hardlink is not tested on Windows')
+def test_copy_file_by_hardlink_overwrite():
+    with tempfile.TemporaryDirectory() as tmpd:
+        srcf = pathlib.Path(tmpd, 'file1')
+        with open(srcf, 'w') as fp:
+            fp.write('copy test')
+        dstf = pathlib.Path(tmpd, 'dst_file')
+        with open(dstf, 'w') as fp:
+            fp.write('existing')
+
+        copy = Copy('file1', 'dst_file', strategy='hardlink')
+        res = copy.execute(context=tmpd)
+
+        assert res.return_code == 0
+        assert os.path.samefile(srcf, dstf) is True
+        with open(dstf) as fp:
+            assert fp.read().rstrip() == 'copy test'
+
+
+def _write(path, content):
+    with open(path, 'w') as fp:
+        fp.write(content)
+
+
+def _read(path):
+    with open(path) as fp:
+        return fp.read()
+
+
+@pytest.mark.skipif(IS_WIN, reason='hardlink is not tested on Windows')
+@pytest.mark.parametrize('strategy', ['copy', 'hardlink', 'auto'])
+def test_copy_onto_hardlinked_output(strategy):
+    with tempfile.TemporaryDirectory() as tmpd:
+        a, b, out = [pathlib.Path(tmpd, n) for n in ['a.bin', 'b.bin', 'out.bin']]
+        _write(a, 'a')
+        _write(b, 'b')
+
+        assert Copy('a.bin', 'out.bin', strategy='hardlink').execute(context=tmpd).return_code == 0
+        assert os.path.samefile(a, out) is True
+
+        # the same file is not copied onto itself
+        assert Copy('a.bin', 'out.bin', strategy=strategy).execute(context=tmpd).return_code == 0
+        assert _read(out) == 'a'
+
+        # another file replaces the output instead of writing into the source linked to it
+        assert Copy('b.bin', 'out.bin', strategy=strategy).execute(context=tmpd).return_code == 0
+        assert _read(out) == 'b'
+        assert _read(a) == 'a'
+        assert os.path.samefile(a, out) is False
+
+
+@pytest.mark.skipif(IS_WIN, reason='FICLONE is not available on Windows')
+def test_copy_reflink_onto_hardlinked_output(mocker):
+    with tempfile.TemporaryDirectory() as tmpd:
+        a, b, out = [pathlib.Path(tmpd, n) for n in ['a.bin', 'b.bin', 'out.bin']]
+        _write(a, 'a')
+        _write(b, 'b')
+        os.link(a, out)
+
+        def clone(dst_fd, request, src_fd):
+            os.write(dst_fd, os.read(src_fd, 1024))
+        mocker.patch('fcntl.ioctl', side_effect=clone)
+
+        res = Copy('b.bin', 'out.bin', strategy='reflink').execute(context=tmpd)
+
+        assert res.stdout == ['copied 1 file(s) (reflink: 1)']
+        assert _read(out) == 'b'
+        assert _read(a) == 'a'
+
+
+@pytest.mark.skipif(IS_WIN, reason='FICLONE is not available on Windows')
+def test_copy_auto_falls_back_after_reflink_failure(mocker):
+    mocker.patch('fcntl.ioctl', side_effect=OSError(errno.EXDEV, 'Invalid cross-device link'))
+
+    with tempfile.TemporaryDirectory() as tmpd:
+        srcf, dstf = pathlib.Path(tmpd, 'file1'), pathlib.Path(tmpd, 'dst_file')
+        _write(srcf, 'copy test')
+        _write(dstf, 'existing')
+
+        res = Copy('file1', 'dst_file', strategy='auto').execute(context=tmpd)
+
+        assert res.stdout == ['copied 1 file(s) (hardlink: 1)']
+        assert os.path.samefile(srcf, dstf) is True
+
+
+def test_copy_auto_falls_back_to_hardlink(mocker):
+    reflink = mocker.patch('ceryle.commands.copy._reflink', return_value=False)
+    hardlink = mocker.patch('ceryle.commands.copy._hardlink', return_value=True)
+
+    with tempfile.TemporaryDirectory() as tmpd:
+        srcf = pathlib.Path(tmpd, 'file1')
+        with open(srcf, 'w') as fp:
+            fp.write('copy test')
+
+        copy = Copy('file1', 'dst_file', strategy='auto')
+        res = copy.execute(context=tmpd)
+
+        assert res.return_code == 0
+        assert res.stdout == ['copied 1 file(s) (hardlink: 1)']
+        dst = str(pathlib.Path(tmpd, 'dst_file'))
+        reflink.assert_called_once_with(str(srcf), dst)
+        hardlink.assert_called_once_with(str(srcf), dst)
+
+
+def test_copy_auto_falls_back_to_copy(mocker):
+    mocker.patch('ceryle.commands.copy._reflink', return_value=False)
+    mocker.patch('ceryle.commands.copy._hardlink', return_value=False)
+
+    with tempfile.TemporaryDirectory() as tmpd:
+        srcf = pathlib.Path(tmpd, 'file1')
+        with open(srcf, 'w') as fp:
+            fp.write('copy test')
+        dstf = pathlib.Path(tmpd, 'dst_file')
+
+        copy = Copy('file1', 'dst_file', strategy='auto')
+        res = copy.execute(context=tmpd)
+
+        assert res.return_code == 0
+        assert res.stdout == ['copied 1 file(s) (copy: 1)']
+        assert os.path.samefile(srcf, dstf) is False
+        with open(dstf) as fp:
+            assert fp.read().rstrip() == 'copy test'
+
+
+@pytest.mark.skipif(IS_WIN, reason='FICLONE is not available on Windows')
+def test_copy_reflink_by_ficlone(mocker):
+    ioctl = mocker.patch('fcntl.ioctl')
+
+    with tempfile.TemporaryDirectory() as tmpd:
+        srcf = pathlib.Path(tmpd, 'file1')
+        with open(srcf, 'w') as fp:
+            fp.write('copy test')
+
+        copy = Copy('file1', 'dst_file', strategy='reflink')
+        res = copy.execute(context=tmpd)
+
+        assert res.return_code == 0
+        assert res.stdout == ['copied 1 file(s) (reflink: 1)']
+        ioctl.assert_called_once_with(mocker.ANY, FICLONE, mocker.ANY)
+
+
+@pytest.mark.skipif(IS_WIN, reason='FICLONE is not available on Windows')
+def test_copy_reflink_not_supported_falls_back_to_copy(mocker):
+    mocker.patch('fcntl.ioctl', side_effect=OSError(errno.EOPNOTSUPP, 'Operation not supported'))
+
+    with tempfile.TemporaryDirectory() as tmpd:
+        srcf = pathlib.Path(tmpd, 'file1')
+        with open(srcf, 'w') as fp:
+            fp.write('copy test')
+        dstf = pathlib.Path(tmpd, 'dst_file')
+
+        copy = Copy('file1', 'dst_file', strategy='reflink')
+        res = copy.execute(context=tmpd)
+
+        assert res.return_code == 0
+        assert res.stdout == ['copied 1 file(s) (copy: 1)']
+        with open(dstf) as fp:
+            assert fp.read().rstrip() == 'copy test'
+
+
+def test_copy_glob_multiple_patterns_with_excludes():
+    '''
+    src: d1/
+      d1/f1.txt
+      d1/f2.py
+      d1/f3.md
+      d1/d2/f4.txt
+      d1/d2/f5.md
+      d1/build/f6.txt
+    dst: dst_dir (not exists)
+    expected:
+      dst_dir/f1.txt
+      dst_dir/f3.md
+      dst_dir/d2/f4.txt
+    '''
+    with tempfile.TemporaryDirectory() as tmpd:
+        srcd1 = pathlib.Path(tmpd, 'd1')
+        for f in ['f1.txt', 'f2.py', 'f3.md', 'd2/f4.txt', 'd2/f5.md', 'build/f6.txt']:
+            p = srcd1.joinpath(f)
+            p.parent.mkdir(parents=True, exist_ok=True)
+            p.touch()
+
+        dstd = pathlib.Path(tmpd, 'dst_dir')
+
+        copy = Copy('d1', 'dst_dir', glob_pattern=['**/*.txt', '*.md'], exclude=['build'])
+        res = copy.execute(context=tmpd)
+
+        assert isinstance(res, ExecutionResult)
+        assert res.return_code == 0
+        assert sorted([p.relative_to(dstd).as_posix() for p in dstd.rglob('*') if p.is_file()]) == [
+            'd2/f4.txt',
+            'f1.txt',
+            'f3.md',
+        ]
+
+
+def test_copy_directory_with_excludes():
+    '''
+    src: d1/
+      d1/f1.txt
+      d1/f2.pyc
+      d1/d2/f3.txt
+      d1/d2/f4.pyc
+    dst: dst_dir (not exists)
+    expected:
+      dst_dir/f1.txt
+      dst_dir/d2/f3.txt
+    '''
+    with tempfile.TemporaryDirectory() as tmpd:
+        srcd1 = pathlib.Path(tmpd, 'd1')
+        for f in ['f1.txt', 'f2.pyc', 'd2/f3.txt', 'd2/f4.pyc']:
+            p = srcd1.joinpath(f)
+            p.parent.mkdir(parents=True, exist_ok=True)
+            p.touch()
+
+        dstd = pathlib.Path(tmpd, 'dst_dir')
+
+        copy = Copy('d1', 'dst_dir', exclude='**/*.pyc')
+        res = copy.execute(context=tmpd)
+
+        assert res.return_code == 0
+        assert sorted([p.relative_to(dstd).as_posix() for p in dstd.rglob('*') if p.is_file()]) == [
+            'd2/f3.txt',
+            'f1.txt',
+        ]
+
+
+@pytest.mark.parametrize('pattern', ['**', '**/*', ['**', '**/*', 'd2/**']])
+def test_copy_glob_copies_each_file_once(mocker, pattern):
+    '''
+    src: d1/
+      d1/f1
+      d1/d2/f2
+      d1/d2/d3/f3
+    dst: dst_dir (not exists)
+    expected:
+      dst_dir/f1
+      dst_dir/d2/f2
+      dst_dir/d2/d3/f3
+    '''
+    with tempfile.TemporaryDirectory() as tmpd:
+        srcd1 = pathlib.Path(tmpd, 'd1')
+        for f in ['f1', 'd2/f2', 'd2/d3/f3']:
+            p = srcd1.joinpath(f)
+            p.parent.mkdir(parents=True, exist_ok=True)
+            p.touch()
+
+        copyfile = mocker.spy(shutil, 'copyfile')
+
+        copy = Copy('d1', 'dst_dir', glob_pattern=pattern)
+        res = copy.execute(context=tmpd)
+
+        assert res.return_code == 0
+        assert res.stdout == ['copied 3 file(s) (copy: 3)']
+        dsts = sorted([pathlib.Path(c[0][1]).relative_to(tmpd).as_posix() for c in copyfile.call_args_list])
+        assert dsts == [
+            'dst_dir/d2/d3/f3',
+            'dst_dir/d2/f2',
+            'dst_dir/f1',
+        ]
+
+
+def test_copy_plan():
+    '''
+    src: d1/
+      d1/f1.txt
+      d1/d2/f2.txt
+      d1/d2/f3.py
+    dst: dst_dir (not exists)
+    '''
+    with tempfile.TemporaryDirectory() as tmpd:
+        srcd1 = pathlib.Path(tmpd, 'd1')
+        for f in ['f1.txt', 'd2/f2.txt', 'd2/f3.py']:
+            p = srcd1.joinpath(f)
+            p.parent.mkdir(parents=True, exist_ok=True)
+            p.touch()
+
+        copy = Copy('d1', 'dst_dir', glob_pattern=['**/*.txt', 'd2'])
+        plan = copy.plan(context=tmpd)
+
+        dstd = pathlib.Path(tmpd, 'dst_dir')
+        assert plan.dirs == [dstd, dstd.joinpath('d2')]
+        assert sorted(plan.files) == [
+            (dstd.joinpath('d2', 'f2.txt'), srcd1.joinpath('d2', 'f2.txt')),
+            (dstd.joinpath('d2', 'f3.py'), srcd1.joinpath('d2', 'f3.py')),
+            (dstd.joinpath('f1.txt'), srcd1.joinpath('f1.txt')),
+        ]
+        assert dstd.exists() is False
+
+
+def test_copy_dry_run_lists_plan():
+    with tempfile.TemporaryDirectory() as tmpd:
+        srcd1 = pathlib.Path(tmpd, 'd1')
+        srcd1.mkdir()
+        srcd1.joinpath('f1').touch()
+
+        copy = Copy('d1', 'dst_dir')
+
+        assert copy.dry_run(context=tmpd) == [
+            'mkdir dst_dir',
+            'copy %s -> %s' % (pathlib.Path('d1', 'f1'), pathlib.Path('dst_dir', 'f1')),
+        ]
+        assert Copy('unknown', 'dst_dir').dry_run(context=tmpd) == ['copy source not found: unknown']
+        assert pathlib.Path(tmpd, 'dst_dir').exists() is False
@@ -1,3 +1,5 @@
+import pickle
+
 import pytest
 
 from ceryle import executable, executable_with, Executable, ExecutionResult
@@ -338,3 +340,24 @@ def test_envs_and_additional_args(mocker):
 
     assert res.return_code == 0
     assert res.stdout == ['AAA', 'CCC', 'BBB', 'DDD']
+
+
+def test_custom_executable_pickle():
+    exe = pickle.loads(pickle.dumps(module_exe(1, b='x')))
+
+    assert str(exe) == 'module_exe(1, b=x)'
+    assert exe.execute().return_code == 0
+
+
+def test_custom_executable_pickle_local_function():
+    @executable
+    def local_exe():
+        return ExecutionResult(0)
+
+    with pytest.raises(pickle.PicklingError):
+        pickle.dumps(local_exe())
+
+
+@executable
+def module_exe(a, b=None):
+    return ExecutionResult(0)
@@ -2,10 +2,12 @@ import os
 import pathlib
 import platform
 import tempfile
+import time
 
 import pytest
 
 from ceryle import Remove, ExecutionResult
+from ceryle.commands.remove import TRASH_PREFIX
 from ceryle.dsl.support import Arg, Env, PathArg
 
 IS_WIN = platform.system() == 'Windows'
@@ -246,3 +248,149 @@ def test_remove_file_by_args(mocker):
         for f in [f1, f2, f3]:
             assert f.exists() is False
         assert f2.parent.is_dir() is True
+
+
+def test_remove_large_directory_tree():
+    '''
+    context:
+      d0/f0 .. d0/f49
+      d0/d1/f0 .. d0/d1/f49
+      ...
+      d0/d1/.../d9/f0 .. d0/d1/.../d9/f49
+    '''
+    with tempfile.TemporaryDirectory() as tmpd:
+        d = pathlib.Path(tmpd, 'd0')
+        for i in range(10):
+            d.mkdir()
+            for j in range(50):
+                with open(d.joinpath(f'f{j}'), 'w'):
+                    pass
+            d = d.joinpath(f'd{i + 1}')
+
+        remove = Remove('d0')
+        res = remove.execute(context=tmpd)
+
+        assert isinstance(res, ExecutionResult)
+        assert res.return_code == 0
+        assert pathlib.Path(tmpd, 'd0').exists() is False
+
+
+def test_remove_directory_tree_in_background(mocker):
+    '''
+    context:
+      d1/f1
+      d1/d2/f2
+    '''
+    with tempfile.TemporaryDirectory() as tmpd:
+        f1 = pathlib.Path(tmpd, 'd1', 'f1')
+        f2 = pathlib.Path(tmpd, 'd1', 'd2', 'f2')
+        f2.parent.mkdir(parents=True)
+        for f in [f1, f2]:
+            with open(f, 'w'):
+                pass
+
+        spawn = mocker.patch('ceryle.commands.remove._spawn_detached')
+
+        remove = Remove('d1', background=True)
+        res = remove.execute(context=tmpd)
+
+        assert isinstance(res, ExecutionResult)
+        assert res.return_code == 0
+        assert pathlib.Path(tmpd, 'd1').exists() is False
+
+        spawn.assert_called_once()
+        [cmd], _ = spawn.call_args
+        trash = pathlib.Path(cmd[-1])
+        assert trash.parent == pathlib.Path(tmpd)
+        assert trash.name.startswith(f'{TRASH_PREFIX}d1-')
+        assert trash.joinpath('f1').is_file() is True
+        assert trash.joinpath('d2', 'f2').is_file() is True
+
+
+def test_remove_in_background_deletes_trash():
+    with tempfile.TemporaryDirectory() as tmpd:
+        f1 = pathlib.Path(tmpd, 'd1', 'd2', 'f1')
+        f1.parent.mkdir(parents=True)
+        with open(f1, 'w'):
+            pass
+
+        remove = Remove('d1', background=True)
+        res = remove.execute(context=tmpd)
+
+        assert res.return_code == 0
+        assert pathlib.Path(tmpd, 'd1').exists() is False
+
+        deadline = time.time() + 10
+        while list(pathlib.Path(tmpd).iterdir()) and time.time() < deadline:
+            time.sleep(0.05)
+        assert list(pathlib.Path(tmpd).iterdir()) == []
+
+
+def test_remove_file_in_background(mocker):
+    with tempfile.TemporaryDirectory() as tmpd:
+        f1 = pathlib.Path(tmpd, 'f1')
+        with open(f1, 'w'):
+            pass
+
+        spawn = mocker.patch('ceryle.commands.remove._spawn_detached')
+
+        remove = Remove('f1', background=True)
+        res = remove.execute(context=tmpd)
+
+        assert res.return_code == 0
+        assert f1.exists() is False
+        spawn.assert_not_called()
+
+
+def test_remove_by_glob_with_excludes():
+    '''
+    context:
+      d1/f1.pyc
+      d1/keep/f2.pyc
+      d1/d2/f3.pyc
+      d1/d2/f4.py
+      d1/cache/f5.py
+      d1/cache/keep/f6.py
+    '''
+    with tempfile.TemporaryDirectory() as tmpd:
+        files = ['f1.pyc', 'keep/f2.pyc', 'd2/f3.pyc', 'd2/f4.py', 'cache/f5.py', 'cache/keep/f6.py']
+        for f in files:
+            p = pathlib.Path(tmpd, 'd1', f)
+            p.parent.mkdir(parents=True, exist_ok=True)
+            p.touch()
+
+        remove = Remove('d1/**/*.pyc', 'd1/cache', 'd1/*/cache', glob=True, exclude=['**/keep'])
+        res = remove.execute(context=tmpd)
+
+        assert isinstance(res, ExecutionResult)
+        assert res.return_code == 0
+        d1 = pathlib.Path(tmpd, 'd1')
+        assert sorted([p.relative_to(d1).as_posix() for p in d1.rglob('*') if p.is_file()]) == [
+            'd2/f4.py',
+            'keep/f2.pyc',
+        ]
+
+
+def test_remove_by_glob_walks_base_once(mocker):
+    '''
+    context:
+      d1/f1.py
+      d1/f1.pyc
+      d1/f1.pyo
+    '''
+    with tempfile.TemporaryDirectory() as tmpd:
+        for x in ['.py', '.pyc', '.pyo']:
+            p = pathlib.Path(tmpd, 'd1', f'f1{x}')
+            p.parent.mkdir(parents=True, exist_ok=True)
+            p.touch()
+
+        scandir = mocker.spy(os, 'scandir')
+
+        remove = Remove('d1/**/*.pyc', 'd1/**/*.pyo', glob=True)
+        res = remove.execute(context=tmpd)
+
+        assert res.return_code == 0
+        assert pathlib.Path(tmpd, 'd1', 'f1.py').exists() is True
+        assert pathlib.Path(tmpd, 'd1', 'f1.pyc').exists() is False
+        assert pathlib.Path(tmpd, 'd1', 'f1.pyo').exists() is False
+        assert scandir.call_count == 1
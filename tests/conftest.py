@@ -0,0 +1,15 @@
+from unittest import mock
+
+import pytest
+
+from ceryle.tasks.history import RunHistory
+
+
+@pytest.fixture(scope='session', autouse=True)
+def run_history(tmp_path_factory):
+    """
+    runs are recorded into a temporary database instead of the one in the home directory.
+    """
+    path = tmp_path_factory.getbasetemp().joinpath('run-history', 'history.db')
+    with mock.patch.object(RunHistory, 'default', side_effect=lambda: RunHistory(path)):
+        yield path
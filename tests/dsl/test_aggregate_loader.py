@@ -1,5 +1,11 @@
-from ceryle import TaskGroup
+import pathlib
+
+import pytest
+
+from ceryle import TaskGroup, TaskFileError
 from ceryle import AggregateTaskFileLoader, TaskFileLoader, ExtensionLoader, TaskDefinition
+from ceryle.dsl.aggregate_loader import precompile
+from ceryle.dsl.loader import Namespace
 
 
 def test_load_multiple_task_files(mocker):
@@ -25,9 +31,9 @@ def test_load_multiple_task_files(mocker):
     assert task_def.default_task == 'bar'
     assert mock.mock_calls == [
         mocker.call.loader_cls('file1', 'context'),
-        mocker.call.loader1_load(local_vars={}, additional_args={}),
+        mocker.call.loader1_load(global_vars=mocker.ANY, local_vars={}),
         mocker.call.loader_cls('file2', 'context'),
-        mocker.call.loader2_load(local_vars={}, additional_args={}),
+        mocker.call.loader2_load(global_vars=mocker.ANY, local_vars={}),
     ]
 
     assert task_def1.tasks[0] in task_def.tasks
@@ -86,12 +92,82 @@ def test_load_multiple_task_files_with_extensions(mocker):
     assert task_def.default_task == 'bar'
     assert mock.mock_calls == [
         mocker.call.xloader_cls('xfile1'),
-        mocker.call.xloader_load(local_vars={}, additional_args={}),
+        mocker.call.xloader_load(global_vars=mocker.ANY),
         mocker.call.loader_cls('file1', 'context'),
-        mocker.call.loader1_load(local_vars=extensions, additional_args={}),
+        mocker.call.loader1_load(global_vars=mocker.ANY, local_vars=extensions),
         mocker.call.loader_cls('file2', 'context'),
-        mocker.call.loader2_load(local_vars=extensions, additional_args={}),
+        mocker.call.loader2_load(global_vars=mocker.ANY, local_vars=extensions),
     ]
 
     assert task_def1.tasks[0] in task_def.tasks
     assert task_def2.tasks[0] in task_def.tasks
+
+
+def _write_task_files(tmpdir, n):
+    files = []
+    for i in range(n):
+        f = pathlib.Path(tmpdir, f'file{i}.ceryle')
+        f.write_text(f"NAME = 'g{i}'\n{{'g{i}': [command('echo ' + NAME)], 'common': [command('echo {i}')]}}\n")
+        files.append(str(f))
+    return files
+
+
+@pytest.mark.parametrize('cpus', [1, 2])
+def test_precompile(mocker, tmpdir, cpus):
+    mocker.patch('os.cpu_count', return_value=cpus)
+    files = _write_task_files(tmpdir, 9)
+    broken = pathlib.Path(tmpdir, 'broken.ceryle')
+    broken.write_text('{')
+    ex = pathlib.Path(tmpdir, 'ex.py')
+    ex.write_text('X = 1\n')
+
+    compiled = precompile([*files, str(broken)], [str(ex)])
+
+    assert sorted(compiled) == sorted([('x', str(ex)), *[('t', f) for f in files]])
+    body_code, tasks_code = compiled[('t', files[0])]
+    assert body_code.co_filename == files[0]
+    assert tasks_code.co_filename == files[0]
+
+
+def test_precompile_skips_small_number_of_files(tmpdir):
+    files = _write_task_files(tmpdir, 2)
+
+    assert precompile(files, []) == {}
+
+
+def test_load_precompiled_task_files(mocker, tmpdir):
+    files = _write_task_files(tmpdir, 10)
+    compile_mock = mocker.patch('ceryle.TaskFileLoader.compile')
+
+    task_def = AggregateTaskFileLoader(files, str(tmpdir)).load()
+
+    compile_mock.assert_not_called()
+    assert sorted([t.name for t in task_def.tasks]) == sorted(['common', *[f'g{i}' for i in range(10)]])
+    assert str(task_def.find_task_group('common').tasks[0].executable) == '[echo 9]'
+
+
+def test_load_precompiled_task_files_raises_in_order(tmpdir):
+    files = _write_task_files(tmpdir, 10)
+    pathlib.Path(files[3]).write_text('[]')
+    pathlib.Path(files[6]).write_text('{')
+
+    with pytest.raises(TaskFileError) as e:
+        AggregateTaskFileLoader(files, str(tmpdir)).load()
+    assert files[3] in str(e.value)
+
+
+def test_load_with_shared_namespace(mocker, tmpdir):
+    ex = pathlib.Path(tmpdir, 'ex.py')
+    ex.write_text('X = 1\ndef ex_command(a):\n    return command(a + arg("A"))\n')
+    file1 = pathlib.Path(tmpdir, 'file1.ceryle')
+    file1.write_text("Y = 'y'\n{'foo': [ex_command('echo ')]}\n")
+    file2 = pathlib.Path(tmpdir, 'file2.ceryle')
+    file2.write_text("{'bar': [command('echo ' + str(X) + str(globals().get('Y')))]}\n")
+    namespace_cls = mocker.patch('ceryle.dsl.aggregate_loader.Namespace', wraps=Namespace)
+
+    task_def = AggregateTaskFileLoader([str(file1), str(file2)], str(tmpdir), extensions=[str(ex)],
+                                       additional_args={'A': 'a'}).load()
+
+    namespace_cls.assert_called_once()
+    assert 'arg(A)' in str(task_def.find_task_group('foo').tasks[0].executable)
+    assert str(task_def.find_task_group('bar').tasks[0].executable) == '[echo 1None]'
@@ -0,0 +1,60 @@
+import os
+import pathlib
+import pickle
+
+import pytest
+
+import ceryle
+import ceryle.dsl.bundle
+from ceryle import BundleError, DependencyResolver, TaskFileLoader
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CONTEXT = pathlib.Path(SCRIPT_DIR, 'spec')
+
+
+def load(name):
+    return TaskFileLoader(CONTEXT / name, CONTEXT).load()
+
+
+def test_save_and_load_bundle(tmpdir):
+    task_def = load('test_dependency.ceryle')
+    bundle = pathlib.Path(tmpdir, 'tasks.bundle')
+
+    ceryle.dsl.bundle.save_bundle(bundle, task_def, DependencyResolver(task_def.tasks), str(CONTEXT))
+    loaded, resolver, root_context = ceryle.dsl.bundle.load_bundle(bundle)
+
+    assert root_context == str(CONTEXT)
+    assert [tg.name for tg in loaded.tasks] == ['group1', 'group2', 'group3']
+    chain = resolver.deps_chain_map()['group1']
+    assert [c.task_name for c in chain.deps] == ['group2', 'group3']
+    assert str(loaded.tasks[0].tasks[0].executable) == str(task_def.tasks[0].tasks[0].executable)
+
+
+def test_save_bundle_custom_executable_in_task_file(tmpdir):
+    task_def = load('test_custom_executable.ceryle')
+    bundle = pathlib.Path(tmpdir, 'tasks.bundle')
+
+    with pytest.raises(BundleError) as e:
+        ceryle.dsl.bundle.save_bundle(bundle, task_def, DependencyResolver(task_def.tasks), None)
+    assert 'my_exec' in str(e.value)
+    assert not bundle.exists()
+
+
+def test_load_bundle_other_version(tmpdir):
+    bundle = pathlib.Path(tmpdir, 'tasks.bundle')
+    with open(bundle, 'wb') as fp:
+        pickle.dump({'format': ceryle.dsl.bundle.BUNDLE_FORMAT, 'version': ceryle.dsl.bundle.BUNDLE_VERSION,
+                     'ceryle': '0.0.0'}, fp)
+        pickle.dump({}, fp)
+
+    with pytest.raises(BundleError) as e:
+        ceryle.dsl.bundle.load_bundle(bundle)
+    assert 'compile it again' in str(e.value)
+
+
+def test_load_bundle_not_bundle(tmpdir):
+    bundle = pathlib.Path(tmpdir, 'tasks.bundle')
+    bundle.write_text('not a bundle')
+
+    with pytest.raises(BundleError):
+        ceryle.dsl.bundle.load_bundle(bundle)
@@ -0,0 +1,123 @@
+import os
+import pathlib
+
+import pytest
+
+from ceryle import TaskFileLoader
+from ceryle.dsl.index import GroupIndex, extract_groups
+from ceryle.dsl.aggregate_loader import load_task_files
+
+SCRIPT_DIR = os.path.dirname(__file__)
+SPEC_DIR = pathlib.Path(SCRIPT_DIR, 'spec')
+
+
+def _write(path, content, old=True):
+    path.write_text(content)
+    if old:
+        # regards the file as not modified recently so that the entry is cached
+        os.utime(path, (0, 0))
+    return str(path)
+
+
+def test_extract_groups():
+    entry = extract_groups(SPEC_DIR.joinpath('test_dependency.ceryle'))
+    assert entry == {
+        'groups': {
+            'group1': ['group2', 'group3'],
+            'group2': [],
+            'group3': [],
+        },
+        'default': None,
+        'default_static': True,
+    }
+
+    assert extract_groups(SPEC_DIR.joinpath('test_module_var.ceryle'))['groups'] == {'mod_vars': []}
+
+
+@pytest.mark.parametrize(
+    'content,groups,default,default_static', [
+        ("default = 'a'\n{'a': [], 'b': {'dependencies': ['a']}}", {'a': [], 'b': ['a']}, 'a', True),
+        ("default = None\n{'a': []}", {'a': []}, None, True),
+        ("NAME = 'a'\ndefault = NAME\n{'a': []}", {'a': []}, None, False),
+        ("if True:\n    default = 'a'\n{'a': []}", {'a': []}, None, False),
+        ("DEPS = ['a']\n{'a': [], 'b': {'dependencies': DEPS}}", {'a': [], 'b': None}, None, True),
+        ("C = {}\n{'a': [], 'b': {**C}}", {'a': [], 'b': None}, None, True),
+        ("NAME = 'a'\n{NAME: []}", None, None, True),
+        ("G = {}\n{'a': [], **G}", None, None, True),
+        ("[1]", None, None, False),
+        ("{'a': [", None, None, False),
+    ])
+def test_extract_groups_static_or_not(tmpdir, content, groups, default, default_static):
+    entry = extract_groups(_write(pathlib.Path(tmpdir, 'f.ceryle'), content))
+    assert entry['groups'] == groups
+    if groups is not None:
+        assert entry['default'] == default
+        assert entry['default_static'] is default_static
+
+
+def test_group_index_select(tmpdir):
+    f1 = _write(pathlib.Path(tmpdir, 'f1.ceryle'), "{'a': [], 'b': {'dependencies': ['a']}, 'x': []}")
+    f2 = _write(pathlib.Path(tmpdir, 'f2.ceryle'), "default = 'c'\n{'c': {'dependencies': ['b']}, 'd': []}")
+    f3 = _write(pathlib.Path(tmpdir, 'f3.ceryle'), "{'e': [], 'x': {'dependencies': ['e']}}")
+    index = GroupIndex()
+
+    assert index.select([f1, f2, f3], target='d') == ([f2], set(['d']), 'c')
+    assert index.select([f1, f2, f3], target='c') == ([f1, f2], set(['a', 'b', 'c']), 'c')
+    assert index.select([f1, f2, f3]) == ([f1, f2], set(['a', 'b', 'c']), 'c')
+    # overwritten by the last file
+    assert index.select([f1, f2, f3], target='x') == ([f3], set(['x', 'e']), 'c')
+    # not defined
+    assert index.select([f1, f2, f3], target='y') is None
+
+
+def test_group_index_select_not_static(tmpdir):
+    f1 = _write(pathlib.Path(tmpdir, 'f1.ceryle'), "DEPS = ['a']\n{'a': [], 'b': {'dependencies': DEPS}, 'c': []}")
+    f2 = _write(pathlib.Path(tmpdir, 'f2.ceryle'), "NAME = 'x'\n{NAME: []}")
+    f3 = _write(pathlib.Path(tmpdir, 'f3.ceryle'), "default = 'b' if True else 'c'\n{'d': []}")
+    index = GroupIndex()
+
+    assert index.select([f1], target='c') == ([f1], set(['c']), None)
+    assert index.select([f1], target='b') is None
+    assert index.select([f1, f2], target='c') is None
+    assert index.select([f1, f3]) is None
+    assert index.select([f1, f3], target='d') == ([f3], set(['d']), None)
+
+
+def test_group_index_invalidated_by_mtime(tmpdir):
+    cache_file = pathlib.Path(tmpdir, 'cache', 'index.json')
+    f1 = _write(pathlib.Path(tmpdir, 'f1.ceryle'), "{'a': []}")
+
+    index = GroupIndex(cache_file)
+    assert index.select([f1], target='a') == ([f1], set(['a']), None)
+    index.save()
+    assert cache_file.is_file()
+
+    assert GroupIndex(cache_file).entry(f1) == index.entry(f1)
+
+    os.utime(f1, (1, 1))
+    _write(pathlib.Path(f1), "{'a': {'dependencies': ['b']}, 'b': []}", old=False)
+    index = GroupIndex(cache_file)
+    assert index.select([f1], target='a') == ([f1], set(['a', 'b']), None)
+
+
+def test_load_task_files_lazily(tmpdir, mocker):
+    f1 = _write(pathlib.Path(tmpdir, 'f1.ceryle'), "{'a': [command('echo a')], 'b': {'dependencies': ['z']}}")
+    f2 = _write(pathlib.Path(tmpdir, 'f2.ceryle'), "default = 'c'\n{'c': {'dependencies': ['a']}}")
+    f3 = _write(pathlib.Path(tmpdir, 'f3.ceryle'), "raise RuntimeError('must not be loaded')\n{'d': []}")
+    loader_cls = mocker.patch('ceryle.TaskFileLoader', wraps=TaskFileLoader)
+
+    task_def = load_task_files([f1, f2, f3], [], str(tmpdir), index=GroupIndex())
+
+    assert sorted([t.name for t in task_def.tasks]) == ['a', 'c']
+    assert task_def.default_task == 'c'
+    assert [c[0][0] for c in loader_cls.call_args_list] == [f1, f2]
+
+
+def test_load_task_files_falls_back_to_load_all(tmpdir):
+    f1 = _write(pathlib.Path(tmpdir, 'f1.ceryle'), "NAME = 'a'\n{NAME: [command('echo a')]}")
+    f2 = _write(pathlib.Path(tmpdir, 'f2.ceryle'), "default = 'c'\n{'c': {'dependencies': ['a']}, 'd': []}")
+
+    task_def = load_task_files([f1, f2], [], str(tmpdir), target='c', index=GroupIndex())
+
+    assert sorted([t.name for t in task_def.tasks]) == ['a', 'c', 'd']
+    assert task_def.default_task == 'c'
@@ -3,8 +3,8 @@ import pathlib
 
 import pytest
 
-from ceryle import Command, TaskFileLoader, ExtensionLoader
-from ceryle import TaskFileError
+from ceryle import Archive, Command, Extract, TaskFileLoader, ExtensionLoader
+from ceryle import TaskFileError, CommandFormatError
 from ceryle.commands.executable import ExecutableWrapper
 from ceryle.tasks.condition import Condition
 from ceryle.tasks.task import CommandInput, SingleValueCommandInput, MultiCommandInput
@@ -182,6 +182,12 @@ class TestExecutableSpec(DSLSpecBase):
     def test_copy(self):
         self.load('test_copy.ceryle')
 
+    def test_archive(self):
+        task_def = self.load('test_archive.ceryle')
+
+        assert isinstance(task_def.find_task_group('archive').tasks[0].executable, Archive)
+        assert isinstance(task_def.find_task_group('extract').tasks[0].executable, Extract)
+
     def test_module_var(self):
         task_def = self.load('test_module_var.ceryle')
 
@@ -229,6 +235,13 @@ class TestTaskFileSpec(DSLSpecBase):
         task_file = spec_file('test_not_dict.ceryle')
         assert str(e.value) == f'Not task definition, declare by dict form: {task_file}'
 
+    def test_invalid_task_is_validated_when_used(self):
+        task_def = self.load('test_invalid_task.ceryle')
+
+        assert isinstance(task_def.find_task_group('valid').tasks[0].executable, Command)
+        with pytest.raises(CommandFormatError):
+            task_def.find_task_group('invalid').validate()
+
 
 class TestExtensionFileSpec:
     def load(self, name, local_vars={}):
@@ -2,7 +2,7 @@ import pathlib
 import pytest
 
 from ceryle import NoArgumentError, NoEnvironmentError
-from ceryle.dsl.support import joinpath, ArgumentBase, Arg, Env, PathArg
+from ceryle.dsl.support import joinpath, ArgumentBase, Arg, Arguments, Env, PathArg
 
 
 class TestEnv:
@@ -236,6 +236,28 @@ class TestArg:
         assert isinstance(arg, Arg)
         assert arg.evaluate() == '213405'
 
+    def test_share_arguments(self):
+        args = Arguments({'FOO': '1'})
+
+        arg1 = Arg('FOO', args)
+        arg2 = arg1 + Arg('FOO', args)
+        assert arg1._args is args
+        assert arg2._args is args
+        assert arg2.evaluate() == '11'
+
+    def test_arguments_immutable(self):
+        src = {'FOO': '1'}
+        args = Arguments(src)
+        src['FOO'] = '2'
+
+        assert args == {'FOO': '1'}
+        with pytest.raises(TypeError):
+            args['FOO'] = '3'
+
+    def test_arguments_illegal_type(self):
+        with pytest.raises(TypeError):
+            Arguments({'FOO': 1})
+
     def test_evaluate_with_formatting(self):
         args = {'FOO': '1'}
 
@@ -0,0 +1,138 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from ceryle import Command, Task, TaskGroup, TaskRunner
+from ceryle.tasks import ChangeDetectionError
+from ceryle.tasks.affected import affected_task_groups, changed_task_groups, closure, with_dependents
+from ceryle.tasks.affected import changed_files_since, in_run_order, with_register_producers
+
+HAS_GIT = shutil.which('git') is not None
+
+
+def _groups(root):
+    return [
+        TaskGroup('all', [], root, 'CERYLE', dependencies=['test', 'docs']),
+        TaskGroup('test', [], root, 'CERYLE', dependencies=['build']),
+        TaskGroup('build', [], os.path.join(root, 'src'), 'CERYLE', inputs=['**/*.py']),
+        TaskGroup('docs', [], os.path.join(root, 'docs'), 'CERYLE'),
+        TaskGroup('other', [], os.path.join(root, 'other'), 'CERYLE', dependencies=['build']),
+    ]
+
+
+def test_changed_task_groups(tmpdir):
+    root = str(tmpdir)
+    groups = _groups(root)
+
+    # all and test use root as context without inputs
+    assert changed_task_groups(groups, [os.path.join(root, 'src', 'a.py')]) == ['all', 'test', 'build']
+    assert changed_task_groups(groups, [os.path.join(root, 'src', 'a.txt')]) == ['all', 'test']
+    assert changed_task_groups(groups, [os.path.join(root, 'docs', 'index.md')]) == ['all', 'test', 'docs']
+    assert changed_task_groups(groups, [os.path.join(root, 'docs2', 'index.md')]) == ['all', 'test']
+    assert changed_task_groups(groups[2:], [os.path.join(root, 'docs2', 'index.md')]) == []
+
+
+def test_with_dependents(tmpdir):
+    groups = _groups(str(tmpdir))
+
+    assert with_dependents(groups, ['build']) == set(['build', 'test', 'other', 'all'])
+    assert with_dependents(groups, ['build'], scope=['all', 'test', 'build']) == set(['build', 'test', 'all'])
+    assert with_dependents(groups, ['docs']) == set(['docs', 'all'])
+    assert with_dependents(groups, []) == set()
+
+
+def test_affected_task_groups(tmpdir):
+    root = str(tmpdir)
+    groups = [
+        TaskGroup('test', [], root, 'CERYLE', dependencies=['build', 'lint'], inputs=['tests/**/*.py']),
+        TaskGroup('build', [], root, 'CERYLE', inputs=['src/**/*.py']),
+        TaskGroup('lint', [], root, 'CERYLE', inputs=['src/**/*.py', 'setup.cfg']),
+        TaskGroup('other', [], root, 'CERYLE', dependencies=['build']),
+    ]
+    chain = TaskRunner(groups).get_chain('test')
+
+    assert closure(chain) == set(['test', 'build', 'lint'])
+    assert affected_task_groups(groups, chain, [os.path.join(root, 'src', 'm', 'a.py')]) == \
+        set(['test', 'build', 'lint'])
+    assert affected_task_groups(groups, chain, [os.path.join(root, 'setup.cfg')]) == set(['test', 'lint'])
+    assert affected_task_groups(groups, chain, [os.path.join(root, 'tests', 'test_a.py')]) == set(['test'])
+    assert affected_task_groups(groups, chain, [os.path.join(root, 'README.md')]) == set()
+
+
+def test_with_register_producers(tmpdir):
+    root = str(tmpdir)
+    groups = [
+        TaskGroup('all', [Task(Command('do all'), input=[('docs', 'OUT'), 'LOCAL'])], root, 'CERYLE',
+                  dependencies=['docs', 'test']),
+        TaskGroup('docs', [Task(Command('do docs'), input=('version', 'VERSION'))], root, 'CERYLE',
+                  dependencies=['version']),
+        TaskGroup('version', [Task(Command('do version'), input=('git', 'HEAD'), stdout='VERSION')], root, 'CERYLE',
+                  dependencies=['git']),
+        TaskGroup('git', [Task(Command('do git'), stdout='HEAD')], root, 'CERYLE'),
+        TaskGroup('test', [Task(Command('do test'), input='LOCAL')], root, 'CERYLE'),
+    ]
+
+    assert with_register_producers(groups, ['test']) == set(['test'])
+    assert with_register_producers(groups, ['docs']) == set(['docs', 'version', 'git'])
+    assert with_register_producers(groups, ['all']) == set(['all', 'docs', 'version', 'git'])
+    assert with_register_producers(groups, ['docs'], scope=['docs', 'version']) == set(['docs', 'version'])
+    assert with_register_producers(groups, []) == set()
+
+
+def test_in_run_order(tmpdir):
+    groups = _groups(str(tmpdir))
+    chain = TaskRunner(groups).get_chain('all')
+
+    assert in_run_order(chain, set(['all', 'test', 'build', 'docs'])) == ['build', 'test', 'docs', 'all']
+    assert in_run_order(chain, set(['all', 'docs', 'other'])) == ['docs', 'all']
+    assert in_run_order(chain, set()) == []
+
+
+def _git(cwd, *args):
+    subprocess.run(['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com', *args],
+                   cwd=cwd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+@pytest.mark.skipif(not HAS_GIT, reason='git is not installed')
+def test_changed_files_since(tmpdir):
+    root = tmpdir.join('repo')
+    root.join('src', 'a.py').write('a', ensure=True)
+    root.join('src', 'b.py').write('b', ensure=True)
+    root.join('docs', 'index.md').write('docs', ensure=True)
+    root.join('.gitignore').write('*.log\n')
+    _git(str(root), 'init', '-q')
+    _git(str(root), 'add', '.')
+    _git(str(root), 'commit', '-q', '-m', 'initial')
+
+    root.join('src', 'a.py').write('a2')
+    _git(str(root), 'commit', '-q', '-am', 'modify a')
+    root.join('src', 'b.py').write('b2')
+    root.join('src', 'c.py').write('c')
+    root.join('src', 'build.log').write('log')
+
+    top = os.path.realpath(str(root))
+    assert changed_files_since('HEAD~1', cwd=str(root.join('docs'))) == [
+        os.path.join(top, 'src', 'a.py'),
+        os.path.join(top, 'src', 'b.py'),
+        os.path.join(top, 'src', 'c.py'),
+    ]
+    assert changed_files_since('HEAD', cwd=str(root)) == [
+        os.path.join(top, 'src', 'b.py'),
+        os.path.join(top, 'src', 'c.py'),
+    ]
+
+
+@pytest.mark.skipif(not HAS_GIT, reason='git is not installed')
+def test_changed_files_since_fails_by_unknown_ref(tmpdir):
+    _git(str(tmpdir), 'init', '-q')
+    with pytest.raises(ChangeDetectionError) as e:
+        changed_files_since('no-such-ref', cwd=str(tmpdir))
+    assert str(e.value).startswith('git diff failed:')
+
+
+def test_changed_files_since_rejects_option_as_ref(tmpdir):
+    with pytest.raises(ChangeDetectionError) as e:
+        changed_files_since('--output=foo', cwd=str(tmpdir))
+    assert str(e.value) == 'invalid git ref: --output=foo'
@@ -1,5 +1,6 @@
 import pytest
 
+import ceryle.util as util
 from ceryle import Condition, Command, ExecutionResult
 
 
@@ -95,3 +96,9 @@ def test_condition_test_by_predefined_with_dry_run(predefined_condition, arg_inp
     condition = Condition(predefined_condition)
     assert condition.test(context='context', dry_run=True) is True
     assert condition.test(context='context', dry_run=True, inputs=arg_inputs) is True
+
+
+def test_platform_flags():
+    assert Condition.WIN is util.is_win()
+    assert Condition.LINUX is util.is_linux()
+    assert Condition.MAC is util.is_mac()
@@ -0,0 +1,103 @@
+import sqlite3
+
+import pytest
+
+from ceryle.tasks.history import RunHistory, percentile, trend
+
+
+def _timings(started, build, test, test_success=True):
+    return [
+        {'name': 'build', 'started': started, 'duration': build, 'success': True,
+         'tasks': [{'name': '[make]', 'duration': build * 0.75, 'return_code': 0},
+                   {'name': '[strip]', 'duration': build * 0.25, 'return_code': 0}]},
+        {'name': 'test', 'started': started + build, 'duration': test, 'success': test_success,
+         'tasks': [{'name': '[pytest]', 'duration': test, 'return_code': 0 if test_success else 1}]},
+    ]
+
+
+@pytest.fixture
+def history(tmpdir):
+    with RunHistory(tmpdir.join('history.db')) as h:
+        for i, (build, test) in enumerate([(1.0, 5.0), (2.0, 6.0), (3.0, 7.0), (4.0, 8.0), (5.0, 9.0)]):
+            started = 1000.0 + i * 100
+            h.record('test', '/project', started, build + test, i != 2,
+                     _timings(started, build, test, test_success=i != 2))
+        h.record('test', '/other', 2000.0, 1.0, True, _timings(2000.0, 100.0, 100.0))
+        yield h
+
+
+def test_percentile():
+    assert percentile([], 50) is None
+    assert percentile([3.0], 95) == 3.0
+    assert percentile([5.0, 1.0, 3.0, 2.0, 4.0], 50) == 3.0
+    assert percentile(list(range(1, 101)), 95) == 95
+    assert percentile([1.0, 2.0], 100) == 2.0
+
+
+def test_trend():
+    assert trend([1.0, 2.0, 3.0]) is None
+    assert trend([1.0, 1.0, 2.0, 2.0]) == 2.0
+    assert trend([1.0, 2.0, 5.0, 3.0, 4.0]) == 3.0
+    assert trend([0.0, 0.0, 2.0, 2.0]) is None
+
+
+def test_runs(history):
+    assert history.runs('/project', last=2) == [
+        ('test', 1400.0, 14.0, True),
+        ('test', 1300.0, 12.0, True),
+    ]
+    assert history.runs(None) == []
+
+
+def test_group_stats(history):
+    assert history.group_stats('/project') == [
+        {'name': 'test', 'runs': 5, 'failures': 1, 'p50': 7.0, 'p95': 9.0, 'max': 9.0, 'trend': 8.0 / 5.0},
+        {'name': 'build', 'runs': 5, 'failures': 0, 'p50': 3.0, 'p95': 5.0, 'max': 5.0, 'trend': 4.0 / 1.0},
+    ]
+    assert [(s['name'], s['runs'], s['max']) for s in history.group_stats('/project', last=2)] == [
+        ('test', 2, 9.0),
+        ('build', 2, 5.0),
+    ]
+    assert history.group_stats('/none') == []
+
+
+def test_group_history(history):
+    assert history.group_history('build', '/project', last=3) == [
+        (1400.0, 5.0, True),
+        (1300.0, 4.0, True),
+        (1200.0, 3.0, True),
+    ]
+    assert history.group_history('test', '/other') == [(2100.0, 100.0, True)]
+    assert history.group_history('deploy', '/project') == []
+
+
+def test_task_stats(history):
+    stats = history.task_stats('build', '/project', last=2)
+    assert [(s['name'], s['runs'], s['failures'], s['max']) for s in stats] == [
+        ('[make]', 2, 0, 3.75),
+        ('[strip]', 2, 0, 1.25),
+    ]
+    assert [(s['name'], s['failures']) for s in history.task_stats('test', '/project')] == [('[pytest]', 1)]
+
+
+def test_record_host_and_cpus(tmpdir, mocker):
+    mocker.patch('platform.node', return_value='ci-host')
+    mocker.patch('os.cpu_count', return_value=8)
+    path = tmpdir.join('sub', 'history.db')
+
+    with RunHistory(path) as history:
+        history.record('test', None, 1.0, 2.0, False, [])
+
+    with sqlite3.connect(str(path)) as conn:
+        assert conn.execute('SELECT task, root_context, success, host, cpus FROM runs').fetchall() == [
+            ('test', None, 0, 'ci-host', 8),
+        ]
+
+
+def test_rejects_unknown_schema_version(tmpdir):
+    path = tmpdir.join('history.db')
+    with sqlite3.connect(str(path)) as conn:
+        conn.execute('PRAGMA user_version = 99')
+
+    with pytest.raises(sqlite3.DatabaseError):
+        RunHistory(path).runs(None)
@@ -0,0 +1,81 @@
+import pathlib
+
+import pytest
+
+from ceryle.tasks.metrics import cpu_seconds, metrics_lines, write_metrics_file
+
+TIMINGS = [
+    {'name': 'build', 'started': 100.0, 'duration': 1.5, 'success': True,
+     'tasks': [{'name': '[make]', 'duration': 1.5, 'return_code': 0, 'registered_bytes': 12}]},
+    {'name': 'te"st', 'started': 101.5, 'duration': 0.25, 'success': False,
+     'tasks': [{'name': '[lint]', 'duration': 0.1, 'return_code': 1, 'registered_bytes': 0},
+               {'name': '[pytest]', 'duration': 0.15, 'return_code': 2, 'registered_bytes': 3}]},
+]
+
+
+def test_metrics_lines():
+    lines = list(metrics_lines('all', 100.0, 1.75, False, TIMINGS, cpu={'ceryle': 0.5, 'children': 1.25}))
+
+    samples = [line for line in lines if not line.startswith('#')]
+    assert samples == [
+        'ceryle_run_duration_seconds{task="all"} 1.75',
+        'ceryle_run_success{task="all"} 0',
+        'ceryle_run_timestamp_seconds{task="all"} 100.0',
+        'ceryle_run_task_groups{task="all"} 2',
+        'ceryle_task_group_duration_seconds{task="all",task_group="build"} 1.5',
+        'ceryle_task_group_duration_seconds{task="all",task_group="te\\"st"} 0.25',
+        'ceryle_task_group_success{task="all",task_group="build"} 1',
+        'ceryle_task_group_success{task="all",task_group="te\\"st"} 0',
+        'ceryle_task_group_tasks{task="all",task_group="build"} 1',
+        'ceryle_task_group_tasks{task="all",task_group="te\\"st"} 2',
+        'ceryle_task_group_task_failures{task="all",task_group="build"} 0',
+        'ceryle_task_group_task_failures{task="all",task_group="te\\"st"} 2',
+        'ceryle_task_group_registered_bytes{task="all",task_group="build"} 12',
+        'ceryle_task_group_registered_bytes{task="all",task_group="te\\"st"} 3',
+        'ceryle_process_cpu_seconds_total{task="all",process="ceryle"} 0.5',
+        'ceryle_process_cpu_seconds_total{task="all",process="children"} 1.25',
+    ]
+    types = [line.split(' ')[2:] for line in lines if line.startswith('# TYPE ')]
+    assert len(types) == 10
+    assert types[-1] == ['ceryle_process_cpu_seconds_total', 'counter']
+    assert all([t == 'gauge' for _, t in types[:-1]])
+    assert len([line for line in lines if line.startswith('# HELP ')]) == 10
+
+
+def test_metrics_lines_escape_labels():
+    lines = metrics_lines('a\\b\nc', 0.0, 0.0, True, [], cpu={})
+
+    assert 'ceryle_run_success{task="a\\\\b\\nc"} 1' in list(lines)
+
+
+def test_cpu_seconds():
+    cpu = cpu_seconds()
+
+    assert sorted(cpu) == ['ceryle', 'children']
+    assert cpu['ceryle'] > 0
+    assert cpu['children'] >= 0
+
+
+def test_write_metrics_file(tmpdir):
+    path = pathlib.Path(tmpdir, 'ceryle.prom')
+    path.write_text('old\n')
+
+    write_metrics_file(path, ['a 1', 'b 2'])
+
+    assert path.read_text() == 'a 1\nb 2\n'
+    assert sorted([p.name for p in pathlib.Path(tmpdir).iterdir()]) == ['ceryle.prom']
+
+
+def test_write_metrics_file_keeps_old_one_on_failure(tmpdir):
+    path = pathlib.Path(tmpdir, 'ceryle.prom')
+    path.write_text('old\n')
+
+    def lines():
+        yield 'a 1'
+        raise ValueError('broken')
+
+    with pytest.raises(ValueError):
+        write_metrics_file(path, lines())
+
+    assert path.read_text() == 'old\n'
+    assert sorted([p.name for p in pathlib.Path(tmpdir).iterdir()]) == ['ceryle.prom']
@@ -1,4 +1,5 @@
 import pytest
+import random
 import re
 
 from ceryle import TaskGroup, TaskDependencyError, DependencyChain, DependencyResolver
@@ -44,6 +45,77 @@ def test_validate_fails_by_cyclic():
     assert re.match(p4, str(e4.value))
 
 
+def test_validate_fails_by_cyclic_reports_every_cycle():
+    with pytest.raises(TaskDependencyError) as e:
+        resolver = DependencyResolver([
+            TaskGroup('a', [], 'context', 'file1.ceryle', dependencies=['b', 'd']),
+            TaskGroup('b', [], 'context', 'file1.ceryle', dependencies=['c']),
+            TaskGroup('c', [], 'context', 'file1.ceryle', dependencies=['a', 'b']),
+            TaskGroup('d', [], 'context', 'file1.ceryle', dependencies=['e']),
+            TaskGroup('e', [], 'context', 'file1.ceryle', dependencies=['e']),
+        ])
+        resolver.validate()
+    assert str(e.value) == 'cyclic dependency was found: e -> e, a -> b -> c -> a'
+
+
+def test_validate_long_chain():
+    n = 10000
+    resolver = DependencyResolver([
+        TaskGroup(f't{i}', [], 'context', 'file1.ceryle', dependencies=[f't{i + 1}'] if i + 1 < n else [])
+        for i in range(n)
+    ])
+    chain_map = resolver.deps_chain_map()
+
+    assert len(chain_map) == n
+    assert chain_map['t0'].deps == [chain_map['t1']]
+    assert chain_map[f't{n - 1}'].deps == []
+
+
+def test_validate_diamonds():
+    # every group depends on all of preceding 3 groups, which is exponential if traversed by paths
+    groups = [TaskGroup('t0', [], 'context', 'file1.ceryle')]
+    for i in range(1, 300):
+        groups.append(TaskGroup(f't{i}', [], 'context', 'file1.ceryle',
+                                dependencies=[f't{j}' for j in reversed(range(max(0, i - 3), i))]))
+    chain_map = DependencyResolver(groups).deps_chain_map()
+
+    assert [d.task_name for d in chain_map['t299'].deps] == ['t298']
+    assert [d.task_name for d in chain_map['t1'].deps] == ['t0']
+
+
+def test_construct_chain_map_omits_reachable_dependencies():
+    resolver = DependencyResolver([
+        TaskGroup('a', [], 'context', 'file1.ceryle', dependencies=['b', 'c', 'd', 'b']),
+        TaskGroup('b', [], 'context', 'file1.ceryle', dependencies=['c', 'd']),
+        TaskGroup('c', [], 'context', 'file1.ceryle'),
+        TaskGroup('d', [], 'context', 'file1.ceryle', allow_skip=False),
+    ])
+    chain_map = resolver.deps_chain_map()
+
+    assert [d.task_name for d in chain_map['a'].deps] == ['b', 'd']
+    assert [d.task_name for d in chain_map['b'].deps] == ['c', 'd']
+    assert chain_map['a'].deps[0] is chain_map['b']
+
+
+def test_construct_chain_map_omits_reachable_dependencies_of_random_graphs():
+    rand = random.Random(41)
+    for _ in range(30):
+        n = rand.randint(1, 40)
+        deps = [rand.sample(range(i), min(i, rand.randint(0, 5))) for i in range(n)]
+        task_groups = [TaskGroup(f't{i}', [], 'context', 'file1.ceryle', dependencies=[f't{d}' for d in deps[i]],
+                                 allow_skip=rand.random() < 0.7) for i in range(n)]
+        reachable = []
+        for i in range(n):
+            reachable.append(set([i]).union(*[reachable[d] for d in deps[i]]))
+
+        chain_map = DependencyResolver(task_groups).deps_chain_map()
+
+        for i in range(n):
+            expected = [f't{d}' for k, d in enumerate(deps[i])
+                        if not task_groups[d].allow_skip or all([d not in reachable[e] for e in deps[i][:k]])]
+            assert [c.task_name for c in chain_map[f't{i}'].deps] == expected
+
+
 def test_validate_fails_by_no_depnding_task():
     with pytest.raises(TaskDependencyError) as e:
         resolver = DependencyResolver([
@@ -243,3 +315,76 @@ def test_dump_chain():
     t12
         t121'''
     assert dump_chain(a1) == res
+
+
+def reachability_index():
+    #   a -> b -> d -> e
+    #   a -> c -> d
+    #   f -> c
+    return DependencyResolver([
+        TaskGroup('a', [], 'context', 'file1.ceryle', dependencies=['b', 'c']),
+        TaskGroup('b', [], 'context', 'file1.ceryle', dependencies=['d']),
+        TaskGroup('c', [], 'context', 'file1.ceryle', dependencies=['d']),
+        TaskGroup('d', [], 'context', 'file1.ceryle', dependencies=['e']),
+        TaskGroup('e', [], 'context', 'file1.ceryle'),
+        TaskGroup('f', [], 'context', 'file1.ceryle', dependencies=['c', 'c']),
+    ]).reachability_index()
+
+
+def test_reachability_depends_on():
+    index = reachability_index()
+
+    assert index.depends_on('a', 'e') is True
+    assert index.depends_on('f', 'd') is True
+    assert index.depends_on('f', 'b') is False
+    assert index.depends_on('e', 'a') is False
+    assert index.depends_on('a', 'a') is False
+    assert 'a' in index
+    assert 'x' not in index
+    with pytest.raises(TaskDependencyError):
+        index.depends_on('a', 'x')
+
+
+def test_reachability_dependencies():
+    index = reachability_index()
+
+    assert index.dependencies('a', transitive=False) == ['b', 'c']
+    assert index.dependencies('f', transitive=False) == ['c']
+    deps = index.dependencies('a')
+    assert sorted(deps) == ['b', 'c', 'd', 'e']
+    assert deps.index('e') < deps.index('d') < min(deps.index('b'), deps.index('c'))
+    assert index.dependencies('e') == []
+
+
+def test_reachability_dependents():
+    index = reachability_index()
+
+    assert sorted(index.dependents('d', transitive=False)) == ['b', 'c']
+    rdeps = index.dependents('d')
+    assert sorted(rdeps) == ['a', 'b', 'c', 'f']
+    assert rdeps.index('a') > max(rdeps.index('b'), rdeps.index('c'))
+    assert index.dependents('a') == []
+
+
+def test_reachability_shortest_path():
+    index = reachability_index()
+
+    assert index.shortest_path('a', 'e') in [['a', 'b', 'd', 'e'], ['a', 'c', 'd', 'e']]
+    assert index.shortest_path('f', 'e') == ['f', 'c', 'd', 'e']
+    assert index.shortest_path('a', 'b') == ['a', 'b']
+    assert index.shortest_path('f', 'b') is None
+    assert index.shortest_path('e', 'a') is None
+
+
+def test_reachability_shortest_path_long_chain():
+    n = 3000
+    index = DependencyResolver([
+        TaskGroup(f't{i}', [], 'context', 'file1.ceryle',
+                  dependencies=[f't{j}' for j in range(i + 1, min(n, i + 3))])
+        for i in range(n)
+    ]).reachability_index()
+
+    path = index.shortest_path('t0', f't{n - 1}')
+    assert len(path) == 1 + (n - 1 + 1) // 2
+    assert path[0] == 't0' and path[-1] == f't{n - 1}'
+    assert len(index.dependencies('t0')) == n - 1
@@ -1,7 +1,7 @@
 import pytest
 
 import ceryle.util as util
-from ceryle import Command, Task, TaskGroup, TaskRunner, RunCache
+from ceryle import Command, ExecutionResult, Task, TaskGroup, TaskRunner, RunCache
 from ceryle import TaskDependencyError, TaskDefinitionError, IllegalOperation
 
 
@@ -282,6 +282,24 @@ def test_run_skip_task_already_run(mocker):
     assert cache.register == {}
 
 
+def test_run_skip_task_already_run_without_running_its_dependencies(mocker):
+    tasks = dict([(name, Task(Command('do some'))) for name in ['g1', 'g2', 'g3', 'g4', 'g5']])
+    runner = TaskRunner([
+        TaskGroup('g1', [tasks['g1']], 'context', 'file1.ceryle', dependencies=['g2', 'g3']),
+        TaskGroup('g2', [tasks['g2']], 'context', 'file1.ceryle', dependencies=['g4']),
+        TaskGroup('g3', [tasks['g3']], 'context', 'file1.ceryle', dependencies=['g4']),
+        TaskGroup('g4', [tasks['g4']], 'context', 'file1.ceryle', dependencies=['g5']),
+        TaskGroup('g5', [tasks['g5']], 'context', 'file1.ceryle', dependencies=[], allow_skip=False),
+    ])
+    for t in tasks.values():
+        mocker.patch.object(t, 'run', return_value=True)
+
+    assert runner.run('g1') is True
+    for t in tasks.values():
+        t.run.assert_called_once()
+    assert runner.get_cache().results == [('g5', True), ('g4', True), ('g2', True), ('g3', True), ('g1', True)]
+
+
 def test_run_do_not_skip_if_not_allowed(mocker):
     mock = mocker.Mock()
 
@@ -466,3 +484,60 @@ def test_run_all_since_last_is_differnt_task(mocker):
         ('g3', True),
     ]
     assert cache.register == {}
+
+
+def test_run_only_affected_task_groups(mocker):
+    g1 = TaskGroup('g1', [], 'context', 'file1.ceryle', dependencies=['g2', 'g3'])
+    mocker.patch.object(g1, 'run', return_value=(True, {'g1': {'out': ['a', 'b', 'c']}}))
+
+    g2 = TaskGroup('g2', [], 'context', 'file1.ceryle', dependencies=[])
+    mocker.patch.object(g2, 'run', return_value=(True, {'g2': {'out': ['x']}}))
+
+    g3 = TaskGroup('g3', [], 'context', 'file1.ceryle', dependencies=[])
+    mocker.patch.object(g3, 'run', return_value=(True, {'g3': {'out': ['y']}}))
+
+    runner = TaskRunner([g1, g2, g3])
+    last_register = {'g2': {'out': ['last']}, 'g3': {'out': ['last']}}
+
+    assert runner.run('g1', only=['g1', 'g3'], register=last_register) is True
+    g2.run.assert_not_called()
+    g3.run.assert_called_once_with(dry_run=False, register=last_register)
+    g1.run.assert_called_once_with(dry_run=False, register={'g3': {'out': ['y']}})
+    assert runner.get_cache().results == [('g2', True), ('g3', True), ('g1', True)]
+
+
+def test_run_traces_task_groups_and_tasks():
+    g1 = TaskGroup('g1', [Task(Command('do a'))], 'context', 'file1.ceryle', dependencies=['g2'])
+    g2 = TaskGroup('g2', [Task(Command('do b'))], 'context', 'file1.ceryle', dependencies=[])
+
+    tracer = util.start_tracing()
+    try:
+        assert TaskRunner([g1, g2]).run('g1', dry_run=True) is True
+    finally:
+        util.stop_tracing()
+
+    spans = [(e['name'], e['cat'], e['args']) for e in tracer.events if e['ph'] == 'X']
+    assert spans == [
+        ('[do b]', 'task', {'dry_run': True, 'success': True}),
+        ('g2', 'task group', {'context': 'context', 'success': True}),
+        ('[do a]', 'task', {'dry_run': True, 'success': True}),
+        ('g1', 'task group', {'context': 'context', 'success': True}),
+    ]
+
+
+def test_get_timings(mocker):
+    g1 = TaskGroup('g1', [Task(Command('do a')), Task(Command('do b'))], 'context', 'file1.ceryle',
+                   dependencies=['g2'])
+    g2 = TaskGroup('g2', [Task(Command('do c'))], 'context', 'file1.ceryle')
+    g3 = TaskGroup('g3', [Task(Command('do d'))], 'context', 'file1.ceryle', dependencies=['g1'])
+    mocker.patch('ceryle.commands.command.Command.execute',
+                 side_effect=[ExecutionResult(0), ExecutionResult(0), ExecutionResult(3)])
+
+    runner = TaskRunner([g1, g2, g3])
+    assert runner.get_timings() == []
+    assert runner.run('g1') is False
+
+    timings = runner.get_timings()
+    assert [(t['name'], t['success']) for t in timings] == [('g2', True), ('g1', False)]
+    assert [(t['name'], t['return_code']) for t in timings[1]['tasks']] == [('[do a]', 0), ('[do b]', 3)]
+    assert all([t['duration'] >= 0 for t in timings]) and timings[0]['started'] <= timings[1]['started']
@@ -1,5 +1,6 @@
 import pytest
 
+import ceryle.util as util
 from ceryle import Command, ExecutionResult, Task
 from ceryle import IllegalOperation
 from ceryle.tasks.condition import Condition
@@ -77,6 +78,20 @@ def test_store_stds(mocker):
     assert t.stderr_key == 'EXEC_STDERR'
     assert t.stdout() == ['std', 'out']
     assert t.stderr() == ['err']
+    assert t.registered_bytes == 9
+
+
+def test_registered_bytes(mocker):
+    executable = Command('do some')
+    res = ExecutionResult(0, stdout=['std', 'out'], stderr=['エラー'])
+    mocker.patch.object(executable, 'execute', return_value=res)
+
+    t = Task(executable, stderr='EXEC_STDERR')
+    assert t.registered_bytes == 0
+
+    t.run('context')
+
+    assert t.registered_bytes == 9
 
 
 @pytest.mark.parametrize(
@@ -211,3 +226,19 @@ def test_run_conditional_by_dry_run_with_inputs(mocker, conditional_on, dry_run,
     else:
         condition_exe.execute.assert_called_once_with(context='context', inputs=inputs)
         executable.execute.assert_called_once()
+
+
+def test_dry_run_prints_executable_description(mocker):
+    executable = Command('do some')
+    mocker.patch.object(executable, 'execute', return_value=ExecutionResult(0))
+    mocker.patch.object(executable, 'dry_run', return_value=['line 1', 'line 2'])
+
+    t = Task(executable)
+    with util.std_capture() as (o, _):
+        success = t.run('context', dry_run=True, inputs=['a'])
+        lines = o.getvalue().splitlines()
+
+    assert success is True
+    executable.execute.assert_not_called()
+    executable.dry_run.assert_called_once_with(context='context', inputs=['a'])
+    assert lines[-2:] == ['  line 1', '  line 2']
@@ -2,7 +2,8 @@ import pytest
 
 from ceryle import Command, Task, TaskGroup
 from ceryle.tasks import TaskIOError
-from ceryle.tasks.task import copy_register
+from ceryle.commands.executable import deferred
+from ceryle.tasks.task import copy_register, TaskSpec
 
 
 def test_new_task_group():
@@ -16,6 +17,25 @@ def test_new_task_group():
     assert tg.filename == 'file1.ceryle'
 
 
+def test_new_task_group_with_specs():
+    spec = TaskSpec(deferred(Command)('do some'), stdout='OUT')
+    tg = TaskGroup('new_task', [spec], 'context', 'file1.ceryle')
+
+    assert tg._tasks == [spec]
+    [t] = tg.tasks
+    assert isinstance(t, Task)
+    assert isinstance(t.executable, Command)
+    assert t.stdout_key == 'OUT'
+    assert tg.tasks == [t]
+
+
+def test_validate_task_group_with_invalid_spec():
+    tg = TaskGroup('new_task', [TaskSpec(deferred(Command)('do some'), stdout=1)], 'context', 'file1.ceryle')
+
+    with pytest.raises(TypeError):
+        tg.validate()
+
+
 def test_new_task_group_deps():
     tg = TaskGroup('build', [], 'context', 'file1.ceryle', dependencies=['setup', 'pre-build'])
     assert tg.dependencies == ['setup', 'pre-build']
@@ -209,3 +229,11 @@ def test_copy_register():
     assert reg1 is not reg2
     assert reg1['g1'] is not reg2['g1']
     assert reg1['g2'] is not reg2['g2']
+
+
+def test_new_task_group_inputs():
+    tg = TaskGroup('build', [], 'context', 'file1.ceryle', inputs=['src/**/*.py', 'setup.py'])
+    assert tg.inputs == ['src/**/*.py', 'setup.py']
+
+    assert TaskGroup('build', [], 'context', 'file1.ceryle', inputs='src').inputs == ['src']
+    assert TaskGroup('build', [], 'context', 'file1.ceryle').inputs == []
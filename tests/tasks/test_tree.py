@@ -0,0 +1,110 @@
+import json
+
+import ceryle
+from ceryle.tasks.tree import text_lines, dot_lines, json_lines, tree_lines
+
+
+def _chain(name, task_groups):
+    return ceryle.DependencyResolver(task_groups).deps_chain_map()[name]
+
+
+def _diamond(allow_skip=True):
+    tg1 = ceryle.TaskGroup('tg1', [ceryle.Task(ceryle.Command('do 1'))], 'context', '/foo/file1.ceryle',
+                           allow_skip=allow_skip)
+    tg2 = ceryle.TaskGroup('tg2', [], 'context', '/foo/file1.ceryle', dependencies=['tg1'])
+    tg3 = ceryle.TaskGroup('tg3', [], 'context', '/foo/file2.ceryle', dependencies=['tg1'])
+    tg4 = ceryle.TaskGroup('tg4', [ceryle.Task(ceryle.Command('do 4'))], 'context', '/foo/file2.ceryle',
+                           dependencies=['tg2', 'tg3'])
+    return _chain('tg4', [tg1, tg2, tg3, tg4])
+
+
+def test_text_lines_refers_shown_task_group():
+    assert list(text_lines(_diamond(allow_skip=False))) == [
+        'tg4:',
+        '  dependencies:',
+        '    tg2:',
+        '      dependencies:',
+        '        tg1:',
+        '    tg3:',
+        '      dependencies:',
+        '        tg1: (see above)',
+    ]
+
+
+def test_text_lines_verbose():
+    lines = list(text_lines(_diamond(allow_skip=False), verbose=1, relpath=lambda f: f[len('/foo/'):]))
+    assert lines == [
+        'tg4: (file2.ceryle)',
+        '  dependencies:',
+        '    tg2: (file1.ceryle)',
+        '      dependencies:',
+        '        tg1: (file1.ceryle)',
+        '          tasks:',
+        '            [do 1]',
+        '    tg3: (file2.ceryle)',
+        '      dependencies:',
+        '        tg1: (see above)',
+        '  tasks:',
+        '    [do 4]',
+    ]
+
+
+def test_text_lines_deep_chain():
+    n = 5000
+    tgs = [ceryle.TaskGroup(f'tg{i}', [], 'context', 'file', dependencies=[f'tg{i - 1}'] if i else [])
+           for i in range(n)]
+    lines = list(text_lines(_chain(f'tg{n - 1}', tgs)))
+    assert len(lines) == 2 * n - 1
+    assert lines[-1] == ' ' * (4 * (n - 1)) + 'tg0:'
+
+
+def test_dot_lines():
+    assert list(dot_lines(_diamond(allow_skip=False))) == [
+        'digraph "tg4" {',
+        '    "tg4";',
+        '    "tg4" -> "tg2";',
+        '    "tg4" -> "tg3";',
+        '    "tg2";',
+        '    "tg2" -> "tg1";',
+        '    "tg1";',
+        '    "tg3";',
+        '    "tg3" -> "tg1";',
+        '}',
+    ]
+
+
+def test_dot_lines_quotes_names():
+    tg = ceryle.TaskGroup('a"b', [], 'context', 'fi"le')
+    assert list(dot_lines(_chain('a"b', [tg]), verbose=1)) == [
+        'digraph "a\\"b" {',
+        '    "a\\"b" [tooltip="fi\\"le"];',
+        '}',
+    ]
+
+
+def test_json_lines():
+    doc = json.loads('\n'.join(json_lines(_diamond(allow_skip=False), verbose=1)))
+    assert doc == {
+        'root': 'tg4',
+        'task_groups': [
+            {'name': 'tg4', 'filename': '/foo/file2.ceryle', 'dependencies': ['tg2', 'tg3'], 'tasks': ['[do 4]']},
+            {'name': 'tg2', 'filename': '/foo/file1.ceryle', 'dependencies': ['tg1'], 'tasks': []},
+            {'name': 'tg1', 'filename': '/foo/file1.ceryle', 'dependencies': [], 'tasks': ['[do 1]']},
+            {'name': 'tg3', 'filename': '/foo/file2.ceryle', 'dependencies': ['tg1'], 'tasks': []},
+        ],
+    }
+
+
+def test_json_lines_single_task_group():
+    tg = ceryle.TaskGroup('tg', [], 'context', 'file')
+    assert json.loads('\n'.join(json_lines(_chain('tg', [tg])))) == {
+        'root': 'tg',
+        'task_groups': [{'name': 'tg', 'filename': 'file', 'dependencies': []}],
+    }
+
+
+def test_tree_lines_selects_format():
+    chain = _diamond()
+    assert list(tree_lines(chain, output_format='dot')) == list(dot_lines(chain))
+    assert list(tree_lines(chain, output_format='json')) == list(json_lines(chain))
+    assert list(tree_lines(chain)) == list(text_lines(chain))
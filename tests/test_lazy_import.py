@@ -0,0 +1,39 @@
+import subprocess
+import sys
+
+import pytest
+
+import ceryle
+
+
+def _imported_modules(code):
+    p = subprocess.run([sys.executable, '-c', f'{code}; import sys; print(" ".join(sys.modules))'],
+                       stdout=subprocess.PIPE, check=True, universal_newlines=True)
+    return p.stdout.split()
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason='module level __getattr__ is not supported')
+def test_import_does_not_load_commands_and_tasks():
+    modules = _imported_modules('import ceryle.main')
+
+    for m in [
+        'ceryle.commands.command',
+        'ceryle.commands.archive',
+        'ceryle.tasks.runner',
+        'ceryle.dsl.loader',
+        'ctypes',
+        'subprocess',
+    ]:
+        assert m not in modules
+
+
+def test_lazy_attributes():
+    from ceryle.commands.command import Command
+    from ceryle.tasks.runner import TaskRunner
+
+    assert ceryle.Command is Command
+    assert ceryle.TaskRunner is TaskRunner
+    assert 'TaskRunner' in dir(ceryle)
+
+    with pytest.raises(AttributeError):
+        ceryle.NoSuchName
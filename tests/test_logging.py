@@ -1,4 +1,5 @@
 import datetime as dt
+import logging
 import pathlib
 import tempfile
 
@@ -23,21 +24,23 @@ def patch_datetime_now(monkeypatch):
 def test_generate_log_dir_and_save_logs(mocker, patch_datetime_now):
     with tempfile.TemporaryDirectory() as tmpd:
         mocker.patch('pathlib.Path.home', return_value=pathlib.Path(tmpd))
+        basic_config = mocker.patch('logging.basicConfig')
 
         logdir = pathlib.Path(tmpd, CERYLE_DIR, 'logs')
         assert logdir.exists() is False
 
         ceryle.configure_logging()
+        basic_config.assert_called_once()
+        [handler] = basic_config.call_args[1]['handlers']
+
+        # log file is not created until something is logged
+        assert logdir.exists() is False
+
+        handler.handle(logging.makeLogRecord({'msg': 'logging test: info', 'levelno': logging.INFO}))
+        handler.close()
         assert logdir.exists() is True
 
         logfile = pathlib.Path(tmpd, CERYLE_DIR, 'logs', FIXED_DT.strftime('%Y%m%d-%H%M%S%f.log'))
         assert logfile.exists() is True
-
-        # ### could not disable pytest to capture logs
-        # logger = logging.getLogger('logging-test')
-        # logger.debug('logging test: debug')
-        # logger.info('logging test: info')
-        # with open(logfile) as fp:
-        #     logs = [l.rstrip() for l in fp.readlines()]
-        # assert len(logs) == 1
-        # assert re.match('.*\\[ *INFO.*\\] logging test: info.*', logs[0])
+        with open(logfile) as fp:
+            assert fp.read() == 'logging test: info\n'
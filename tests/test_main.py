@@ -1,3 +1,6 @@
+import json
+import time
+
 import pytest
 
 import ceryle.main
@@ -84,4 +87,154 @@ def test_main_show_tree(mocker):
 
     assert rc == 0
     run_mock.assert_not_called()
-    show_tree_mock.assert_called_once_with(task=None, verbose=mocker.ANY)
+    show_tree_mock.assert_called_once_with(task=None, verbose=mocker.ANY, output_format='text')
+
+
+def test_main_show_tree_format(mocker):
+    run_mock = mocker.patch('ceryle.main.run', return_value=0)
+    show_tree_mock = mocker.patch('ceryle.main.show_tree', return_value=0)
+
+    rc = ceryle.main.main(['--show', '--format', 'dot', 'foo'])
+
+    assert rc == 0
+    run_mock.assert_not_called()
+    show_tree_mock.assert_called_once_with(task='foo', verbose=0, output_format='dot')
+
+
+def test_main_run_affected_since(mocker):
+    run_mock = mocker.patch('ceryle.main.run', return_value=0)
+
+    rc = ceryle.main.main(['--affected-since', 'origin/main', 'foo'])
+
+    assert rc == 0
+    run_mock.assert_called_once_with(bundle=None, affected_since='origin/main', task='foo', dry_run=False,
+                                     continue_last_run=False, additional_args={}, verbose=0, metrics_file=None)
+
+
+def test_main_run_metrics_file(mocker):
+    run_mock = mocker.patch('ceryle.main.run', return_value=0)
+
+    rc = ceryle.main.main(['--metrics-file', '/var/lib/node_exporter/ceryle.prom', 'foo'])
+
+    assert rc == 0
+    run_mock.assert_called_once_with(bundle=None, affected_since=None, task='foo', dry_run=False,
+                                     continue_last_run=False, additional_args={}, verbose=0,
+                                     metrics_file='/var/lib/node_exporter/ceryle.prom')
+
+
+def test_main_list_affected(mocker):
+    run_mock = mocker.patch('ceryle.main.run', return_value=0)
+    list_tasks_mock = mocker.patch('ceryle.main.list_tasks', return_value=0)
+    list_affected_mock = mocker.patch('ceryle.main.list_affected', return_value=0)
+
+    rc = ceryle.main.main(['--list-tasks', '--affected-since', 'HEAD~1'])
+
+    assert rc == 0
+    run_mock.assert_not_called()
+    list_tasks_mock.assert_not_called()
+    list_affected_mock.assert_called_once_with('HEAD~1', task=None)
+
+
+def test_main_trace(mocker, tmpdir):
+    def run(**kwargs):
+        with ceryle.util.trace_span('task group', cat='test'):
+            return 0
+    run_mock = mocker.patch('ceryle.main.run', side_effect=run)
+    trace_file = tmpdir.join('trace.json')
+
+    rc = ceryle.main.main(['--trace', str(trace_file), 'foo'])
+
+    assert rc == 0
+    run_mock.assert_called_once_with(bundle=None, affected_since=None, task='foo', dry_run=False,
+                                     continue_last_run=False, additional_args={}, verbose=0, metrics_file=None)
+    events = json.loads(trace_file.read())['traceEvents']
+    assert [e['name'] for e in events if e['ph'] == 'X'] == ['task group', 'ceryle']
+    assert ceryle.util.stop_tracing() is None
+
+
+def test_main_trace_saved_on_failure(mocker, tmpdir):
+    mocker.patch('ceryle.main.run', side_effect=ceryle.TaskDefinitionError('failed'))
+    trace_file = tmpdir.join('trace.json')
+
+    rc = ceryle.main.main(['--trace', str(trace_file)])
+
+    assert rc == 255
+    [span] = [e for e in json.loads(trace_file.read())['traceEvents'] if e['ph'] == 'X']
+    assert span['name'] == 'ceryle'
+    assert span['args']['error'] == 'TaskDefinitionError'
+
+
+def test_main_profile(mocker, tmpdir, capsys):
+    def run(**kwargs):
+        time.sleep(0.05)
+        return 0
+    run_mock = mocker.patch('ceryle.main.run', side_effect=run)
+    output = tmpdir.join('profile.folded')
+
+    rc = ceryle.main.main(['--profile-output', str(output), 'foo'])
+
+    assert rc == 0
+    run_mock.assert_called_once_with(bundle=None, affected_since=None, task='foo', dry_run=False,
+                                     continue_last_run=False, additional_args={}, verbose=0, metrics_file=None)
+    err = capsys.readouterr().err
+    assert err.startswith('profile: ')
+    for category in ['ceryle', 'waiting on children', 'filesystem builtins', 'python executables']:
+        assert f'  {category} ' in err
+    assert 'run (test_main.py:' in output.read()
+
+
+def test_main_profile_printed_on_failure(mocker, capsys):
+    mocker.patch('ceryle.main.run', side_effect=ceryle.TaskDefinitionError('failed'))
+
+    rc = ceryle.main.main(['--profile'])
+
+    assert rc == 255
+    assert 'profile: ' in capsys.readouterr().err
+
+
+@pytest.mark.parametrize('argv, task_group, last', [
+    (['--stats'], None, 20),
+    (['--stats', 'build', '--last-runs', '5'], 'build', 5),
+])
+def test_main_stats(mocker, argv, task_group, last):
+    run_mock = mocker.patch('ceryle.main.run', return_value=0)
+    stats_mock = mocker.patch('ceryle.main.show_stats', return_value=0)
+
+    rc = ceryle.main.main(argv)
+
+    assert rc == 0
+    run_mock.assert_not_called()
+    stats_mock.assert_called_once_with(task_group=task_group, last=last)
+
+
+def test_main_watch(mocker):
+    run_mock = mocker.patch('ceryle.main.run', return_value=0)
+    watch_mock = mocker.patch('ceryle.main.watch', return_value=0)
+
+    rc = ceryle.main.main(['--watch', 'foo'])
+
+    assert rc == 0
+    run_mock.assert_not_called()
+    watch_mock.assert_called_once_with(task='foo', dry_run=False, continue_last_run=False,
+                                       additional_args={}, verbose=0, metrics_file=None)
+
+
+def test_main_compile(mocker):
+    run_mock = mocker.patch('ceryle.main.run', return_value=0)
+    compile_mock = mocker.patch('ceryle.main.compile_tasks', return_value=0)
+
+    rc = ceryle.main.main(['--compile', '-o', 'out.bundle', '--arg', 'A=1'])
+
+    assert rc == 0
+    run_mock.assert_not_called()
+    compile_mock.assert_called_once_with('out.bundle', additional_args={'A': '1'})
+
+
+def test_main_run_bundle(mocker):
+    run_mock = mocker.patch('ceryle.main.run', return_value=0)
+
+    rc = ceryle.main.main(['--bundle', 'tasks.bundle', 'foo'])
+
+    assert rc == 0
+    run_mock.assert_called_once_with(bundle='tasks.bundle', affected_since=None, task='foo', dry_run=False,
+                                     continue_last_run=False, additional_args={}, verbose=0, metrics_file=None)
@@ -8,10 +8,9 @@ from ceryle import TaskFileError
 def test_main_load_tasks(mocker):
     context = 'test/context'
     task_files = ['task1.ceryle']
-    collect_task_files = mocker.patch('ceryle.util.collect_task_files', return_value=(task_files, context))
-
     extension_files = ['ex1.py']
-    collect_extension_files = mocker.patch('ceryle.util.collect_extension_files', return_value=extension_files)
+    discover_files = mocker.patch('ceryle.util.discover_files',
+                                  return_value=(task_files, extension_files, context))
 
     task_def = {
         'tasks':  [
@@ -26,35 +25,30 @@ def test_main_load_tasks(mocker):
 
     assert d == task_def
     assert c == context
-    collect_task_files.assert_called_once()
-    collect_extension_files.assert_called_once()
+    discover_files.assert_called_once()
     load_task_files.assert_called_once_with(task_files, extension_files, context, additional_args={})
 
 
 def test_main_load_tasks_with_args(mocker):
     context = 'test/context'
     task_files = ['task1.ceryle']
-    collect_task_files = mocker.patch('ceryle.util.collect_task_files', return_value=(task_files, context))
-
     extension_files = ['ex1.py']
-    collect_extension_files = mocker.patch('ceryle.util.collect_extension_files', return_value=extension_files)
+    discover_files = mocker.patch('ceryle.util.discover_files',
+                                  return_value=(task_files, extension_files, context))
 
     load_task_files = mocker.patch('ceryle.load_task_files')
 
     args = {'ARG1': 'foo'}
     ceryle.main.load_tasks(additional_args=args)
 
-    collect_task_files.assert_called_once()
-    collect_extension_files.assert_called_once()
+    discover_files.assert_called_once()
     load_task_files.assert_called_once_with(task_files, extension_files, context, additional_args=args)
 
 
 def test_main_load_tasks_raises_by_no_task_files(mocker):
     context = 'test/context'
     task_files = []
-    collect_task_files = mocker.patch('ceryle.util.collect_task_files', return_value=(task_files, context))
-
-    collect_extension_files = mocker.patch('ceryle.util.collect_extension_files')
+    discover_files = mocker.patch('ceryle.util.discover_files', return_value=(task_files, [], context))
 
     load_task_files = mocker.patch('ceryle.load_task_files')
 
@@ -62,6 +56,21 @@ def test_main_load_tasks_raises_by_no_task_files(mocker):
         ceryle.main.load_tasks()
 
     assert str(e.value) == 'task file not found'
-    collect_task_files.assert_called_once()
-    collect_extension_files.assert_not_called()
+    discover_files.assert_called_once()
     load_task_files.assert_not_called()
+
+
+def test_main_load_tasks_lazily(mocker):
+    context = 'test/context'
+    task_files = ['task1.ceryle']
+    extension_files = ['ex1.py']
+    mocker.patch('ceryle.util.discover_files', return_value=(task_files, extension_files, context))
+    index = mocker.Mock()
+    mocker.patch('ceryle.dsl.index.GroupIndex.default', return_value=index)
+
+    load_task_files = mocker.patch('ceryle.load_task_files')
+
+    ceryle.main.load_tasks(lazy=True, target='tg1')
+
+    load_task_files.assert_called_once_with(task_files, extension_files, context, additional_args={},
+                                            target='tg1', index=index)
@@ -0,0 +1,59 @@
+import pathlib
+
+import ceryle
+import ceryle.main
+
+
+def _task_def(tmpdir):
+    return ceryle.TaskDefinition([
+        ceryle.TaskGroup('build', [ceryle.Task(ceryle.Command('make'), stdout='OUT')], str(tmpdir), 'CERYLE'),
+        ceryle.TaskGroup('test', [ceryle.Task(ceryle.Command('pytest'))], str(tmpdir), 'CERYLE',
+                         dependencies=['build']),
+    ], default_task='test')
+
+
+def _samples(path):
+    return dict([line.rsplit(' ', 1) for line in path.read_text().splitlines() if not line.startswith('#')])
+
+
+def test_run_writes_metrics(mocker, tmpdir):
+    mocker.patch('ceryle.main.load_tasks', return_value=(_task_def(tmpdir), str(tmpdir)))
+    mocker.patch('ceryle.main.save_run_cache')
+    mocker.patch('ceryle.commands.command.Command.execute',
+                 side_effect=[ceryle.ExecutionResult(0, stdout=['built']), ceryle.ExecutionResult(1)])
+    metrics_file = pathlib.Path(tmpdir, 'ceryle.prom')
+
+    assert ceryle.main.run(metrics_file=str(metrics_file)) == 1
+
+    samples = _samples(metrics_file)
+    assert samples['ceryle_run_success{task="test"}'] == '0'
+    assert samples['ceryle_run_task_groups{task="test"}'] == '2'
+    assert samples['ceryle_task_group_success{task="test",task_group="build"}'] == '1'
+    assert samples['ceryle_task_group_task_failures{task="test",task_group="test"}'] == '1'
+    assert samples['ceryle_task_group_registered_bytes{task="test",task_group="build"}'] == '5'
+    assert 'ceryle_process_cpu_seconds_total{task="test",process="children"}' in samples
+
+
+def test_dry_run_does_not_write_metrics(mocker, tmpdir):
+    mocker.patch('ceryle.main.load_tasks', return_value=(_task_def(tmpdir), str(tmpdir)))
+    metrics_file = pathlib.Path(tmpdir, 'ceryle.prom')
+
+    assert ceryle.main.run(dry_run=True, metrics_file=str(metrics_file)) == 0
+
+    assert not metrics_file.exists()
+
+
+def test_watched_run_writes_metrics(mocker, tmpdir):
+    runner = ceryle.TaskRunner(_task_def(tmpdir).tasks)
+    mocker.patch('ceryle.commands.command.Command.execute', return_value=ceryle.ExecutionResult(0))
+    metrics_file = pathlib.Path(tmpdir, 'ceryle.prom')
+
+    assert ceryle.main._run_watched(runner, 'test', False, metrics_file=str(metrics_file), only=['test']) == 0
+
+    samples = _samples(metrics_file)
+    assert samples['ceryle_run_success{task="test"}'] == '1'
+    assert samples['ceryle_run_task_groups{task="test"}'] == '1'
+
+
+def test_save_metrics_ignores_failure(mocker, tmpdir):
+    ceryle.main.save_metrics(str(tmpdir.join('no', 'such', 'dir', 'ceryle.prom')), 'test', 1.0, 1.0, True, [])
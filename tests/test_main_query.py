@@ -0,0 +1,94 @@
+import pytest
+
+import ceryle
+import ceryle.main
+
+TASKS = [
+    ceryle.TaskGroup('deploy', [], 'context', 'file1.ceryle', dependencies=['build', 'test']),
+    ceryle.TaskGroup('build', [], 'context', 'file1.ceryle', dependencies=['codegen']),
+    ceryle.TaskGroup('test', [], 'context', 'file1.ceryle', dependencies=['build']),
+    ceryle.TaskGroup('codegen', [], 'context', 'file1.ceryle'),
+    ceryle.TaskGroup('lint', [], 'context', 'file1.ceryle'),
+]
+
+
+@pytest.fixture
+def load_tasks(mocker):
+    return mocker.patch('ceryle.main.load_tasks', return_value=(ceryle.TaskDefinition(TASKS), 'context'))
+
+
+def test_why(load_tasks, mocker):
+    print_out = mocker.patch('ceryle.util.print_out')
+
+    assert ceryle.main.why('deploy', 'codegen') == 0
+
+    load_tasks.assert_called_once_with(lazy=False, target=None)
+    print_out.assert_called_once_with('deploy -> build -> codegen')
+
+
+def test_why_not_depending(load_tasks, mocker):
+    print_out = mocker.patch('ceryle.util.print_out')
+
+    assert ceryle.main.why('deploy', 'lint') == 1
+
+    print_out.assert_called_once_with('deploy does not depend on lint')
+
+
+def test_why_undefined(load_tasks):
+    with pytest.raises(ceryle.TaskDefinitionError) as e:
+        ceryle.main.why('deploy', 'codegem')
+    assert str(e.value) == 'task codegem is not defined'
+
+
+@pytest.mark.parametrize(
+    'flat, expected', [
+        (False, ['build', 'test']),
+        (True, ['codegen', 'build', 'test']),
+    ])
+def test_list_deps(load_tasks, mocker, flat, expected):
+    print_out = mocker.patch('ceryle.util.print_out')
+
+    assert ceryle.main.list_deps('deploy', flat=flat) == 0
+
+    load_tasks.assert_called_once_with(lazy=True, target='deploy')
+    print_out.assert_called_once_with(*expected)
+
+
+@pytest.mark.parametrize(
+    'flat, expected', [
+        (False, ['build']),
+        (True, ['build', 'test', 'deploy']),
+    ])
+def test_list_rdeps(load_tasks, mocker, flat, expected):
+    print_out = mocker.patch('ceryle.util.print_out')
+
+    assert ceryle.main.list_rdeps('codegen', flat=flat) == 0
+
+    load_tasks.assert_called_once_with(lazy=False, target=None)
+    print_out.assert_called_once_with(*expected)
+
+
+def test_list_rdeps_none(load_tasks, mocker):
+    print_out = mocker.patch('ceryle.util.print_out')
+
+    assert ceryle.main.list_rdeps('lint') == 0
+
+    print_out.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    'argv, func, args, kwargs', [
+        (['--why', 'a', 'b'], 'why', ('a', 'b'), {}),
+        (['--deps', 'a'], 'list_deps', ('a',), {'flat': False}),
+        (['--deps', 'a', '--flat'], 'list_deps', ('a',), {'flat': True}),
+        (['--rdeps', 'a', '--flat'], 'list_rdeps', ('a',), {'flat': True}),
+    ])
+def test_main_query(mocker, argv, func, args, kwargs):
+    run_mock = mocker.patch('ceryle.main.run', return_value=0)
+    query_mock = mocker.patch(f'ceryle.main.{func}', return_value=0)
+
+    rc = ceryle.main.main(argv)
+
+    assert rc == 0
+    run_mock.assert_not_called()
+    query_mock.assert_called_once_with(*args, **kwargs)
@@ -3,9 +3,12 @@ import pytest
 
 import ceryle
 import ceryle.const as const
+import ceryle.dsl.bundle
 import ceryle.main
 
 from ceryle import TaskDefinitionError
+from ceryle.commands.executable import deferred
+from ceryle.tasks.task import TaskSpec
 
 
 def test_main_run_default_task_group(mocker):
@@ -31,7 +34,7 @@ def test_main_run_default_task_group(mocker):
     save_run_cache_mock.assert_called_once()
 
     runner_cls.assert_called_once_with(task_def.tasks)
-    runner.run.assert_called_once_with('tg1', dry_run=False, last_run=None)
+    runner.run.assert_called_once_with('tg1', dry_run=False, last_run=None, only=None)
 
 
 def test_main_run_specific_task_group(mocker, tmpdir):
@@ -53,11 +56,11 @@ def test_main_run_specific_task_group(mocker, tmpdir):
 
     # verification
     assert res == 0
-    load_tasks_mock.assert_called_once()
+    load_tasks_mock.assert_called_once_with(additional_args={}, lazy=True, target='tg2')
     save_run_cache_mock.assert_called_once()
 
     runner_cls.assert_called_once_with(task_def.tasks)
-    runner.run.assert_called_once_with('tg2', dry_run=False, last_run=None)
+    runner.run.assert_called_once_with('tg2', dry_run=False, last_run=None, only=None)
 
 
 def test_main_run_fails_by_task_failure(mocker, tmpdir):
@@ -82,7 +85,7 @@ def test_main_run_fails_by_task_failure(mocker, tmpdir):
     save_run_cache_mock.assert_called_once()
 
     runner_cls.assert_called_once_with(task_def.tasks)
-    runner.run.assert_called_once_with('tg1', dry_run=False, last_run=None)
+    runner.run.assert_called_once_with('tg1', dry_run=False, last_run=None, only=None)
 
 
 def test_main_run_raises_by_no_default_and_no_task_to_run(mocker, tmpdir):
@@ -145,7 +148,7 @@ def test_main_run_save_last_execution_to_file(mocker, tmpdir):
     }
 
     load_tasks.assert_called_once()
-    runner.run.assert_called_once_with('tg1', dry_run=False, last_run=None)
+    runner.run.assert_called_once_with('tg1', dry_run=False, last_run=None, only=None)
 
 
 def test_main_run_keep_last_execution_when_dry_run(mocker, tmpdir):
@@ -177,7 +180,7 @@ def test_main_run_keep_last_execution_when_dry_run(mocker, tmpdir):
     save_run_cache.assert_not_called()
 
     load_tasks.assert_called_once()
-    runner.run.assert_called_once_with('tg1', dry_run=True, last_run=None)
+    runner.run.assert_called_once_with('tg1', dry_run=True, last_run=None, only=None)
 
 
 def test_main_run_continue_last_run(mocker, tmpdir):
@@ -213,7 +216,7 @@ def test_main_run_continue_last_run(mocker, tmpdir):
     assert res == 0
     load_run_cache.assert_called_once_with(str(context), 'g1')
     save_run_cache.assert_called_once()
-    runner.run.assert_called_once_with('g1', dry_run=False, last_run=mocker.ANY)
+    runner.run.assert_called_once_with('g1', dry_run=False, last_run=mocker.ANY, only=None)
     _, runner_run_kwargs = runner.run.call_args
     last_run = runner_run_kwargs['last_run']
     assert last_run.task_name == 'g1'
@@ -254,7 +257,7 @@ def test_main_run_continue_last_run_but_cache_not_found(mocker, tmpdir):
     assert res == 0
     load_run_cache.assert_called_once_with(str(context), 'g1')
     save_run_cache.assert_called_once()
-    runner.run.assert_called_once_with('g1', dry_run=False, last_run=None)
+    runner.run.assert_called_once_with('g1', dry_run=False, last_run=None, only=None)
     load_tasks.assert_called_once()
 
 
@@ -300,7 +303,7 @@ def test_main_run_save_last_execution_to_file_even_when_exeption_raised(mocker,
     }
 
     load_tasks.assert_called_once()
-    runner.run.assert_called_once_with('tg1', dry_run=False, last_run=None)
+    runner.run.assert_called_once_with('tg1', dry_run=False, last_run=None, only=None)
 
 
 def test_main_save_run_cache(mocker, tmpdir):
@@ -450,3 +453,164 @@ def test_main_load_run_cache_from_home_ceryle_dir_return_none_if_cache_file_not_
     # excercise
     assert ceryle.main.load_run_cache(None, 'xxx') is None
     home_mock.assert_called_once()
+
+
+def test_main_run_bundle(mocker):
+    task_def = mocker.Mock()
+    task_def.tasks = [
+        ceryle.TaskGroup('tg1', [], 'context', 'file1.ceryle'),
+    ]
+    task_def.default_task = 'tg1'
+    resolver = mocker.Mock()
+    load_bundle = mocker.patch('ceryle.dsl.bundle.load_bundle', return_value=(task_def, resolver, 'context'))
+    load_tasks_mock = mocker.patch('ceryle.main.load_tasks')
+    save_run_cache_mock = mocker.patch('ceryle.main.save_run_cache')
+
+    runner = mocker.Mock()
+    runner.run = mocker.Mock(return_value=True)
+    runner_cls = mocker.patch('ceryle.TaskRunner', return_value=runner)
+
+    # excercise
+    res = ceryle.main.run(bundle='tasks.bundle')
+
+    # verification
+    assert res == 0
+    load_bundle.assert_called_once_with('tasks.bundle')
+    load_tasks_mock.assert_not_called()
+    save_run_cache_mock.assert_called_once_with('context', mocker.ANY)
+
+    runner_cls.assert_called_once_with(task_def.tasks, resolver=resolver)
+    runner.run.assert_called_once_with('tg1', dry_run=False, last_run=None, only=None)
+
+
+def _affected_task_def(mocker, root):
+    task_def = mocker.Mock()
+    task_def.tasks = [
+        ceryle.TaskGroup('all', [], root, 'file1.ceryle', dependencies=['build', 'docs']),
+        ceryle.TaskGroup('build', [], root + '/src', 'file1.ceryle'),
+        ceryle.TaskGroup('docs', [], root + '/docs', 'file1.ceryle'),
+    ]
+    task_def.default_task = 'all'
+    return task_def
+
+
+def test_main_run_affected_since(mocker):
+    task_def = _affected_task_def(mocker, '/repo')
+    mocker.patch('ceryle.main.load_tasks', return_value=(task_def, '/repo'))
+    mocker.patch('ceryle.main.save_run_cache')
+    changed_mock = mocker.patch('ceryle.tasks.affected.changed_files_since', return_value=['/repo/docs/index.md'])
+    run_mock = mocker.patch('ceryle.tasks.runner.TaskRunner.run', return_value=True)
+    mocker.patch('ceryle.tasks.runner.TaskRunner.get_cache')
+
+    with ceryle.util.std_capture() as (o, _):
+        res = ceryle.main.run(affected_since='origin/main')
+        lines = o.getvalue().splitlines()
+
+    assert res == 0
+    assert lines == ['affected: all, docs']
+    changed_mock.assert_called_once_with('origin/main', cwd='/repo')
+    run_mock.assert_called_once_with('all', dry_run=False, last_run=None, only=set(['all', 'docs']))
+
+
+def test_main_run_affected_since_runs_producers_of_inputs(mocker):
+    task_def = mocker.Mock()
+    task_def.tasks = [
+        ceryle.TaskGroup('all', [], '/repo', 'file1.ceryle', dependencies=['build', 'docs']),
+        ceryle.TaskGroup('version', [ceryle.Task(ceryle.Command('git describe'), stdout='VERSION')],
+                         '/repo/version', 'file1.ceryle'),
+        ceryle.TaskGroup('build', [], '/repo/src', 'file1.ceryle', dependencies=['version']),
+        ceryle.TaskGroup('docs', [ceryle.Task(ceryle.Command('make docs'), input=('version', 'VERSION'))],
+                         '/repo/docs', 'file1.ceryle', dependencies=['version']),
+    ]
+    task_def.default_task = 'all'
+    mocker.patch('ceryle.main.load_tasks', return_value=(task_def, '/repo'))
+    mocker.patch('ceryle.main.save_run_cache')
+    mocker.patch('ceryle.main.save_run_history')
+    mocker.patch('ceryle.tasks.affected.changed_files_since', return_value=['/repo/docs/index.md'])
+    execute_mock = mocker.patch('ceryle.commands.command.Command.execute', side_effect=[
+        ceryle.ExecutionResult(0, stdout=['1.0']),
+        ceryle.ExecutionResult(0),
+    ])
+
+    with ceryle.util.std_capture() as (o, _):
+        res = ceryle.main.run(affected_since='origin/main')
+        lines = o.getvalue().splitlines()
+
+    assert res == 0
+    assert 'affected: all, docs, version' in lines
+    assert [c[1]['inputs'] for c in execute_mock.call_args_list] == [[], ['1.0']]
+
+
+def test_main_run_affected_since_nothing_affected(mocker):
+    task_def = _affected_task_def(mocker, '/repo')
+    mocker.patch('ceryle.main.load_tasks', return_value=(task_def, '/repo'))
+    save_run_cache_mock = mocker.patch('ceryle.main.save_run_cache')
+    mocker.patch('ceryle.tasks.affected.changed_files_since', return_value=['/other/README.md'])
+    run_mock = mocker.patch('ceryle.tasks.runner.TaskRunner.run', return_value=True)
+
+    with ceryle.util.std_capture() as (o, _):
+        res = ceryle.main.run(affected_since='origin/main')
+        lines = o.getvalue().splitlines()
+
+    assert res == 0
+    assert lines == ['no task group is affected since origin/main']
+    run_mock.assert_not_called()
+    save_run_cache_mock.assert_not_called()
+
+
+def test_main_list_affected(mocker):
+    task_def = _affected_task_def(mocker, '/repo')
+    mocker.patch('ceryle.main.load_tasks', return_value=(task_def, '/repo'))
+    mocker.patch('ceryle.tasks.affected.changed_files_since', return_value=['/repo/src/a.py'])
+
+    with ceryle.util.std_capture() as (o, _):
+        res = ceryle.main.list_affected('HEAD~1')
+        lines = o.getvalue().splitlines()
+
+    assert res == 0
+    assert lines == ['build', 'all']
+
+
+def test_main_compile_tasks(mocker, tmpdir):
+    task_def = ceryle.TaskDefinition([
+        ceryle.TaskGroup('tg1', [], 'context', 'file1.ceryle', dependencies=['tg2']),
+        ceryle.TaskGroup('tg2', [], 'context', 'file1.ceryle'),
+    ], default_task='tg1')
+    load_tasks_mock = mocker.patch('ceryle.main.load_tasks', return_value=(task_def, 'context'))
+    bundle = pathlib.Path(tmpdir, 'tasks.bundle')
+
+    # excercise
+    res = ceryle.main.compile_tasks(str(bundle), additional_args={'A': '1'})
+
+    # verification
+    assert res == 0
+    load_tasks_mock.assert_called_once_with(additional_args={'A': '1'})
+
+    loaded, resolver, root_context = ceryle.dsl.bundle.load_bundle(bundle)
+    assert loaded.default_task == 'tg1'
+    assert root_context == 'context'
+    assert [c.task_name for c in resolver.deps_chain_map()['tg1'].deps] == ['tg2']
+
+
+def test_main_compile_tasks_with_cyclic_dependency(mocker, tmpdir):
+    task_def = ceryle.TaskDefinition([
+        ceryle.TaskGroup('tg1', [], 'context', 'file1.ceryle', dependencies=['tg1']),
+    ])
+    mocker.patch('ceryle.main.load_tasks', return_value=(task_def, 'context'))
+    bundle = pathlib.Path(tmpdir, 'tasks.bundle')
+
+    with pytest.raises(ceryle.TaskDependencyError):
+        ceryle.main.compile_tasks(str(bundle))
+    assert not bundle.exists()
+
+
+def test_main_compile_tasks_with_invalid_task(mocker, tmpdir):
+    task_def = ceryle.TaskDefinition([
+        ceryle.TaskGroup('tg1', [TaskSpec(deferred(ceryle.Command)('do "some'))], 'context', 'file1.ceryle'),
+    ])
+    mocker.patch('ceryle.main.load_tasks', return_value=(task_def, 'context'))
+    bundle = pathlib.Path(tmpdir, 'tasks.bundle')
+
+    with pytest.raises(ceryle.TaskFileError):
+        ceryle.main.compile_tasks(str(bundle))
+    assert not bundle.exists()
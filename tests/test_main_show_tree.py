@@ -99,6 +99,26 @@ def test_main_show_tree_skip_already_depending(mocker):
     load_mock.assert_called_once()
 
 
+def test_main_show_tree_dot(mocker):
+    tg1 = ceryle.TaskGroup('tg1', [], 'context', 'file1.ceryle')
+    tg2 = ceryle.TaskGroup('tg2', [], 'context', 'file1.ceryle', dependencies=['tg1'])
+    task_def = ceryle.TaskDefinition([tg1, tg2], default_task='tg2')
+    mocker.patch('ceryle.main.load_tasks', return_value=(task_def, '/foo/bar'))
+
+    with ceryle.util.std_capture() as (o, e):
+        res = ceryle.main.show_tree(output_format='dot')
+        lines = o.getvalue().splitlines()
+
+    assert res == 0
+    assert lines == [
+        'digraph "tg2" {',
+        '    "tg2";',
+        '    "tg2" -> "tg1";',
+        '    "tg1";',
+        '}',
+    ]
+
+
 def test_main_show_tree_failes_by_task_not_found(mocker):
     script_dir = pathlib.Path(__file__).parent
     tg1 = ceryle.TaskGroup('build-task-xx1', [], 'context', str(script_dir.joinpath('file1.ceryle')))
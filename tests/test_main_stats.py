@@ -0,0 +1,114 @@
+import pathlib
+
+import pytest
+
+import ceryle
+import ceryle.main
+from ceryle.tasks.history import RunHistory
+
+
+@pytest.fixture
+def run_history(mocker, tmpdir):
+    path = pathlib.Path(tmpdir, 'history.db')
+    mocker.patch('ceryle.tasks.history.RunHistory.default', side_effect=lambda: RunHistory(path))
+    return path
+
+
+def _task_def(tmpdir):
+    task_def = ceryle.TaskDefinition([
+        ceryle.TaskGroup('build', [ceryle.Task(ceryle.Command('make'))], str(tmpdir), 'CERYLE'),
+        ceryle.TaskGroup('test', [ceryle.Task(ceryle.Command('pytest'))], str(tmpdir), 'CERYLE',
+                         dependencies=['build']),
+    ], default_task='test')
+    return task_def
+
+
+def test_run_records_history(mocker, tmpdir, run_history):
+    mocker.patch('ceryle.main.load_tasks', return_value=(_task_def(tmpdir), str(tmpdir)))
+    mocker.patch('ceryle.main.save_run_cache')
+    mocker.patch('ceryle.commands.command.Command.execute',
+                 side_effect=[ceryle.ExecutionResult(0), ceryle.ExecutionResult(1)])
+
+    assert ceryle.main.run() == 1
+
+    with RunHistory(run_history) as history:
+        [(task, _, _, success)] = history.runs(str(tmpdir))
+        assert (task, success) == ('test', False)
+        assert sorted([(s['name'], s['failures']) for s in history.group_stats(str(tmpdir))]) == [
+            ('build', 0), ('test', 1)]
+        assert [s['name'] for s in history.task_stats('build', str(tmpdir))] == ['[make]']
+
+
+def test_dry_run_is_not_recorded(mocker, tmpdir, run_history):
+    mocker.patch('ceryle.main.load_tasks', return_value=(_task_def(tmpdir), str(tmpdir)))
+
+    assert ceryle.main.run(dry_run=True) == 0
+
+    with RunHistory(run_history) as history:
+        assert history.runs(str(tmpdir)) == []
+
+
+def test_save_run_history_ignores_failure(mocker):
+    mocker.patch('ceryle.tasks.history.RunHistory.record', side_effect=OSError('disk full'))
+
+    ceryle.main.save_run_history('test', None, 1.0, 1.0, True, [{'name': 'test'}])
+
+
+def _record(path, root_context):
+    with RunHistory(path) as history:
+        for i in range(4):
+            timings = [
+                {'name': 'build', 'started': 100.0 * i, 'duration': 1.0 + i, 'success': True,
+                 'tasks': [{'name': '[make]', 'duration': 1.0 + i, 'return_code': 0}]},
+                {'name': 'test', 'started': 100.0 * i + 10, 'duration': 0.5, 'success': i != 3,
+                 'tasks': [{'name': '[pytest]', 'duration': 0.5, 'return_code': 0 if i != 3 else 1}]},
+            ]
+            history.record('test', root_context, 100.0 * i, 1.5 + i, i != 3, timings)
+
+
+def test_show_stats(mocker, tmpdir, run_history):
+    tmpdir.join('CERYLE').write('{}')
+    mocker.patch('os.getcwd', return_value=str(tmpdir))
+    _record(run_history, str(tmpdir))
+
+    with ceryle.util.std_capture() as (o, _):
+        assert ceryle.main.show_stats(last=3) == 0
+        lines = o.getvalue().splitlines()
+
+    assert len(lines) == 8
+    assert lines[0] == 'last 3 runs:'
+    assert lines[1].endswith('4.500s  failed  test')
+    assert lines[3].endswith('2.500s  ok      test')
+    assert lines[4] == 'slowest task groups:'
+    assert lines[5].split() == ['name', 'runs', 'p50', 'p95', 'max', 'trend']
+    assert lines[6].split() == ['build', '3', '3.000s', '4.000s', '4.000s', '-']
+    assert lines[7].split() == ['test', '3(1!)', '0.500s', '0.500s', '0.500s', '-']
+
+
+def test_show_stats_of_task_group(mocker, tmpdir, run_history):
+    tmpdir.join('CERYLE').write('{}')
+    mocker.patch('os.getcwd', return_value=str(tmpdir))
+    _record(run_history, str(tmpdir))
+
+    with ceryle.util.std_capture() as (o, _):
+        assert ceryle.main.show_stats(task_group='build') == 0
+        lines = o.getvalue().splitlines()
+
+    assert lines[0] == 'build:'
+    assert lines[2].split() == ['build', '4', '2.000s', '4.000s', '4.000s', '+200%']
+    assert lines[3] == 'tasks:'
+    assert lines[5].split() == ['[make]', '4', '2.000s', '4.000s', '4.000s', '+200%']
+    assert lines[6] == 'recent runs:'
+    assert [line.split()[-2:] for line in lines[7:]] == [['4.000s', 'ok'], ['3.000s', 'ok'], ['2.000s', 'ok'],
+                                                         ['1.000s', 'ok']]
+
+
+def test_show_stats_nothing_recorded(mocker, tmpdir, run_history):
+    mocker.patch('os.getcwd', return_value=str(pathlib.Path(tmpdir)))
+
+    with ceryle.util.std_capture() as (o, _):
+        assert ceryle.main.show_stats() == 0
+        assert ceryle.main.show_stats(task_group='build') == 1
+        lines = o.getvalue().splitlines()
+
+    assert lines == ['no run is recorded', 'no run of build is recorded']
@@ -0,0 +1,65 @@
+import pathlib
+import pytest
+
+import ceryle
+import ceryle.main
+from ceryle.commands.executable import deferred
+from ceryle.tasks.task import TaskSpec
+
+SCRIPT_DIR = pathlib.Path(__file__).parent
+
+
+def task_group(name, cmd, dependencies=[]):
+    return ceryle.TaskGroup(name, [TaskSpec(deferred(ceryle.Command)(cmd))], 'context',
+                            str(SCRIPT_DIR.joinpath('file1.ceryle')), dependencies=dependencies)
+
+
+def test_validate_all(mocker):
+    task_def = ceryle.TaskDefinition([task_group('tg1', 'do some'), task_group('tg2', 'do some', ['tg1'])])
+    load_tasks = mocker.patch('ceryle.main.load_tasks', return_value=(task_def, 'context'))
+    print_out = mocker.patch('ceryle.util.print_out')
+
+    res = ceryle.main.validate_all(additional_args={'A': '1'})
+
+    assert res == 0
+    load_tasks.assert_called_once_with(additional_args={'A': '1'})
+    print_out.assert_called_once_with('2 task groups are valid')
+
+
+def test_validate_all_reports_every_invalid_task_group(mocker):
+    task_def = ceryle.TaskDefinition([
+        task_group('tg1', 'do "some'),
+        task_group('tg2', 'do some'),
+        task_group('tg3', 'do "some'),
+    ])
+    mocker.patch('ceryle.main.load_tasks', return_value=(task_def, 'context'))
+    print_err = mocker.patch('ceryle.util.print_err')
+
+    res = ceryle.main.validate_all()
+
+    assert res == 1
+    file1 = pathlib.Path('tests/file1.ceryle')
+    assert print_err.call_args_list == [
+        mocker.call(f'tg1 ({file1}): invalid command format: [do "some]'),
+        mocker.call(f'tg3 ({file1}): invalid command format: [do "some]'),
+        mocker.call('2 of 3 task groups are invalid'),
+    ]
+
+
+def test_validate_all_with_undefined_dependency(mocker):
+    task_def = ceryle.TaskDefinition([task_group('tg1', 'do some', ['tg0'])])
+    mocker.patch('ceryle.main.load_tasks', return_value=(task_def, 'context'))
+
+    with pytest.raises(ceryle.TaskDependencyError):
+        ceryle.main.validate_all()
+
+
+def test_main_validate_all(mocker):
+    run_mock = mocker.patch('ceryle.main.run', return_value=0)
+    validate_all = mocker.patch('ceryle.main.validate_all', return_value=1)
+
+    rc = ceryle.main.main(['--validate-all', '--arg', 'A=1'])
+
+    assert rc == 1
+    run_mock.assert_not_called()
+    validate_all.assert_called_once_with(additional_args={'A': '1'})
@@ -0,0 +1,143 @@
+import os
+
+import ceryle
+import ceryle.main
+
+
+class FakeWatcher:
+    def __init__(self, changes):
+        self._changes = list(changes)
+        self.drained = 0
+
+    def wait(self, debounce=0.2):
+        if not self._changes:
+            raise KeyboardInterrupt()
+        return set(self._changes.pop(0))
+
+    def drain(self):
+        self.drained += 1
+        return set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+def _task_def(mocker, root):
+    task_def = mocker.Mock()
+    task_def.tasks = [
+        ceryle.TaskGroup('test', [], root, os.path.join(root, 'CERYLE'),
+                         dependencies=['build'], inputs=['tests/*.py']),
+        ceryle.TaskGroup('build', [], root, os.path.join(root, 'CERYLE'), inputs=['src/*.py']),
+    ]
+    task_def.default_task = 'test'
+    for tg in task_def.tasks:
+        mocker.patch.object(tg, 'run', return_value=(True, {tg.name: {'out': [tg.name]}}))
+    return task_def
+
+
+def test_watch_reruns_affected_task_groups(mocker, tmpdir):
+    root = str(tmpdir)
+    task_def = _task_def(mocker, root)
+    load_tasks_mock = mocker.patch('ceryle.main.load_tasks', return_value=(task_def, root))
+    mocker.patch('ceryle.util.discover_files', return_value=([], [], root))
+    watcher = FakeWatcher([
+        [os.path.join(root, 'tests', 'test_a.py')],
+        [os.path.join(root, 'README.md')],
+        [os.path.join(root, 'src', 'a.py')],
+    ])
+    create_watcher_mock = mocker.patch('ceryle.util.create_watcher', return_value=watcher)
+
+    rc = ceryle.main.watch(task='test')
+
+    assert rc == 0
+    load_tasks_mock.assert_called_once()
+    create_watcher_mock.assert_called_once_with([root])
+    test_tg, build_tg = task_def.tasks
+    assert build_tg.run.call_count == 2
+    assert test_tg.run.call_count == 3
+    # outputs of the skipped group are taken from the previous run
+    test_tg.run.assert_any_call(dry_run=False, register={'build': {'out': ['build']}})
+    assert watcher.drained == 3
+
+
+def test_watch_reloads_on_task_file_change(mocker, tmpdir):
+    root = str(tmpdir)
+    task_def = _task_def(mocker, root)
+    load_tasks_mock = mocker.patch('ceryle.main.load_tasks', return_value=(task_def, root))
+    mocker.patch('ceryle.util.discover_files', return_value=([], [], root))
+    watchers = [FakeWatcher([[os.path.join(root, 'CERYLE')]]), FakeWatcher([])]
+    mocker.patch('ceryle.util.create_watcher', side_effect=watchers)
+
+    rc = ceryle.main.watch()
+
+    assert rc == 0
+    assert load_tasks_mock.call_count == 2
+    test_tg, build_tg = task_def.tasks
+    assert build_tg.run.call_count == 2
+    assert test_tg.run.call_count == 2
+
+
+def test_watch_continues_after_task_failure(mocker, tmpdir):
+    root = str(tmpdir)
+    task_def = _task_def(mocker, root)
+    mocker.patch('ceryle.main.load_tasks', return_value=(task_def, root))
+    mocker.patch('ceryle.util.discover_files', return_value=([], [], root))
+    mocker.patch('ceryle.util.create_watcher',
+                 return_value=FakeWatcher([[os.path.join(root, 'src', 'a.py')]]))
+    test_tg, build_tg = task_def.tasks
+    build_tg.run.side_effect = [(False, {}), (True, {})]
+
+    rc = ceryle.main.watch(task='test')
+
+    assert rc == 0
+    assert build_tg.run.call_count == 2
+    test_tg.run.assert_called_once()
+
+
+def test_watch_keeps_last_task_files_when_reload_fails(mocker, tmpdir):
+    root = str(tmpdir)
+    task_def = _task_def(mocker, root)
+    load_tasks_mock = mocker.patch('ceryle.main.load_tasks', side_effect=[
+        (task_def, root),
+        SyntaxError('unexpected EOF while parsing'),
+        (task_def, root),
+    ])
+    mocker.patch('ceryle.util.discover_files', return_value=([], [], root))
+    task_file = os.path.join(root, 'CERYLE')
+    watchers = [FakeWatcher([[task_file], [os.path.join(root, 'src', 'a.py')], [task_file]]), FakeWatcher([])]
+    mocker.patch('ceryle.util.create_watcher', side_effect=watchers)
+
+    with ceryle.util.std_capture() as (_, e):
+        rc = ceryle.main.watch(task='test')
+        err = e.getvalue()
+
+    assert rc == 0
+    assert load_tasks_mock.call_count == 3
+    assert 'failed to reload task files, keeps the last ones: SyntaxError: unexpected EOF while parsing' in err
+    test_tg, build_tg = task_def.tasks
+    # the change after the failed reload is run by the last task files
+    assert build_tg.run.call_count == 3
+    assert test_tg.run.call_count == 3
+
+
+def test_watch_continues_after_invalid_task_declaration(mocker, tmpdir):
+    root = str(tmpdir)
+    task_def = _task_def(mocker, root)
+    mocker.patch('ceryle.main.load_tasks', return_value=(task_def, root))
+    mocker.patch('ceryle.util.discover_files', return_value=([], [], root))
+    mocker.patch('ceryle.util.create_watcher',
+                 return_value=FakeWatcher([[os.path.join(root, 'src', 'a.py')]]))
+    test_tg, build_tg = task_def.tasks
+    build_tg.run.side_effect = [TypeError('command() got an unexpected keyword argument'), (True, {})]
+
+    with ceryle.util.std_capture() as (_, e):
+        rc = ceryle.main.watch(task='test')
+        err = e.getvalue()
+
+    assert rc == 0
+    assert 'unexpected keyword argument' in err
+    assert build_tg.run.call_count == 2
+    test_tg.run.assert_called_once()
@@ -0,0 +1,105 @@
+import json
+import os
+import pathlib
+
+from ceryle.const import DEFAULT_TASK_FILE, CERYLE_DIR, CERYLE_TASK_DIR, CERYLE_EX_DIR
+from ceryle.util import DirectoryIndex, discover_files, find_task_file
+
+
+def _make_old(*dirs):
+    # regards directories as not modified recently so that they are cached
+    for d in dirs:
+        os.utime(d, (0, 0))
+
+
+def _prepare(tmpdir):
+    wd = pathlib.Path(tmpdir, 'project', 'sub')
+    wd.mkdir(parents=True)
+    root = wd.parent
+    root.joinpath(DEFAULT_TASK_FILE).touch()
+    task_dir = root.joinpath(CERYLE_DIR, CERYLE_TASK_DIR, 'x')
+    task_dir.mkdir(parents=True)
+    task_dir.joinpath('a.ceryle').touch()
+    task_dir.joinpath('note.txt').touch()
+    ex_dir = root.joinpath(CERYLE_DIR, CERYLE_EX_DIR)
+    ex_dir.mkdir(parents=True)
+    ex_dir.joinpath('ex.py').touch()
+
+    home_task_dir = pathlib.Path(tmpdir, 'home', CERYLE_DIR, CERYLE_TASK_DIR)
+    home_task_dir.mkdir(parents=True)
+    home_task_dir.joinpath('h.ceryle').touch()
+    return wd, root
+
+
+def test_discover_files(mocker, tmpdir):
+    wd, root = _prepare(tmpdir)
+    home_mock = mocker.patch('pathlib.Path.home', return_value=pathlib.Path(tmpdir, 'home'))
+    find_mock = mocker.patch('ceryle.util.discovery.find_task_file', wraps=find_task_file)
+
+    task_files, ex_files, root_context = discover_files(wd)
+
+    assert task_files == [
+        str(pathlib.Path(tmpdir, 'home', CERYLE_DIR, CERYLE_TASK_DIR, 'h.ceryle')),
+        str(root.joinpath(DEFAULT_TASK_FILE)),
+        str(root.joinpath(CERYLE_DIR, CERYLE_TASK_DIR, 'x', 'a.ceryle')),
+    ]
+    assert ex_files == [str(root.joinpath(CERYLE_DIR, CERYLE_EX_DIR, 'ex.py'))]
+    assert root_context == str(root)
+    home_mock.assert_called_once_with()
+    find_mock.assert_called_once_with(wd)
+
+
+def test_discover_files_no_task_file(mocker, tmpdir):
+    wd = pathlib.Path(tmpdir, 'aa')
+    wd.mkdir()
+    mocker.patch('pathlib.Path.home', return_value=pathlib.Path(tmpdir, 'home'))
+
+    assert discover_files(wd) == ([], [], None)
+
+
+def test_directory_index_skips_listing_unmodified_directories(mocker, tmpdir):
+    wd, root = _prepare(tmpdir)
+    mocker.patch('pathlib.Path.home', return_value=pathlib.Path(tmpdir, 'home'))
+    ceryle_dir = root.joinpath(CERYLE_DIR)
+    _make_old(*[str(d) for d, _, _ in os.walk(str(ceryle_dir))])
+    cache_file = pathlib.Path(tmpdir, 'cache', 'index.json')
+
+    cold = discover_files(wd, index=DirectoryIndex(cache_file))
+    assert cache_file.is_file()
+    with open(cache_file) as fp:
+        assert str(ceryle_dir.joinpath(CERYLE_TASK_DIR, 'x')) in json.load(fp)['data']
+
+    scandir = mocker.patch('os.scandir', wraps=os.scandir)
+    warm = discover_files(wd, index=DirectoryIndex(cache_file))
+    assert warm == cold
+    listed = [str(c[0][0]) for c in scandir.call_args_list]
+    assert str(ceryle_dir.joinpath(CERYLE_TASK_DIR)) not in listed
+    assert str(ceryle_dir.joinpath(CERYLE_TASK_DIR, 'x')) not in listed
+    assert str(ceryle_dir.joinpath(CERYLE_EX_DIR)) not in listed
+
+
+def test_directory_index_detects_added_and_removed_files(mocker, tmpdir):
+    wd, root = _prepare(tmpdir)
+    mocker.patch('pathlib.Path.home', return_value=pathlib.Path(tmpdir, 'home'))
+    task_dir = root.joinpath(CERYLE_DIR, CERYLE_TASK_DIR)
+    _make_old(str(task_dir), str(task_dir.joinpath('x')))
+    cache_file = pathlib.Path(tmpdir, 'cache', 'index.json')
+    discover_files(wd, index=DirectoryIndex(cache_file))
+
+    task_dir.joinpath('x', 'a.ceryle').unlink()
+    task_dir.joinpath('y').mkdir()
+    task_dir.joinpath('y', 'b.ceryle').touch()
+
+    task_files, _, _ = discover_files(wd, index=DirectoryIndex(cache_file))
+    assert task_files[-1] == str(task_dir.joinpath('y', 'b.ceryle'))
+    assert str(task_dir.joinpath('x', 'a.ceryle')) not in task_files
+
+
+def test_directory_index_ignores_broken_cache(tmpdir):
+    cache_file = pathlib.Path(tmpdir, 'index.json')
+    cache_file.write_text('{broken')
+    d = pathlib.Path(tmpdir, 'd')
+    d.mkdir()
+    d.joinpath('a.ceryle').touch()
+
+    assert DirectoryIndex(cache_file).rglob_files(d, '.ceryle') == [str(d.joinpath('a.ceryle'))]
@@ -0,0 +1,130 @@
+import os
+import pathlib
+
+import pytest
+
+from ceryle.util import GlobMatcher, split_glob, walk_glob
+
+
+@pytest.fixture
+def tree(tmpdir):
+    '''
+    root/
+      f1.txt
+      f2.py
+      .hidden.txt
+      d1/f3.txt
+      d1/d2/f4.txt
+      d1/d2/f5.py
+      node_modules/m/f6.txt
+    '''
+    root = pathlib.Path(tmpdir)
+    for f in [
+        'f1.txt',
+        'f2.py',
+        '.hidden.txt',
+        'd1/f3.txt',
+        'd1/d2/f4.txt',
+        'd1/d2/f5.py',
+        'node_modules/m/f6.txt',
+    ]:
+        p = root.joinpath(f)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.touch()
+    return root
+
+
+def relpaths(root, paths):
+    return sorted([p.relative_to(root).as_posix() for p in paths])
+
+
+def test_walk_single_pattern(tree):
+    assert relpaths(tree, walk_glob(tree, ['*.txt'])) == ['.hidden.txt', 'f1.txt']
+
+
+def test_walk_recursive_pattern(tree):
+    assert relpaths(tree, walk_glob(tree, ['**/*.txt'])) == [
+        '.hidden.txt',
+        'd1/d2/f4.txt',
+        'd1/f3.txt',
+        'f1.txt',
+        'node_modules/m/f6.txt',
+    ]
+
+
+def test_walk_multiple_patterns(tree):
+    assert relpaths(tree, walk_glob(tree, ['*.py', 'd1/**/*.txt'])) == [
+        'd1/d2/f4.txt',
+        'd1/f3.txt',
+        'f2.py',
+    ]
+
+
+def test_walk_excludes(tree):
+    assert relpaths(tree, walk_glob(tree, ['**/*'], excludes=['node_modules', '**/*.py', 'd1/d2'])) == [
+        '.hidden.txt',
+        'd1',
+        'd1/f3.txt',
+        'f1.txt',
+    ]
+
+
+def test_walk_prunes_excluded_directories(tree, mocker):
+    scandir = mocker.spy(os, 'scandir')
+
+    matched = list(walk_glob(tree, ['**/*.txt'], excludes=['node_modules']))
+
+    assert 'node_modules/m/f6.txt' not in relpaths(tree, matched)
+    scanned = [pathlib.Path(c[0][0]) for c in scandir.call_args_list]
+    assert tree.joinpath('node_modules') not in scanned
+    assert tree.joinpath('node_modules', 'm') not in scanned
+
+
+def test_walk_does_not_descend_unmatchable_directories(tree, mocker):
+    scandir = mocker.spy(os, 'scandir')
+
+    assert relpaths(tree, walk_glob(tree, ['d1/*.txt'])) == ['d1/f3.txt']
+    scanned = [pathlib.Path(c[0][0]) for c in scandir.call_args_list]
+    assert scanned == [tree, tree.joinpath('d1')]
+
+
+def test_walk_trailing_recursive_matches_directories(tree):
+    assert relpaths(tree, walk_glob(tree, ['d1/**'])) == ['d1', 'd1/d2']
+
+
+def test_walk_without_hidden(tree):
+    assert relpaths(tree, walk_glob(tree, ['*.txt'], include_hidden=False)) == ['f1.txt']
+    assert relpaths(tree, walk_glob(tree, ['.*.txt'], include_hidden=False)) == ['.hidden.txt']
+
+
+def test_walk_not_descend_matched(tree):
+    assert relpaths(tree, walk_glob(tree, ['d1', 'd1/**/*.txt'], descend_matched=False)) == ['d1']
+
+
+def test_walk_not_exist(tree):
+    assert list(walk_glob(tree.joinpath('unknown'), ['**/*'])) == []
+
+
+@pytest.mark.parametrize(
+    'relpath, is_dir, expected', [
+        ('node_modules', True, True),
+        ('node_modules/m/f6.txt', False, True),
+        ('d1/f5.py', False, True),
+        ('d1/f3.txt', False, False),
+        ('d1', True, False),
+    ])
+def test_is_excluded(relpath, is_dir, expected):
+    matcher = GlobMatcher(['**/*'], excludes=['node_modules', '**/*.py'])
+    assert matcher.is_excluded(relpath, is_dir=is_dir) is expected
+
+
+@pytest.mark.parametrize(
+    'pattern, expected', [
+        ('d1/**/*.py', ('d1', '**/*.py')),
+        ('*.py', ('.', '*.py')),
+        ('d1/d2/f1', ('d1/d2/f1', None)),
+        ('/tmp/d1/*/f[0-9]', ('/tmp/d1', '*/f[0-9]')),
+    ])
+def test_split_glob(pattern, expected):
+    base, rest = split_glob(pattern)
+    assert (pathlib.Path(base), rest) == (pathlib.Path(expected[0]), expected[1])
@@ -0,0 +1,64 @@
+import threading
+import time
+
+import pytest
+
+from ceryle.util import SamplingProfiler
+
+
+def waiting():
+    time.sleep(0.2)
+
+
+def calling(f):
+    f()
+
+
+def spinning():
+    end = time.perf_counter() + 0.2
+    while time.perf_counter() < end:
+        pass
+
+
+def test_profile_categories():
+    profiler = SamplingProfiler(categories=[('waiting', [waiting]), ('calling', [calling])],
+                                default='rest', interval=0.001)
+
+    with profiler:
+        calling(waiting)
+        spinning()
+
+    report = profiler.report()
+    categories = dict(report['categories'])
+    assert [name for name, _ in report['categories']] == ['rest', 'waiting', 'calling']
+    # the innermost categorized function takes time
+    assert categories['waiting'] == pytest.approx(0.2, abs=0.1)
+    assert categories['calling'] < 0.1
+    assert categories['rest'] == pytest.approx(0.2, abs=0.1)
+    assert report['wall'] >= 0.4
+    assert report['samples'] > 0
+    assert report['cpu'] >= 0
+    assert report['children_cpu'] >= 0
+    assert report['top'][0][0].startswith('spinning (test_profile.py:')
+
+
+def test_profile_collapsed_lines(tmpdir):
+    def work():
+        time.sleep(0.1)
+
+    with SamplingProfiler(interval=0.001) as profiler:
+        t = threading.Thread(target=work, name='worker')
+        t.start()
+        work()
+        t.join()
+
+    lines = list(profiler.collapsed_lines())
+    stacks = [line.rsplit(' ', 1) for line in lines]
+    assert all([int(count) > 0 for _, count in stacks])
+    assert any([s.startswith('MainThread;') and 'work (test_profile.py:' in s for s, _ in stacks])
+    assert any([s.startswith('worker;') and 'work (test_profile.py:' in s for s, _ in stacks])
+    assert not any(['ceryle-profiler' in s for s, _ in stacks])
+
+    path = tmpdir.join('profile.folded')
+    profiler.save_collapsed(str(path))
+    assert path.read().splitlines() == lines
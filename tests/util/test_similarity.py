@@ -0,0 +1,53 @@
+import difflib
+
+import pytest
+
+import ceryle.util.similarity as similarity
+from ceryle.util import SimilarNameIndex
+
+
+def test_find_exhaustive_same_as_difflib():
+    names = ['build', 'built', 'test', 'tests', 'deploy', 'bundle']
+    expected = sorted([(difflib.SequenceMatcher(a='biuld', b=n).ratio(), n) for n in names],
+                      key=lambda s: s[0], reverse=True)
+
+    assert SimilarNameIndex(names).find('biuld', ratio=0.0) == [e for e in expected if e[0] > 0.0]
+    assert [n for _, n in SimilarNameIndex(names).find('biuld')] == ['build', 'built']
+
+
+def test_find_exhaustive_does_not_build_index():
+    index = SimilarNameIndex(['foo', 'bar'])
+    index.find('fo')
+    assert index._postings is None
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('module_0042_biuld', 'module_0042_build'),
+    ('module_1999_tset', 'module_1999_test'),
+    ('modul_0777_deploy', 'module_0777_deploy'),
+])
+def test_find_indexed(query, expected):
+    names = [f'module_{i:04}_{s}' for i in range(2000) for s in ['build', 'test', 'deploy']]
+    assert len(names) > similarity.EXHAUSTIVE_LIMIT
+
+    found = SimilarNameIndex(names).find(query)
+
+    assert found[0][1] == expected
+    assert found[0][0] == difflib.SequenceMatcher(a=query, b=expected).ratio()
+    assert found == sorted(found, key=lambda s: s[0], reverse=True)
+
+
+def test_find_indexed_builds_index_once(mocker):
+    names = [f'task{i}' for i in range(similarity.EXHAUSTIVE_LIMIT + 1)]
+    index = SimilarNameIndex(names)
+    build = mocker.spy(index, '_build')
+
+    index.find('task1')
+    index.find('task2')
+
+    assert build.call_count == 1
+
+
+def test_find_no_similar_names():
+    names = [f'task{i}' for i in range(similarity.EXHAUSTIVE_LIMIT + 1)]
+    assert SimilarNameIndex(names).find('zzz') == []
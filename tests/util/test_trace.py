@@ -0,0 +1,84 @@
+import json
+import threading
+
+import pytest
+
+from ceryle.util import Tracer, start_tracing, stop_tracing, trace_span
+
+
+@pytest.fixture
+def tracer():
+    t = start_tracing()
+    yield t
+    stop_tracing()
+
+
+def _spans(tracer):
+    return [e for e in tracer.events if e['ph'] == 'X']
+
+
+def test_trace_span_does_nothing_without_tracing():
+    assert stop_tracing() is None
+    with trace_span('foo', x=1) as span:
+        span.set(y=2)
+
+
+def test_trace_span(tracer):
+    with trace_span('outer', cat='main', x=1) as span:
+        with trace_span('inner'):
+            pass
+        span.set(y=2)
+
+    inner, outer = _spans(tracer)
+    assert (inner['name'], inner['cat'], inner['args']) == ('inner', 'ceryle', {})
+    assert (outer['name'], outer['cat'], outer['args']) == ('outer', 'main', {'x': 1, 'y': 2})
+    assert outer['ts'] <= inner['ts']
+    assert inner['ts'] + inner['dur'] <= outer['ts'] + outer['dur']
+    assert inner['pid'] == outer['pid']
+    assert inner['tid'] == outer['tid'] == 1
+
+
+def test_trace_span_records_error(tracer):
+    with pytest.raises(ValueError):
+        with trace_span('fails'):
+            raise ValueError('error')
+
+    [span] = _spans(tracer)
+    assert span['args'] == {'error': 'ValueError'}
+
+
+def test_trace_span_lanes_of_threads(tracer):
+    def record():
+        with trace_span('in thread'):
+            pass
+
+    with trace_span('main'):
+        t = threading.Thread(target=record, name='worker')
+        t.start()
+        t.join()
+
+    lanes = dict([(e['tid'], e['args']['name']) for e in tracer.events if e['name'] == 'thread_name'])
+    spans = dict([(e['name'], e['tid']) for e in _spans(tracer)])
+    assert lanes[spans['main']] == threading.current_thread().name
+    assert lanes[spans['in thread']] == 'worker'
+    assert spans['main'] != spans['in thread']
+
+
+def test_stop_tracing(tracer):
+    assert stop_tracing() is tracer
+    with trace_span('ignored'):
+        pass
+    assert _spans(tracer) == []
+
+
+def test_save(tmpdir):
+    tracer = Tracer()
+    with tracer.span('foo', 'bar', {}):
+        pass
+    path = tmpdir.join('trace.json')
+
+    tracer.save(str(path))
+
+    doc = json.loads(path.read())
+    assert doc['displayTimeUnit'] == 'ms'
+    assert [e['name'] for e in doc['traceEvents']] == ['process_name', 'thread_name', 'foo']
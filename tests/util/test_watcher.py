@@ -0,0 +1,81 @@
+import os
+import pathlib
+
+import pytest
+
+from ceryle.util.watcher import InotifyWatcher, PollingWatcher, create_watcher, minimize_roots
+
+
+def test_minimize_roots(tmpdir):
+    root = str(tmpdir)
+    roots = [
+        os.path.join(root, 'a', 'b'),
+        os.path.join(root, 'a'),
+        os.path.join(root, 'ab'),
+        os.path.join(root, 'a'),
+    ]
+    assert minimize_roots(roots) == [os.path.join(root, 'a'), os.path.join(root, 'ab')]
+
+
+def _prepare(tmpdir):
+    root = pathlib.Path(tmpdir)
+    root.joinpath('src').mkdir()
+    root.joinpath('src', 'a.txt').write_text('a')
+    root.joinpath('.ceryle', 'last-execution').mkdir(parents=True)
+    return root
+
+
+def _watchers():
+    yield PollingWatcher
+    if os.path.exists('/proc/sys/fs/inotify'):
+        yield InotifyWatcher
+
+
+@pytest.mark.parametrize('watcher_cls', list(_watchers()))
+def test_watcher_detects_changes(tmpdir, watcher_cls):
+    root = _prepare(tmpdir)
+    kwargs = dict(interval=0.01) if watcher_cls is PollingWatcher else {}
+
+    with watcher_cls([str(root)], **kwargs) as watcher:
+        assert watcher.poll(timeout=0) == set()
+
+        root.joinpath('src', 'a.txt').write_text('modified')
+        root.joinpath('src', 'b.txt').write_text('b')
+        changed = watcher.wait(debounce=0.05)
+        assert str(root.joinpath('src', 'a.txt')) in changed
+        assert str(root.joinpath('src', 'b.txt')) in changed
+
+        # new directory is watched as well
+        root.joinpath('src', 'sub').mkdir()
+        root.joinpath('src', 'sub', 'c.txt').write_text('c')
+        changed = watcher.wait(debounce=0.05)
+        assert str(root.joinpath('src', 'sub', 'c.txt')) in changed
+
+        root.joinpath('src', 'sub', 'c.txt').write_text('cc')
+        assert str(root.joinpath('src', 'sub', 'c.txt')) in watcher.wait(debounce=0.05)
+
+
+@pytest.mark.parametrize('watcher_cls', list(_watchers()))
+def test_watcher_ignores_run_cache(tmpdir, watcher_cls):
+    root = _prepare(tmpdir)
+    kwargs = dict(interval=0.01) if watcher_cls is PollingWatcher else {}
+
+    with watcher_cls([str(root)], **kwargs) as watcher:
+        root.joinpath('.ceryle', 'last-execution', 'foo').write_text('cache')
+        assert watcher.poll(timeout=0.1) == set()
+
+
+def test_watcher_drain(tmpdir):
+    root = _prepare(tmpdir)
+
+    with PollingWatcher([str(root)], interval=0.01) as watcher:
+        root.joinpath('src', 'a.txt').write_text('modified')
+        assert watcher.drain() == set([str(root.joinpath('src', 'a.txt'))])
+        assert watcher.poll(timeout=0) == set()
+
+
+def test_create_watcher_falls_back_to_polling(tmpdir, mocker):
+    mocker.patch('ceryle.util.watcher.is_linux', return_value=False)
+
+    with create_watcher([str(tmpdir)]) as watcher:
+        assert isinstance(watcher, PollingWatcher)